@@ -14,11 +14,15 @@ from app.routers.blocks_router import router as blocks_router
 from app.routers.transactions_router import router as transactions_router
 from app.routers.address_router import router as address_router
 from app.routers.danger_router import router as danger_router
+from app.routers.metrics_router import router as metrics_router
+from app.routers.backfill_router import router as backfill_router
 
 app.include_router(address_router)
 app.include_router(transactions_router)
 app.include_router(blocks_router)
 app.include_router(danger_router)
+app.include_router(metrics_router)
+app.include_router(backfill_router)
 
 
 @app.middleware("http")
@@ -0,0 +1,291 @@
+from typing import Iterable, List, Tuple
+import asyncio
+import time
+import uuid
+
+from app.application import block_ingestion
+from app.application.block_ingestion import build_ingestion_pipeline
+from app.config import AppConfig
+from app.database import AsyncSessionLocal
+from app.dbo.db_functions import fetch_analyzed_ranges, insert_analyzed_ranges
+from app.utils.enums import BackfillStatus, SwapIngestionMode
+from app.utils.loggers import error_logger, logger
+from app.utils.metrics import register_metrics
+from app.utils.pipeline import Pipeline
+
+
+def merge_ranges(block_numbers: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Agrupa números de bloco em intervalos fechados contíguos.
+    """
+    ranges: List[Tuple[int, int]] = []
+    for number in sorted(set(block_numbers)):
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], number)
+        else:
+            ranges.append((number, number))
+    return ranges
+
+
+def split_ranges(ranges: List[Tuple[int, int]], size: int) -> List[Tuple[int, int]]:
+    """
+    Divide os intervalos em pedaços de até `size` blocos.
+    """
+    return [
+        (start, min(start + size - 1, end))
+        for range_start, end in ranges
+        for start in range(range_start, end + 1, size)
+    ]
+
+
+def missing_ranges(
+    from_block: int, to_block: int, analyzed: List[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    """
+    Intervalos de [from_block, to_block] ainda não cobertos por `analyzed`.
+    """
+    missing = []
+    cursor = from_block
+    for start, end in sorted(analyzed):
+        if end < cursor:
+            continue
+        if start > to_block:
+            break
+        if start > cursor:
+            missing.append((cursor, start - 1))
+        cursor = max(cursor, end + 1)
+    if cursor <= to_block:
+        missing.append((cursor, to_block))
+    return missing
+
+
+class BackfillJob:
+    """
+    Analisa um intervalo histórico de blocos pelo pipeline de ingestão em
+    etapas, com `concurrency` workers na busca dos blocos. O
+    progresso é gravado como intervalos em `analyzed_ranges` a cada
+    `checkpoint_blocks` blocos concluídos, então um job novo sobre o mesmo
+    intervalo (ex.: depois de uma queda) só processa o que falta.
+
+    Com SWAP_INGESTION_MODE=logs, os blocos faltantes são ingeridos em
+    intervalos de até LOGS_BLOCK_RANGE blocos (um eth_getLogs por intervalo,
+    adaptado aos limites do provedor), cada um registrado em
+    `analyzed_ranges` assim que termina.
+    """
+
+    def __init__(
+        self,
+        from_block: int,
+        to_block: int,
+        concurrency: int | None = None,
+        checkpoint_blocks: int | None = None,
+    ):
+        if to_block < from_block:
+            raise ValueError("to_block must be greater than or equal to from_block")
+
+        self.id = uuid.uuid4().hex[:12]
+        self.from_block = from_block
+        self.to_block = to_block
+        self.concurrency = concurrency or AppConfig.BACKFILL_CONCURRENCY
+        self.checkpoint_blocks = (
+            checkpoint_blocks or AppConfig.BACKFILL_CHECKPOINT_BLOCKS
+        )
+
+        self.status = BackfillStatus.pending
+        self.error: str | None = None
+        self.total_blocks = to_block - from_block + 1
+        self.skipped_blocks = 0
+        self.blocks_done = 0
+        self.failed_blocks: List[int] = []
+        self.swaps = 0
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+        self.pipeline: Pipeline | None = None
+        self._pending_checkpoint: List[int] = []
+        self._checkpoint_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def run(self) -> None:
+        self.status = BackfillStatus.running
+        self.started_at = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as session:
+                analyzed = await fetch_analyzed_ranges(
+                    session=session,
+                    from_block=self.from_block,
+                    to_block=self.to_block,
+                )
+            todo = missing_ranges(self.from_block, self.to_block, analyzed)
+            self.skipped_blocks = self.total_blocks - sum(
+                end - start + 1 for start, end in todo
+            )
+            logger.info(
+                f"Backfill {self.id}: {self.from_block}-{self.to_block}, "
+                f"{self.skipped_blocks} blocks already analyzed"
+            )
+
+            if AppConfig.SWAP_INGESTION_MODE == SwapIngestionMode.logs:
+                await self.run_ranges(todo)
+            else:
+                await self.run_blocks(todo)
+            self.status = BackfillStatus.completed
+        except asyncio.CancelledError:
+            self.status = BackfillStatus.cancelled
+            raise
+        except Exception as e:
+            self.status = BackfillStatus.failed
+            self.error = str(e)
+            error_logger.error(f"Backfill {self.id} falhou: {e}")
+        finally:
+            await asyncio.shield(self.checkpoint())
+            self.finished_at = time.monotonic()
+            logger.info(f"Backfill {self.id} {self.status.value}: {self.progress()}")
+
+    async def run_blocks(self, todo: List[Tuple[int, int]]) -> None:
+        # As filas limitadas do pipeline seguram o envio de novos blocos
+        # quando alguma etapa fica para trás
+        self.pipeline = build_ingestion_pipeline(
+            on_done=self.on_block_done,
+            fetch_workers=self.concurrency,
+            detect=AppConfig.BACKFILL_DETECT,
+        )
+        self.pipeline.start()
+        try:
+            for start, end in todo:
+                for block_number in range(start, end + 1):
+                    await self.pipeline.submit(
+                        {"block_number": block_number, "mark_analyzed": False}
+                    )
+            await self.pipeline.join()
+        finally:
+            await self.pipeline.stop()
+
+    async def run_ranges(self, todo: List[Tuple[int, int]]) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _ingest(start: int, end: int) -> None:
+            async with semaphore:
+                try:
+                    swaps = await block_ingestion.ingest_range(
+                        start, end, detect=AppConfig.BACKFILL_DETECT
+                    )
+                except Exception as e:
+                    self.failed_blocks.extend(range(start, end + 1))
+                    error_logger.error(
+                        f"Backfill {self.id} falhou no intervalo {start}-{end}: {e}"
+                    )
+                    return
+
+                self.blocks_done += end - start + 1
+                self.swaps += len(swaps)
+                async with self._checkpoint_lock:
+                    async with AsyncSessionLocal() as session:
+                        await insert_analyzed_ranges(
+                            session=session, ranges=[(start, end)]
+                        )
+
+        await asyncio.gather(
+            *(
+                _ingest(start, end)
+                for start, end in split_ranges(todo, AppConfig.LOGS_BLOCK_RANGE)
+            )
+        )
+
+    async def on_block_done(self, work: dict, error: Exception | None) -> None:
+        block_number = work["block_number"]
+        if error is not None:
+            self.failed_blocks.append(block_number)
+            error_logger.error(
+                f"Backfill {self.id} falhou no bloco {block_number}: {error}"
+            )
+            return
+
+        self.blocks_done += 1
+        self.swaps += len(work["swaps"])
+        self._pending_checkpoint.append(block_number)
+        if len(self._pending_checkpoint) >= self.checkpoint_blocks:
+            await self.checkpoint()
+
+    async def checkpoint(self) -> None:
+        # Um checkpoint por vez: a fusão lê os intervalos vizinhos antes de
+        # gravar e não pode concorrer com outra fusão do mesmo job
+        async with self._checkpoint_lock:
+            if not self._pending_checkpoint:
+                return
+            blocks, self._pending_checkpoint = self._pending_checkpoint, []
+            async with AsyncSessionLocal() as session:
+                await insert_analyzed_ranges(
+                    session=session, ranges=merge_ranges(blocks)
+                )
+
+    def progress(self) -> dict:
+        elapsed = (
+            (self.finished_at or time.monotonic()) - self.started_at
+            if self.started_at is not None
+            else 0.0
+        )
+        blocks_per_second = self.blocks_done / elapsed if elapsed > 0 else 0.0
+        remaining = (
+            self.total_blocks
+            - self.skipped_blocks
+            - self.blocks_done
+            - len(self.failed_blocks)
+        )
+        processed = self.skipped_blocks + self.blocks_done + len(self.failed_blocks)
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "from_block": self.from_block,
+            "to_block": self.to_block,
+            "concurrency": self.concurrency,
+            "total_blocks": self.total_blocks,
+            "skipped_blocks": self.skipped_blocks,
+            "blocks_done": self.blocks_done,
+            "failed_blocks": len(self.failed_blocks),
+            "swaps": self.swaps,
+            "progress_percent": round(100 * processed / self.total_blocks, 2),
+            "elapsed_seconds": round(elapsed, 2),
+            "blocks_per_second": round(blocks_per_second, 3),
+            "swaps_per_second": round(self.swaps / elapsed if elapsed > 0 else 0.0, 3),
+            "eta_seconds": (
+                round(remaining / blocks_per_second, 1)
+                if blocks_per_second > 0 and self.status == BackfillStatus.running
+                else None
+            ),
+            "error": self.error,
+        }
+
+
+backfill_jobs: dict[str, BackfillJob] = {}
+
+
+def start_backfill(
+    from_block: int, to_block: int, concurrency: int | None = None
+) -> BackfillJob:
+    job = BackfillJob(from_block, to_block, concurrency=concurrency)
+    backfill_jobs[job.id] = job
+    job.start()
+    return job
+
+
+def backfill_metrics() -> dict:
+    return {
+        job_id: {
+            **job.progress(),
+            "stages": job.pipeline.stats() if job.pipeline else None,
+        }
+        for job_id, job in backfill_jobs.items()
+        if job.status == BackfillStatus.running
+    }
+
+
+register_metrics("backfill", backfill_metrics)
@@ -0,0 +1,340 @@
+from itertools import groupby
+from typing import Awaitable, Callable, Dict, List
+import asyncio
+
+
+from app.application.sandwich_attack_detector import (
+    detect_multi_layered_burger_sandwiches,
+)
+from app.application.swap_details import (
+    decode_swap_events,
+    get_block_with_receipts,
+    get_swap_pool_addresses,
+    get_swap_transactions_by_logs,
+    has_swap_log,
+    iter_swap_transactions_by_logs,
+)
+from app.application.web3_client.main import async_web3
+from app.application.web3_client.rpc_scheduler import rpc_priority
+from app.config import AppConfig
+from app.database import AsyncSessionLocal
+from app.dbo.db_writer import write_block_swaps, write_range_swaps
+from app.utils.block_cache import format_block_header, is_block_finalized
+from app.utils.enums import RpcPriority, SwapIngestionMode
+from app.utils.loggers import logger
+from app.utils.pipeline import Pipeline, Stage
+from app.utils.pool_metadata import resolve_pools_metadata
+
+
+def block_base_fees(blocks) -> Dict[int, int | None]:
+    return {block["number"]: block.get("baseFeePerGas", None) for block in blocks}
+
+
+async def format_ingested_header(block) -> Dict:
+    """
+    Cabeçalho de um bloco buscado na ingestão. Blocos ainda não finalizados
+    também são salvos: o cabeçalho é substituído se o bloco for buscado de
+    novo depois de uma reorganização.
+    """
+    finalized = await is_block_finalized(async_web3, block["number"])
+    return format_block_header(block, "finalized" if finalized else "not_finalized")
+
+
+def sort_swaps(swaps: List[Dict]) -> List[Dict]:
+    """
+    Ordena os swaps pela posição on-chain (block_number, transaction_index,
+    log_index).
+    """
+    return sorted(
+        swaps,
+        key=lambda s: (int(s["block_number"]), s["transaction_index"], s["log_index"]),
+    )
+
+
+async def resolve_pairs_metadata(swap_pairs) -> None:
+    """
+    Resolve de uma vez (Multicall3) os metadados de todos os pools dos pares.
+    """
+    async with AsyncSessionLocal() as session:
+        await resolve_pools_metadata(
+            async_web3=async_web3,
+            pool_addresses=get_swap_pool_addresses(
+                async_web3, [receipt for _, receipt in swap_pairs]
+            ),
+            session=session,
+        )
+
+
+async def decode_swap_pairs(
+    swap_pairs, base_fees: Dict[int, int | None], concurrency: int | None = None
+) -> List[Dict]:
+    """
+    Decodifica os swaps dos pares (transação, recibo) em paralelo, limitado
+    por `concurrency` tarefas simultâneas.
+    """
+    semaphore = asyncio.Semaphore(concurrency or AppConfig.BLOCK_INGESTION_CONCURRENCY)
+
+    async def _decode(tx, receipt):
+        async with semaphore:
+            # Cada tarefa abre a própria sessão: AsyncSession não pode ser
+            # compartilhada entre corrotinas concorrentes.
+            async with AsyncSessionLocal() as session:
+                return await decode_swap_events(
+                    async_web3=async_web3,
+                    tx_hash=tx["hash"].hex(),
+                    tx=tx,
+                    receipt=receipt,
+                    session=session,
+                    base_fee_per_gas=base_fees.get(tx["blockNumber"]),
+                )
+
+    results = await asyncio.gather(
+        *(_decode(tx, receipt) for tx, receipt in swap_pairs)
+    )
+
+    swaps = [detail for details in results if details for detail in details]
+    return sort_swaps(swaps)
+
+
+async def decode_transactions(
+    pairs, base_fees: Dict[int, int | None], concurrency: int | None = None
+) -> List[Dict]:
+    """
+    Filtra os pares com log de Swap, resolve os metadados dos pools e
+    decodifica os swaps.
+    """
+    # Transações sem log de Swap não precisam de nenhuma chamada adicional
+    swap_pairs = [(tx, receipt) for tx, receipt in pairs if has_swap_log(receipt)]
+
+    await resolve_pairs_metadata(swap_pairs)
+    return await decode_swap_pairs(swap_pairs, base_fees, concurrency=concurrency)
+
+
+async def extract_range_swaps(
+    from_block: int,
+    to_block: int,
+    concurrency: int | None = None,
+    work: Dict | None = None,
+) -> List[Dict]:
+    """
+    Extrai os swaps de um intervalo de blocos descobrindo-os via eth_getLogs:
+    só as transações que emitiram Swap têm transação e recibo baixados. Cada
+    grupo de transações é decodificado assim que chega, sem acumular os
+    recibos do intervalo inteiro. Se `work` for informado, recebe o
+    baseFeePerGas e os cabeçalhos dos blocos com swaps.
+    """
+    swaps = []
+    base_fees = {}
+    headers = []
+    transaction_count = 0
+    with rpc_priority(RpcPriority.bulk):
+        async for blocks, pairs in iter_swap_transactions_by_logs(
+            async_web3=async_web3, from_block=from_block, to_block=to_block
+        ):
+            chunk_base_fees = block_base_fees(blocks)
+            base_fees.update(chunk_base_fees)
+            if work is not None:
+                headers.extend([await format_ingested_header(b) for b in blocks])
+            transaction_count += len(pairs)
+            swaps.extend(
+                await decode_transactions(
+                    pairs, chunk_base_fees, concurrency=concurrency
+                )
+            )
+
+    logger.info(
+        f"Ingested blocks {from_block}-{to_block} by logs "
+        f"({transaction_count} swap transactions)"
+    )
+    if work is not None:
+        work["base_fees"] = base_fees
+        work["headers"] = headers
+    # os grupos chegam na ordem dos blocos
+    return swaps
+
+
+async def ingest_range(
+    from_block: int,
+    to_block: int,
+    concurrency: int | None = None,
+    detect: bool = False,
+) -> List[Dict]:
+    """
+    Extrai os swaps do intervalo via eth_getLogs e os persiste em uma única
+    transação, sem marcar os blocos como analisados (o backfill registra o
+    intervalo por conta própria). Com `detect`, roda a detecção
+    multi-layered em cada bloco com swaps. Retorna os swaps ordenados.
+    """
+    work = {}
+    swaps = await extract_range_swaps(
+        from_block, to_block, concurrency=concurrency, work=work
+    )
+    await write_range_swaps(swaps, headers=work["headers"])
+
+    if detect:
+        for block_number, block_swaps in groupby(
+            swaps, key=lambda s: int(s["block_number"])
+        ):
+            await detect_stage(
+                {
+                    "block_number": block_number,
+                    "swaps": list(block_swaps),
+                    "base_fees": work["base_fees"],
+                }
+            )
+
+    return swaps
+
+
+async def extract_block_swaps(
+    block_number: int, concurrency: int | None = None, work: Dict | None = None
+) -> List[Dict]:
+    """
+    Extrai os swaps do bloco conforme SWAP_INGESTION_MODE: pelos recibos do
+    bloco inteiro (O(1) chamadas RPC) ou por eth_getLogs. Executa as mesmas
+    etapas do pipeline de ingestão, em sequência, com prioridade "bulk" nas
+    chamadas RPC para ceder vez ao tráfego da API. Se `work` for informado,
+    é completado no lugar (ex.: com o cabeçalho do bloco).
+    """
+    work = {} if work is None else work
+    work["block_number"] = block_number
+    await fetch_block_stage(work)
+    logger.info(
+        f"Ingesting block {block_number} ({len(work['pairs'])} swap transactions)"
+    )
+
+    await resolve_metadata_stage(work)
+    with rpc_priority(RpcPriority.bulk):
+        return await decode_swap_pairs(
+            work["pairs"], work["base_fees"], concurrency=concurrency
+        )
+
+
+async def ingest_block(
+    block_number: int,
+    concurrency: int | None = None,
+    mark_analyzed: bool = True,
+) -> List[Dict]:
+    """
+    Extrai os swaps do bloco, persiste em `transactions_swap` e marca o bloco
+    como analisado (a menos que o chamador registre isso por conta própria,
+    como o backfill). Retorna os swaps ordenados.
+    """
+    work = {}
+    swaps = await extract_block_swaps(block_number, concurrency=concurrency, work=work)
+
+    # Aguarda o commit: quem chamou lê os swaps do banco em seguida
+    await write_block_swaps(
+        block_number=block_number,
+        swaps=swaps,
+        mark_analyzed=mark_analyzed,
+        header=work.get("header"),
+    )
+
+    return swaps
+
+
+# — Etapas do pipeline de ingestão —
+# Cada etapa recebe o dict de trabalho do bloco e o completa no lugar:
+# block_number -> base_fees/pairs/header -> swaps -> (persistido) -> detected
+
+
+async def fetch_block_stage(work: Dict) -> None:
+    block_number = work["block_number"]
+    with rpc_priority(RpcPriority.bulk):
+        if AppConfig.SWAP_INGESTION_MODE == SwapIngestionMode.logs:
+            # Por logs o bloco só é buscado se tiver swaps
+            blocks, pairs = await get_swap_transactions_by_logs(
+                async_web3=async_web3, from_block=block_number, to_block=block_number
+            )
+        else:
+            block, pairs = await get_block_with_receipts(
+                async_web3=async_web3, block_number=block_number
+            )
+            blocks = [block]
+        base_fees = block_base_fees(blocks)
+        if blocks:
+            work["header"] = await format_ingested_header(blocks[0])
+
+    work["base_fees"] = base_fees
+    work["pairs"] = [(tx, receipt) for tx, receipt in pairs if has_swap_log(receipt)]
+
+
+async def resolve_metadata_stage(work: Dict) -> None:
+    with rpc_priority(RpcPriority.bulk):
+        await resolve_pairs_metadata(work["pairs"])
+
+
+async def decode_stage(work: Dict) -> None:
+    with rpc_priority(RpcPriority.bulk):
+        work["swaps"] = await decode_swap_pairs(work["pairs"], work["base_fees"])
+    # Os recibos não são mais necessários: libera memória antes das filas
+    del work["pairs"]
+
+
+async def persist_stage(work: Dict) -> None:
+    await write_block_swaps(
+        block_number=work["block_number"],
+        swaps=work["swaps"],
+        mark_analyzed=work.get("mark_analyzed", True),
+        header=work.get("header"),
+    )
+
+
+async def detect_stage(work: Dict) -> None:
+    block_number = work["block_number"]
+    async with AsyncSessionLocal() as session:
+        work["detected"] = await detect_multi_layered_burger_sandwiches(
+            session=session,
+            block={"number": block_number, "transactions": work["swaps"]},
+            base_fee_per_gas=work["base_fees"].get(block_number) or 0,
+        )
+
+
+def build_ingestion_pipeline(
+    on_done: Callable[[Dict, Exception | None], Awaitable[None]] | None = None,
+    fetch_workers: int | None = None,
+    detect: bool = False,
+) -> Pipeline:
+    """
+    Monta o pipeline de ingestão em etapas (busca do bloco e recibos,
+    metadados dos pools, decodificação, persistência e, opcionalmente,
+    detecção), cada uma com seus workers e fila limitada.
+    """
+    queue_size = AppConfig.PIPELINE_QUEUE_SIZE
+    stages = [
+        Stage(
+            "fetch",
+            fetch_block_stage,
+            workers=fetch_workers or AppConfig.PIPELINE_FETCH_WORKERS,
+            queue_size=queue_size,
+        ),
+        Stage(
+            "metadata",
+            resolve_metadata_stage,
+            workers=AppConfig.PIPELINE_METADATA_WORKERS,
+            queue_size=queue_size,
+        ),
+        Stage(
+            "decode",
+            decode_stage,
+            workers=AppConfig.PIPELINE_DECODE_WORKERS,
+            queue_size=queue_size,
+        ),
+        Stage(
+            "persist",
+            persist_stage,
+            workers=AppConfig.PIPELINE_PERSIST_WORKERS,
+            queue_size=queue_size,
+        ),
+    ]
+    if detect:
+        stages.append(
+            Stage(
+                "detect",
+                detect_stage,
+                workers=AppConfig.PIPELINE_DETECT_WORKERS,
+                queue_size=queue_size,
+            )
+        )
+    return Pipeline(stages, on_done=on_done)
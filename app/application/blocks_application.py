@@ -1,65 +1,75 @@
 from typing import Dict, List
 import asyncio
+import time
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.application.block_ingestion import ingest_block
 from app.application.sandwich_attack_detector import (
+    MULTI_LAYERED_DETECTOR_VERSION,
     detect_cross_dex_sandwiches,
     detect_multi_layered_burger_sandwiches,
     detect_single_dex_sandwiches,
 )
-from app.application.swap_details import (
-    get_all_swap_details_web3,
-)
+from app.application.web3_client.head_follower import head_follower
 from app.application.web3_client.main import async_web3
+from app.application.web3_client.provider_pool import hedged_requests
+from app.config import AppConfig
 
 from app.dbo.db_functions import (
-    fetch_transactions_swap_by_block_number,
+    fetch_swap_records_by_block_number,
     fetch_transactions_swap_by_hash,
     get_analyzed_blocks_by_block_number,
+    get_multi_layered_analysis,
+    get_multi_layered_sandwiches,
+    get_single_dex_analysis,
     get_sandwich_attacks_by_block_grouped_by_attack_group,
-    insert_block_analyzed,
-    insert_transaction_swap,
 )
-from app.dto.schemas import TransactionSwapSchema
+from app.dbo.db_writer import write_multi_layered_sandwiches
+from app.utils.block_cache import (
+    cache_finalized_block_header,
+    format_block_header,
+    get_finalized_block_header,
+    get_head_block,
+)
 from app.utils.loggers import logger
+from app.utils.single_flight import SingleFlight
 
 
 async def get_block_by_number_application(block_number: int):
-    block = await async_web3.eth.get_block(block_number, full_transactions=False)
-
-    transactions_hashes = block["transactions"]
+    # Blocos recentes já estão no buffer do head follower
+    recent_block = head_follower.get_block(block_number)
+    if recent_block is not None:
+        return recent_block
+
+    # Blocos finalizados são imutáveis: servidos do cache sem nenhuma chamada RPC
+    cached_block = await get_finalized_block_header(block_number)
+    if cached_block is not None:
+        return cached_block
+
+    with hedged_requests():
+        block, finalized_head = await asyncio.gather(
+            async_web3.eth.get_block(block_number, full_transactions=False),
+            get_head_block(async_web3, "finalized"),
+        )
 
-    finalized_head = await async_web3.eth.get_block("finalized")
     if block_number <= finalized_head["number"]:
         block_status = "finalized"
     else:
         block_status = "not_finalized"
 
-    block_data = {
-        "hash": block["hash"].hex(),
-        "number": block["number"],
-        "nonce": block["nonce"],
-        "miner": block["miner"],
-        "parent_hash": block["parentHash"].hex(),
-        "timestamp": block["timestamp"],
-        "status": block_status,
-        "size": block.get("size", 0),
-        "gas_used": block["gasUsed"],
-        "base_fee_per_gas": block.get("baseFeePerGas"),
-        "gas_limit": block["gasLimit"],
-        "difficulty": block.get("difficulty", 0),
-        "total_difficulty": block.get("totalDifficulty", 0),
-        "withdrawals": block.get("withdrawals", []),
-        "extra_data": block.get("extraData", "").hex(),
-        "transactions_hashes": [tx.hex() for tx in transactions_hashes],
-    }
+    block_data = format_block_header(block, block_status)
+
+    if block_status == "finalized":
+        await cache_finalized_block_header(block_data)
 
     return block_data
 
 
 async def fetch_blocks_application(page: int, per_page: int):
-    latest_block = await async_web3.eth.get_block("latest")
+    latest_block = head_follower.latest_block() or await get_head_block(
+        async_web3, "latest"
+    )
     latest_block_number = latest_block["number"]
 
     start_block = max(0, latest_block_number - (page - 1) * per_page)
@@ -111,146 +121,204 @@ def group_by_attack_group_id(attacks_info: List[Dict]):
     return list(groups.values())
 
 
+single_sandwich_flight = SingleFlight("single_sandwich_analysis")
+multi_layered_sandwich_flight = SingleFlight("multi_layered_sandwich_analysis")
+
+
 async def fetch_sandwiches_attack_by_block_number_application(
     session: AsyncSession, block_number: int
 ):
+    # Requisições simultâneas para o mesmo bloco compartilham uma única análise
+    return await single_sandwich_flight.do(
+        block_number,
+        lambda: analyze_single_dex_sandwiches(
+            session=session, block_number=block_number
+        ),
+    )
+
+
+async def stored_single_dex_response(session: AsyncSession, block_number: int):
+    attacks_info = await get_sandwich_attacks_by_block_grouped_by_attack_group(
+        session=session,
+        block_number=block_number,
+    )
+    sandwiches = group_by_attack_group_id(attacks_info)
+    return {
+        "block_number": block_number,
+        "sandwiches": sandwiches,
+        "total_sandwiches": len(sandwiches),
+    }
+
+
+async def analyze_single_dex_sandwiches(session: AsyncSession, block_number: int):
+    # Bloco já analisado: os grupos salvos são a resposta
+    total_sandwiches = await get_single_dex_analysis(
+        session=session, block_number=block_number
+    )
+    if total_sandwiches is not None:
+        return await stored_single_dex_response(session, block_number)
+
     block_analyzed = await get_analyzed_blocks_by_block_number(
         session=session,
         block_number=block_number,
     )
 
     if block_analyzed:
-        swaps_objects = await fetch_transactions_swap_by_block_number(
+        swaps = await fetch_swap_records_by_block_number(
             session=session,
             block_number=block_number,
         )
 
-        swaps = [
-            TransactionSwapSchema.model_validate(s).model_dump(by_alias=True)
-            for s in swaps_objects
-        ]
-
         bloco_dict = {"number": block_number, "transactions": swaps}
     else:
-        block = await async_web3.eth.get_block(block_number, full_transactions=False)
-        tx_hashes = block["transactions"]
-        print(len(tx_hashes), "transactions in block", block_number)
-
-        swaps = []
-        count = 0
-        for hashes in tx_hashes:
-            txh = hashes.hex() if hasattr(hashes, "hex") else hashes
-            details = await get_all_swap_details_web3(
-                async_web3=async_web3,
-                tx_hash=txh,
-                session=session,
-                base_fee_per_gas=block.get("baseFeePerGas", None),
-            )
-            print(f"Finish swap detail for {txh} - count: {count}")
-            count += 1
-            if details:
-                for detail in details:
-                    await insert_transaction_swap(
-                        session=session,
-                        swap_data=detail,
-                    )
-                    swaps.append(detail)
-            # if count >= 9:
-            #     break
+        swaps = await ingest_block(block_number=block_number)
 
         bloco_dict = {"number": block_number, "transactions": swaps}
 
-        await insert_block_analyzed(
-            session=session,
-            block_number=block_number,
-        )
-
-    detected = await detect_single_dex_sandwiches(session=session, block=bloco_dict)
+    await detect_single_dex_sandwiches(session=session, block=bloco_dict)
 
-    return {
-        "block_number": block_number,
-        "sandwiches": detected,
-        "total_sandwiches": len(detected),
-    }
+    # A resposta vem do que foi gravado, com os mesmos ids das próximas
+    # requisições. A gravação usa outra conexão: encerra a transação de
+    # leitura desta sessão para enxergar o commit.
+    await session.rollback()
+    return await stored_single_dex_response(session, block_number)
 
 
 async def fetch_multi_layered_burger_sandwiches(
     session: AsyncSession, block_number: int
 ):
-    block = await async_web3.eth.get_block(block_number, full_transactions=False)
-    tx_hashes = block["transactions"]
-    print(len(tx_hashes), "transactions in block", block_number)
+    return await multi_layered_sandwich_flight.do(
+        block_number,
+        lambda: analyze_multi_layered_burger_sandwiches(
+            session=session, block_number=block_number
+        ),
+    )
 
-    swaps = []
-    count = 0
 
-    block_analyzed = await get_analyzed_blocks_by_block_number(
-        session=session,
-        block_number=block_number,
+def is_reorged_out(analysis, block_number: int) -> bool:
+    """
+    O bloco analisado foi substituído por uma reorganização: para blocos
+    recentes, o hash salvo não é mais o do buffer do head follower.
+    """
+    block = head_follower.get_block(block_number)
+    return (
+        block is not None
+        and analysis.block_hash is not None
+        and block["hash"].removeprefix("0x") != analysis.block_hash
     )
 
-    if block_analyzed:
-        swaps = await fetch_transactions_swap_by_block_number(
+
+def is_price_retry_due(analysis) -> bool:
+    if analysis.prices_resolved is not False:
+        return False
+    age = time.time() - (analysis.analyzed_at or 0)
+    return age >= AppConfig.MULTI_LAYERED_PRICE_RETRY_INTERVAL
+
+
+async def analyze_multi_layered_burger_sandwiches(
+    session: AsyncSession, block_number: int
+):
+    analysis = await get_multi_layered_analysis(
+        session=session, block_number=block_number
+    )
+    reorged = analysis is not None and is_reorged_out(analysis, block_number)
+
+    # Resultado já salvo por esta versão do detector: sem RPC nem preços
+    if (
+        analysis is not None
+        and analysis.detector_version == MULTI_LAYERED_DETECTOR_VERSION
+        and not reorged
+        and not is_price_retry_due(analysis)
+    ):
+        detected = await get_multi_layered_sandwiches(
             session=session,
             block_number=block_number,
+            detector_version=MULTI_LAYERED_DETECTOR_VERSION,
         )
-    else:
-        for hashes in tx_hashes:
-            txh = hashes.hex() if hasattr(hashes, "hex") else hashes
-
-            # details = await fetch_transactions_swap_by_hash(
-            #     session=session,
-            #     hash_value=txh,
-            # )
-
-            details = await get_all_swap_details_web3(
-                async_web3=async_web3,
-                tx_hash=txh,
+        swaps = []
+        if detected:
+            swaps = await fetch_swap_records_by_block_number(
                 session=session,
-                base_fee_per_gas=block.get("baseFeePerGas", None),
+                block_number=block_number,
             )
+        return build_multi_layered_response(block_number, detected, swaps)
 
-            if details:
-                for detail in details:
-                    await insert_transaction_swap(
-                        session=session,
-                        swap_data=detail,
-                    )
+    block_analyzed = await get_analyzed_blocks_by_block_number(
+        session=session,
+        block_number=block_number,
+    )
 
-            print(f"Finish swap detail for {txh} - count: {count}")
+    # Numa nova tentativa de preços os swaps salvos continuam valendo; um
+    # bloco substituído é extraído de novo
+    if not block_analyzed or reorged:
+        await ingest_block(block_number=block_number)
 
-            # if count >= 3:
-            #     break
-            count += 1
+    # Blocos recentes já estão no buffer do head follower; os finalizados
+    # tiveram o cabeçalho salvo na ingestão
+    block = head_follower.get_block(block_number) or await get_finalized_block_header(
+        block_number
+    )
+    if block is not None:
+        base_fee_per_gas = block["base_fee_per_gas"]
+        block_hash = block["hash"]
+    else:
+        block = await async_web3.eth.get_block(block_number, full_transactions=False)
+        base_fee_per_gas = block.get("baseFeePerGas", 0)
+        block_hash = block["hash"].hex()
 
-        await insert_block_analyzed(session=session, block_number=block_number)
-        swaps = await fetch_transactions_swap_by_block_number(
-            session=session,
-            block_number=block_number,
-        )
+    swaps = await fetch_swap_records_by_block_number(
+        session=session,
+        block_number=block_number,
+    )
 
     bloco_dict = {"number": block_number, "transactions": swaps}
     detected = await detect_multi_layered_burger_sandwiches(
         session=session,
         block=bloco_dict,
-        base_fee_per_gas=block.get("baseFeePerGas", 0),
+        base_fee_per_gas=base_fee_per_gas or 0,
+    )
+    # Guardado também para blocos ainda reorganizáveis (o hash invalida o
+    # resultado se o bloco for substituído) e com preços faltando (tentados
+    # de novo depois de MULTI_LAYERED_PRICE_RETRY_INTERVAL)
+    await write_multi_layered_sandwiches(
+        block_number,
+        MULTI_LAYERED_DETECTOR_VERSION,
+        detected,
+        block_hash=block_hash,
+        prices_resolved=all(
+            sandwich.get("prices_resolved", True) for sandwich in detected
+        ),
     )
 
-    swap_dict = swaps
-    if type(swaps[0]) is not dict:
-        swap_dict = {f"{swap.hash}_{swap.log_index}": swap for swap in swaps}
+    return build_multi_layered_response(block_number, detected, swaps)
+
+
+# Detalhamento salvo no banco mas fora da resposta da API
+MULTI_LAYERED_HIDDEN_FIELDS = (
+    "front_run_log_index",
+    "back_run_log_index",
+    "front_burned_eth",
+    "front_tipped_eth",
+    "back_burned_eth",
+    "back_tipped_eth",
+    "front_burned_usd",
+    "front_tipped_usd",
+    "back_burned_usd",
+    "back_tipped_usd",
+    "prices_resolved",
+)
 
-    for attack in detected:
-        # Busca os detalhes completos usando os hashes
-        front_swap = []
-        for hash_with_log_index in attack["front_run"]:
-            front_swap.append(swap_dict.get(hash_with_log_index))
 
-        back_swap = []
-        for hash_with_log_index in attack["back_run"]:
-            back_swap.append(swap_dict.get(hash_with_log_index))
+def build_multi_layered_response(block_number: int, detected: List[Dict], swaps):
+    swap_dict = {f"{swap['hash']}_{swap['log_index']}": swap for swap in swaps}
 
-        victims_swaps = [swap_dict.get(tx) for tx in attack["victims_txs"]]
+    sandwiches = []
+    for attack in detected:
+        attack = dict(attack)
+        # Busca os detalhes completos usando os hashes
+        front_swap = [swap_dict.get(tx) for tx in attack.pop("front_run")]
+        back_swap = [swap_dict.get(tx) for tx in attack.pop("back_run")]
+        victims_swaps = [swap_dict.get(tx) for tx in attack.pop("victims_txs")]
 
         # Remove possíveis valores None (caso algum hash não esteja no swap_dict)
         victims_swaps = [s for s in victims_swaps if s is not None]
@@ -260,37 +328,14 @@ async def fetch_multi_layered_burger_sandwiches(
             "victims": victims_swaps,
             "back_run": back_swap,
         }
-
-        del attack["front_run"]
-        del attack["back_run"]
-        del attack["victims_txs"]
-        del attack["front_run_log_index"]
-        del attack["back_run_log_index"]
-        del attack["front_burned_eth"]
-        del attack["front_tipped_eth"]
-        del attack["back_burned_eth"]
-        del attack["back_tipped_eth"]
-        del attack["front_burned_usd"]
-        del attack["front_tipped_usd"]
-        del attack["back_burned_usd"]
-        del attack["back_tipped_usd"]
-
-    # await insert_block_analyzed(
-    #     session=session,
-    #     block_number=block_number,
-    # )
-
-    # attacks_info = await get_sandwich_attacks_by_block_grouped_by_attack_group(
-    #     session=session,
-    #     block_number=block_number,
-    # )
-
-    # attacks_info_grouped = group_by_attack_group_id(attacks_info)
+        for field in MULTI_LAYERED_HIDDEN_FIELDS:
+            attack.pop(field, None)
+        sandwiches.append(attack)
 
     return {
         "block_number": block_number,
-        "sandwiches": detected,
-        "total_sandwiches": len(detected),
+        "sandwiches": sandwiches,
+        "total_sandwiches": len(sandwiches),
     }
 
 
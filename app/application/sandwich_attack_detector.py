@@ -1,12 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dbo.db_functions import (
-    save_detected_sandwich,
-)
-from app.dto.schemas import TransactionSwapSchema
+from app.dbo.db_writer import write_single_dex_sandwiches
 from app.utils.tokens_price import get_binance_price, get_token_decimals
 from collections import defaultdict
 
+# Versão de detect_multi_layered_burger_sandwiches gravada com os resultados:
+# incrementar ao mudar critérios ou cálculos para que os blocos sejam
+# reanalisados
+MULTI_LAYERED_DETECTOR_VERSION = 1
+
 
 def make_swap_dict(tx, transition_type):
     return {
@@ -26,8 +28,10 @@ def make_swap_dict(tx, transition_type):
 async def detect_single_dex_sandwiches(session: AsyncSession, block, amount_tol=0.01):
     txs = block["transactions"]
     detected = []
+    # (ta1, tv, ta2) por hashes: uma transação com vários logs de Swap que
+    # casam geraria o mesmo sanduíche mais de uma vez
+    sandwiches = {}
     n = len(txs)
-    count = 0
 
     for j in range(n):
         tv = txs[j]
@@ -56,6 +60,9 @@ async def detect_single_dex_sandwiches(session: AsyncSession, block, amount_tol=
 
                 ta2 = txs[k]
 
+                # front e back-run na mesma transação não cercam a vítima
+                if ta2["hash"] == ta1["hash"]:
+                    continue
                 if ta2["from"] != ta1["from"]:
                     continue
                 if ta2["tokenIn"] != target or ta2["to"] != dex:
@@ -69,22 +76,27 @@ async def detect_single_dex_sandwiches(session: AsyncSession, block, amount_tol=
                 # ):
                 #     continue
 
-                await save_detected_sandwich(session, block, ta1, tv, ta2)
-                count += 1
+                key = (ta1["hash"], tv["hash"], ta2["hash"])
+                if key in sandwiches:
+                    continue
+                sandwiches[key] = (ta1, tv, ta2)
                 detected.append(
                     {
-                        "attack_group_id": count,
-                        "block_number": str(block["number"]),
+                        "attack_group_id": len(sandwiches),
+                        "block_number": block["number"],
                         "ta1": ta1["hash"],
                         "tv": tv["hash"],
                         "ta2": ta2["hash"],
                         "swaps": [
                             make_swap_dict(ta1, "attacker"),
                             make_swap_dict(tv, "victim"),
-                            make_swap_dict(ta2, "victim"),
+                            make_swap_dict(ta2, "attacker"),
                         ],
                     }
                 )
+
+    # uma única escrita por bloco, também quando não há sanduíches
+    await write_single_dex_sandwiches(block["number"], list(sandwiches.values()))
     return detected
 
 
@@ -101,11 +113,9 @@ async def detect_multi_layered_burger_sandwiches(
         tokens_price["ETH"] = await get_binance_price("ETH")
     eth_price_usd = tokens_price["ETH"]
 
-    raw_txs = block["transactions"]
-    txs = [
-        TransactionSwapSchema.model_validate(s).model_dump(by_alias=True)
-        for s in raw_txs
-    ]
+    # Swaps no formato da ingestão (fetch_swap_records_by_block_number ou
+    # decode_swap_events): usados como estão, sem revalidação
+    txs = block["transactions"]
     detected = []
     swap_single_sandwiches = []
     n = len(txs)
@@ -184,8 +194,8 @@ async def detect_multi_layered_burger_sandwiches(
                     front_tipped_eth = (
                         front_gas_used * max(front_gas_price - base_fee_per_gas, 0)
                     ) / 1e18
-                    front_burned_usd = front_burned_eth * eth_price_usd
-                    front_tipped_usd = front_tipped_eth * eth_price_usd
+                    front_burned_usd = front_burned_eth * (eth_price_usd or 0)
+                    front_tipped_usd = front_tipped_eth * (eth_price_usd or 0)
 
                     # ---------- GÁS (back) ----------
                     back_gas_used = float(tb.get("gasUsed", 0))
@@ -194,8 +204,8 @@ async def detect_multi_layered_burger_sandwiches(
                     back_tipped_eth = (
                         back_gas_used * max(back_gas_price - base_fee_per_gas, 0)
                     ) / 1e18
-                    back_burned_usd = back_burned_eth * eth_price_usd
-                    back_tipped_usd = back_tipped_eth * eth_price_usd
+                    back_burned_usd = back_burned_eth * (eth_price_usd or 0)
+                    back_tipped_usd = back_tipped_eth * (eth_price_usd or 0)
 
                     cost_amount = 0
                     gain_amount = 0
@@ -210,7 +220,17 @@ async def detect_multi_layered_burger_sandwiches(
                             tb.get("amountOut", 0), tb_token_out_decimals
                         )
                         cost_usd = cost_amount * token_in_price_usd
-                        gain_usd = gain_amount * tb_token_out_price_usd
+                        gain_usd = gain_amount * (tb_token_out_price_usd or 0)
+
+                    # Sem algum preço os valores em USD ficam zerados: o
+                    # resultado não deve ser guardado como definitivo
+                    prices_resolved = None not in (
+                        eth_price_usd,
+                        token_in_price_usd,
+                        tb_token_out_price_usd,
+                        token_in_decimals,
+                        tb_token_out_decimals,
+                    )
 
                     total_cost_usd = cost_usd + front_burned_usd + front_tipped_usd
                     total_gain_usd = gain_usd - (back_burned_usd + back_tipped_usd)
@@ -238,6 +258,7 @@ async def detect_multi_layered_burger_sandwiches(
                             "front_tipped_usd": front_tipped_usd,
                             "back_burned_usd": back_burned_usd,
                             "back_tipped_usd": back_tipped_usd,
+                            "prices_resolved": prices_resolved,
                         }
                     )
                     print(
@@ -276,6 +297,7 @@ async def detect_multi_layered_burger_sandwiches(
             merged = group[0].copy()
             merged["victims_addr"] = victims_addr
             merged["victims_txs"] = victims_txs
+            merged["prices_resolved"] = all(g["prices_resolved"] for g in group)
 
             merged["front_run"] = list(
                 set([f'{g["front_run"]}_{g["front_run_log_index"]}' for g in group])
@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+from app.application.blocks_application import fetch_multi_layered_burger_sandwiches
+from app.application.web3_client.head_follower import HeadFollower, head_follower
+from app.config import AppConfig
+from app.database import AsyncSessionLocal
+from app.utils.loggers import error_logger, logger
+from app.utils.metrics import register_metrics
+
+
+class SandwichPipeline:
+    """
+    Analisa cada bloco anunciado pelo head follower depois de
+    `confirmations` blocos: extrai e persiste os swaps em
+    `transactions_swap`, marca o bloco como analisado e roda a detecção
+    multi-layered. Usa o mesmo caminho (e o mesmo single-flight) da rota
+    `/blocks/{n}/multiple_sandwich`, que para blocos recentes passa a ser só
+    leitura do banco.
+
+    Esperar as confirmações evita gravar blocos que uma reorganização ainda
+    vai descartar; o resultado salvo guarda o hash do bloco e é refeito se
+    uma reorganização mais profunda o substituir. A fila guarda até `queue_size` blocos; cheia, os mais
+    antigos são descartados (continuam disponíveis sob demanda pela rota).
+    """
+
+    def __init__(
+        self,
+        follower: HeadFollower,
+        workers: int = 2,
+        confirmations: int = 0,
+        queue_size: int = 64,
+    ):
+        self.follower = follower
+        self.workers = workers
+        self.confirmations = confirmations
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # próximo bloco a confirmar
+        self.next_block: int | None = None
+
+        self.blocks_dropped = 0
+        self.blocks_processed = 0
+        self.blocks_failed = 0
+        self.sandwiches_detected = 0
+        self.last_block: int | None = None
+        self.lag_seconds: float | None = None
+
+        self._tasks: list[asyncio.Task] = []
+        follower.add_listener(self.enqueue)
+
+    def enqueue(self, block_data: dict) -> None:
+        if not self._tasks:
+            return
+        confirmed = block_data["number"] - self.confirmations
+        if self.next_block is None:
+            self.next_block = confirmed
+        while self.next_block <= confirmed:
+            number = self.next_block
+            self.next_block += 1
+            confirmed_block = self.follower.buffered_block(number)
+            if confirmed_block is not None:
+                self._put(confirmed_block)
+
+    def _put(self, block_data: dict) -> None:
+        if self.queue.full():
+            # prioriza os blocos mais novos
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.blocks_dropped += 1
+        self.queue.put_nowait(block_data)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self.worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def worker(self) -> None:
+        while True:
+            block_data = await self.queue.get()
+            try:
+                await self.process_block(block_data)
+            except Exception as e:
+                self.blocks_failed += 1
+                error_logger.error(
+                    f"Pipeline falhou no bloco {block_data['number']}: {e}"
+                )
+            finally:
+                self.queue.task_done()
+
+    async def process_block(self, block_data: dict) -> None:
+        block_number = block_data["number"]
+        async with AsyncSessionLocal() as session:
+            result = await fetch_multi_layered_burger_sandwiches(
+                session=session, block_number=block_number
+            )
+
+        self.blocks_processed += 1
+        self.sandwiches_detected += result["total_sandwiches"]
+        self.last_block = max(self.last_block or 0, block_number)
+        # Tempo entre a produção do bloco e o fim da análise
+        self.lag_seconds = time.time() - block_data["timestamp"]
+        logger.info(
+            f"Pipeline analyzed block {block_number} "
+            f"({result['total_sandwiches']} sandwiches, lag {self.lag_seconds:.1f}s)"
+        )
+
+    def stats(self) -> dict:
+        head = self.follower.blocks[-1]["number"] if self.follower.blocks else None
+        return {
+            "running": bool(self._tasks),
+            "queued_blocks": self.queue.qsize(),
+            "last_block": self.last_block,
+            "blocks_behind_head": (
+                head - self.last_block
+                if head is not None and self.last_block is not None
+                else None
+            ),
+            "lag_seconds": (
+                round(self.lag_seconds, 2) if self.lag_seconds is not None else None
+            ),
+            "blocks_processed": self.blocks_processed,
+            "blocks_dropped": self.blocks_dropped,
+            "blocks_failed": self.blocks_failed,
+            "sandwiches_detected": self.sandwiches_detected,
+        }
+
+
+sandwich_pipeline = SandwichPipeline(
+    head_follower,
+    workers=AppConfig.SANDWICH_PIPELINE_WORKERS,
+    confirmations=AppConfig.SANDWICH_PIPELINE_CONFIRMATIONS,
+    queue_size=AppConfig.SANDWICH_PIPELINE_QUEUE_SIZE,
+)
+
+register_metrics("sandwich_pipeline", sandwich_pipeline.stats)
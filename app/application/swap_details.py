@@ -1,3 +1,4 @@
+from typing import Any, AsyncIterator, Callable
 from fastapi import Request
 from web3._utils.events import get_event_data
 from eth_utils import event_abi_to_log_topic
@@ -8,9 +9,13 @@ import json
 import os
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
-from web3.types import TxData, TxReceipt
+from web3.exceptions import MethodNotSupported, Web3RPCError
+from web3.types import BlockData, LogReceipt, TxData, TxReceipt
 
+from app.config import AppConfig
 from app.utils.get_dex_name import get_dex_name
+from app.utils.loggers import logger
+from app.utils.pool_metadata import get_pool_metadata
 
 ERC20_ABI = [
     {
@@ -249,22 +254,10 @@ async def get_swap_details_web3(
                 ["uint256", "uint256", "uint256", "uint256"], log.data
             )
 
-            pair = async_web3.eth.contract(address=log.address, abi=PAIR_ABI)
-            addr0_task = asyncio.create_task(pair.functions.token0().call())
-            addr1_task = asyncio.create_task(pair.functions.token1().call())
-            addr0, addr1 = await asyncio.gather(addr0_task, addr1_task)
-
-            # busca símbolos ERC-20
-            token0_contract = async_web3.eth.contract(address=addr0, abi=ERC20_ABI)
-            token1_contract = async_web3.eth.contract(address=addr1, abi=ERC20_ABI)
-            try:
-                sym0 = await token0_contract.functions.symbol().call()
-            except:
-                sym0 = addr0
-            try:
-                sym1 = await token1_contract.functions.symbol().call()
-            except:
-                sym1 = addr1
+            metadata = await get_pool_metadata(
+                async_web3=async_web3, pool_address=pool_addr, session=session
+            )
+            sym0, sym1 = metadata["symbol0"], metadata["symbol1"]
 
             # define tokenIn/tokenOut e quantidades
             if a0in > 0:
@@ -281,23 +274,10 @@ async def get_swap_details_web3(
                 ["int256", "int256", "uint160", "uint128", "int24"], log.data
             )
 
-            # resolve endereço de token0/token1 no pool
-            pair = async_web3.eth.contract(address=log.address, abi=PAIR_ABI)
-            addr0_task = asyncio.create_task(pair.functions.token0().call())
-            addr1_task = asyncio.create_task(pair.functions.token1().call())
-            addr0, addr1 = await asyncio.gather(addr0_task, addr1_task)
-
-            # busca símbolos ERC-20
-            token0_contract = async_web3.eth.contract(address=addr0, abi=ERC20_ABI)
-            token1_contract = async_web3.eth.contract(address=addr1, abi=ERC20_ABI)
-            try:
-                sym0 = await token0_contract.functions.symbol().call()
-            except:
-                sym0 = addr0
-            try:
-                sym1 = await token1_contract.functions.symbol().call()
-            except:
-                sym1 = addr1
+            metadata = await get_pool_metadata(
+                async_web3=async_web3, pool_address=pool_addr, session=session
+            )
+            sym0, sym1 = metadata["symbol0"], metadata["symbol1"]
 
             if amt0 > 0:
                 token_in, token_out = sym0, sym1
@@ -341,6 +321,267 @@ async def get_all_swap_details_web3(
     receipt_task = asyncio.create_task(async_web3.eth.get_transaction_receipt(tx_hash))
     tx, receipt = await asyncio.gather(tx_task, receipt_task)
 
+    return await decode_swap_events(
+        async_web3=async_web3,
+        tx_hash=tx_hash,
+        tx=tx,
+        receipt=receipt,
+        session=session,
+        base_fee_per_gas=base_fee_per_gas,
+    )
+
+
+def has_swap_log(receipt: TxReceipt) -> bool:
+    """
+    Indica se o recibo contém algum log de Swap Uniswap V2/V3.
+    """
+    return any(
+        len(log.topics) > 0 and log.topics[0] in (SWAP_V2_TOPIC, SWAP_V3_TOPIC)
+        for log in receipt.logs
+    )
+
+
+def get_swap_pool_addresses(
+    async_web3: AsyncWeb3, receipts: list[TxReceipt]
+) -> list[str]:
+    """
+    Endereços (checksum) dos pools que emitiram Swap V2/V3 nos recibos.
+    """
+    return list(
+        dict.fromkeys(
+            async_web3.to_checksum_address(log.address)
+            for receipt in receipts
+            for log in receipt.logs
+            if len(log.topics) > 0 and log.topics[0] in (SWAP_V2_TOPIC, SWAP_V3_TOPIC)
+        )
+    )
+
+
+async def get_block_receipts(
+    async_web3: AsyncWeb3, block_number: int, tx_hashes: list
+) -> list[TxReceipt]:
+    """
+    Busca todos os recibos do bloco com um único eth_getBlockReceipts. Se o
+    provedor não suportar o método, busca os recibos em lotes JSON-RPC.
+    """
+    try:
+        return list(await async_web3.eth.get_block_receipts(block_number))
+    except (MethodNotSupported, Web3RPCError) as e:
+        logger.warning(
+            f"eth_getBlockReceipts indisponível ({e}), usando lotes de recibos"
+        )
+
+    return await execute_in_batches(
+        async_web3,
+        [
+            lambda tx_hash=tx_hash: async_web3.eth.get_transaction_receipt(tx_hash)
+            for tx_hash in tx_hashes
+        ],
+    )
+
+
+async def execute_in_batches(
+    async_web3: AsyncWeb3, requests: list[Callable[[], Any]]
+) -> list:
+    """
+    Executa as chamadas em lotes JSON-RPC de até RPC_BATCH_SIZE requisições.
+    Cada item de `requests` é um callable que monta a chamada dentro do lote.
+    """
+    responses = []
+    batch_size = AppConfig.RPC_BATCH_SIZE
+    for start in range(0, len(requests), batch_size):
+        async with async_web3.batch_requests() as batch:
+            for request in requests[start : start + batch_size]:
+                batch.add(request())
+            responses.extend(await batch.async_execute())
+    return responses
+
+
+# Mensagens de limite de resultados/intervalo do eth_getLogs dos provedores
+# conhecidos. O código sozinho não basta: a Infura também usa -32005 para
+# limite de requisições.
+LOG_LIMIT_ERROR_MESSAGES = (
+    "query returned more than",  # Infura, geth (-32005)
+    "log response size exceeded",  # Alchemy
+    "this block range should work",  # Alchemy
+    "block range is too wide",  # Ankr
+    "exceed maximum block range",  # nós geth com limite de intervalo (BSC)
+    "eth_getlogs is limited to",  # QuickNode
+)
+
+
+def is_log_limit_error(error: Exception) -> bool:
+    """
+    Indica se o erro do eth_getLogs é do limite de resultados/intervalo do
+    provedor (ex.: Infura -32005 "query returned more than 10000 results",
+    Alchemy "this block range should work: [...]").
+    """
+    # Só a mensagem do erro JSON-RPC, quando disponível
+    rpc_error = (getattr(error, "rpc_response", None) or {}).get("error")
+    message = rpc_error.get("message", "") if isinstance(rpc_error, dict) else ""
+    message = (message or str(error)).lower()
+    return any(hint in message for hint in LOG_LIMIT_ERROR_MESSAGES)
+
+
+async def get_swap_logs(
+    async_web3: AsyncWeb3, from_block: int, to_block: int
+) -> list[LogReceipt]:
+    """
+    Busca os logs de Swap V2/V3 do intervalo com eth_getLogs, adaptando o
+    tamanho da janela aos limites do provedor: divide pela metade quando o
+    provedor recusa e volta a crescer após sucessos.
+    """
+    logs: list[LogReceipt] = []
+    max_span = AppConfig.LOGS_BLOCK_RANGE
+    span = ceiling = max_span
+    start = from_block
+
+    while start <= to_block:
+        end = min(start + span - 1, to_block)
+        try:
+            chunk = await async_web3.eth.get_logs(
+                {
+                    "fromBlock": start,
+                    "toBlock": end,
+                    "topics": [[SWAP_V2_TOPIC, SWAP_V3_TOPIC]],
+                }
+            )
+        except (Web3RPCError, ValueError) as e:
+            if span == 1 or not is_log_limit_error(e):
+                raise
+            # Lembra o teto que falhou para não oscilar de volta a ele
+            ceiling = max(1, span - 1)
+            span = max(1, span // 2)
+            continue
+
+        logs.extend(chunk)
+        start = end + 1
+        span = min(span * 2, ceiling)
+        ceiling = min(max_span, ceiling + max(1, ceiling // 10))
+
+    return logs
+
+
+def chunk_hashes_by_block(logs: list[LogReceipt], max_transactions: int):
+    """
+    Agrupa as transações dos logs em blocos inteiros, até `max_transactions`
+    transações por grupo (um bloco maior que isso fica sozinho). Produz
+    (números dos blocos, hashes das transações) na ordem dos logs.
+    """
+    block_numbers: list[int] = []
+    tx_hashes: dict = {}
+    for log in logs:
+        block_number = log["blockNumber"]
+        if not block_numbers or block_numbers[-1] != block_number:
+            if len(tx_hashes) >= max_transactions:
+                yield block_numbers, list(tx_hashes)
+                block_numbers, tx_hashes = [], {}
+            block_numbers.append(block_number)
+        tx_hashes[log["transactionHash"]] = None
+    if block_numbers:
+        yield block_numbers, list(tx_hashes)
+
+
+async def fetch_swap_transactions(
+    async_web3: AsyncWeb3, block_numbers: list[int], tx_hashes: list
+) -> tuple[list[BlockData], list[tuple[TxData, TxReceipt]]]:
+    responses = await execute_in_batches(
+        async_web3,
+        [
+            lambda tx_hash=tx_hash: async_web3.eth.get_transaction(tx_hash)
+            for tx_hash in tx_hashes
+        ]
+        + [
+            lambda tx_hash=tx_hash: async_web3.eth.get_transaction_receipt(tx_hash)
+            for tx_hash in tx_hashes
+        ]
+        + [
+            lambda number=number: async_web3.eth.get_block(number)
+            for number in block_numbers
+        ],
+    )
+
+    n = len(tx_hashes)
+    transactions = responses[:n]
+    receipts = responses[n : 2 * n]
+    return responses[2 * n :], list(zip(transactions, receipts))
+
+
+async def iter_swap_transactions_by_logs(
+    async_web3: AsyncWeb3, from_block: int, to_block: int
+) -> AsyncIterator[tuple[list[BlockData], list[tuple[TxData, TxReceipt]]]]:
+    """
+    Descobre os swaps do intervalo via eth_getLogs e busca transação e recibo
+    apenas das transações que emitiram Swap, em grupos de blocos inteiros
+    com até um lote JSON-RPC de transações. Produz, para cada grupo, os
+    blocos (sem as transações completas) e os pares (transação, recibo); o
+    grupo seguinte é buscado enquanto o chamador processa o atual, de modo
+    que no máximo dois grupos ficam em memória.
+    """
+    logs = await get_swap_logs(async_web3, from_block, to_block)
+    # transação e recibo de cada swap cabem em um lote
+    chunks = chunk_hashes_by_block(logs, max(1, AppConfig.RPC_BATCH_SIZE // 2))
+
+    pending = None
+    for block_numbers, tx_hashes in chunks:
+        fetch = asyncio.create_task(
+            fetch_swap_transactions(async_web3, block_numbers, tx_hashes)
+        )
+        if pending is not None:
+            try:
+                yield await pending
+            except BaseException:
+                fetch.cancel()
+                raise
+        pending = fetch
+    if pending is not None:
+        yield await pending
+
+
+async def get_swap_transactions_by_logs(
+    async_web3: AsyncWeb3, from_block: int, to_block: int
+) -> tuple[list[BlockData], list[tuple[TxData, TxReceipt]]]:
+    """
+    Como iter_swap_transactions_by_logs, com todos os grupos juntos (para
+    intervalos curtos, como um único bloco).
+    """
+    blocks, pairs = [], []
+    async for chunk_blocks, chunk_pairs in iter_swap_transactions_by_logs(
+        async_web3, from_block, to_block
+    ):
+        blocks.extend(chunk_blocks)
+        pairs.extend(chunk_pairs)
+    return blocks, pairs
+
+
+async def get_block_with_receipts(
+    async_web3: AsyncWeb3, block_number: int
+) -> tuple[BlockData, list[tuple[TxData, TxReceipt]]]:
+    """
+    Retorna o bloco (com transações completas) e os pares (transação, recibo)
+    em ordem de transactionIndex, usando O(1) chamadas RPC por bloco.
+    """
+    block = await async_web3.eth.get_block(block_number, full_transactions=True)
+    transactions = block["transactions"]
+    receipts = await get_block_receipts(
+        async_web3=async_web3,
+        block_number=block_number,
+        tx_hashes=[tx["hash"] for tx in transactions],
+    )
+
+    receipts_by_index = {r["transactionIndex"]: r for r in receipts}
+    pairs = [(tx, receipts_by_index[tx["transactionIndex"]]) for tx in transactions]
+    return block, pairs
+
+
+async def decode_swap_events(
+    async_web3: AsyncWeb3,
+    tx_hash: str,
+    tx: TxData,
+    receipt: TxReceipt,
+    session: AsyncSession | None = None,
+    base_fee_per_gas: int | None = None,
+) -> list[dict] | None:
     gas_used = receipt["gasUsed"]
     gas_price = tx["gasPrice"]
     gas_fee_wei = gas_used * gas_price
@@ -370,22 +611,11 @@ async def get_all_swap_details_web3(
                 ["uint256", "uint256", "uint256", "uint256"], log.data
             )
 
-            pair = async_web3.eth.contract(address=pool_addr, abi=PAIR_ABI)
-            addr0_task = pair.functions.token0().call()
-            addr1_task = pair.functions.token1().call()
-            addr0, addr1 = await asyncio.gather(addr0_task, addr1_task)
-
-            # símbolos
-            token0 = async_web3.eth.contract(address=addr0, abi=ERC20_ABI)
-            token1 = async_web3.eth.contract(address=addr1, abi=ERC20_ABI)
-            try:
-                sym0 = await token0.functions.symbol().call()
-            except:
-                sym0 = addr0
-            try:
-                sym1 = await token1.functions.symbol().call()
-            except:
-                sym1 = addr1
+            metadata = await get_pool_metadata(
+                async_web3=async_web3, pool_address=pool_addr, session=session
+            )
+            addr0, addr1 = metadata["token0"], metadata["token1"]
+            sym0, sym1 = metadata["symbol0"], metadata["symbol1"]
 
             if a0in > 0:
                 token_in, token_out = sym0, sym1
@@ -402,21 +632,11 @@ async def get_all_swap_details_web3(
                 ["int256", "int256", "uint160", "uint128", "int24"], log.data
             )
 
-            pair = async_web3.eth.contract(address=pool_addr, abi=PAIR_ABI)
-            addr0_task = pair.functions.token0().call()
-            addr1_task = pair.functions.token1().call()
-            addr0, addr1 = await asyncio.gather(addr0_task, addr1_task)
-
-            token0 = async_web3.eth.contract(address=addr0, abi=ERC20_ABI)
-            token1 = async_web3.eth.contract(address=addr1, abi=ERC20_ABI)
-            try:
-                sym0 = await token0.functions.symbol().call()
-            except:
-                sym0 = addr0
-            try:
-                sym1 = await token1.functions.symbol().call()
-            except:
-                sym1 = addr1
+            metadata = await get_pool_metadata(
+                async_web3=async_web3, pool_address=pool_addr, session=session
+            )
+            addr0, addr1 = metadata["token0"], metadata["token1"]
+            sym0, sym1 = metadata["symbol0"], metadata["symbol1"]
 
             if amt0 > 0:
                 token_in, token_out = sym0, sym1
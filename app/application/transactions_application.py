@@ -5,7 +5,10 @@ import asyncio
 from app.application.swap_details import (
     get_swap_details_web3,
 )
+from app.application.web3_client.head_follower import head_follower
 from app.application.web3_client.main import async_web3
+from app.config import AppConfig
+from app.database import AsyncSessionLocal
 
 
 def _to_hex(value):
@@ -35,7 +38,9 @@ async def get_transaction_by_hash_application(
         receipt=receipt,
     )
 
-    block = await async_web3.eth.get_block(transaction["blockNumber"])
+    block = head_follower.get_block(
+        transaction["blockNumber"]
+    ) or await async_web3.eth.get_block(transaction["blockNumber"])
 
     transaction_status = "Success" if receipt["status"] == 1 else "Failed"
 
@@ -76,28 +81,27 @@ async def get_transaction_by_hash_application(
     return transaction_data
 
 
-async def fetch_latests_transactions_application(
-    session: AsyncSession,
-    limit: int = 10,
-):
-    latest_block = await async_web3.eth.get_block("latest")
-    transactions = []
-
-    limit = min(limit, len(latest_block["transactions"]))
-
-    count = 0
-    for tx_hash in latest_block["transactions"]:
-        transaction = await get_transaction_by_hash_application(
-            transaction_hash=tx_hash, session=session
-        )
-
-        if transaction is None:
-            continue
-
-        transactions.append(transaction)
-        count += 1
-
-        if count >= limit:
-            break
-
-    return transactions
+async def fetch_latests_transactions_application(limit: int = 10):
+    """
+    Detalha as `limit` primeiras transações do bloco mais recente em paralelo,
+    com até BLOCK_INGESTION_CONCURRENCY consultas simultâneas.
+    """
+    latest_block = head_follower.latest_block()
+    if latest_block is not None:
+        transactions_hashes = latest_block["transactions_hashes"]
+    else:
+        latest_block = await async_web3.eth.get_block("latest")
+        transactions_hashes = latest_block["transactions"]
+
+    semaphore = asyncio.Semaphore(AppConfig.BLOCK_INGESTION_CONCURRENCY)
+
+    async def _fetch(tx_hash):
+        async with semaphore:
+            # Cada tarefa abre a própria sessão: AsyncSession não pode ser
+            # compartilhada entre corrotinas concorrentes.
+            async with AsyncSessionLocal() as session:
+                return await get_transaction_by_hash_application(
+                    transaction_hash=tx_hash, session=session
+                )
+
+    return list(await asyncio.gather(*(_fetch(h) for h in transactions_hashes[:limit])))
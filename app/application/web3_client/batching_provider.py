@@ -0,0 +1,109 @@
+from typing import Any
+import asyncio
+
+from web3 import AsyncHTTPProvider
+from web3.exceptions import ProviderConnectionError
+from web3.types import RPCEndpoint, RPCRequest, RPCResponse
+
+
+class BatchingHTTPProvider(AsyncHTTPProvider):
+    """
+    AsyncHTTPProvider que agrupa as chamadas feitas dentro de uma janela curta
+    (`batch_window`, em segundos) em um único lote JSON-RPC de até
+    `max_batch_size` requisições, devolvendo cada resposta a quem a aguarda.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: str | None = None,
+        batch_window: float = 0.005,
+        max_batch_size: int = 100,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(endpoint_uri, **kwargs)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+
+        self.requests_sent = 0
+        self.http_requests_sent = 0
+
+        self._pending: list[tuple[RPCRequest, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._send_tasks: set[asyncio.Task] = set()
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.batch_window <= 0 or self.max_batch_size <= 1:
+            self.requests_sent += 1
+            self.http_requests_sent += 1
+            return await super().make_request(method, params)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((self.form_request(method, params), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._send_batch(batch))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._send_tasks.discard)
+
+    async def _send_batch(self, batch: list[tuple[RPCRequest, asyncio.Future]]):
+        requests = [request for request, _ in batch]
+        if len(requests) == 1:
+            request_data = self.encode_rpc_dict(requests[0])
+        else:
+            request_data = self.encode_batch_request_dicts(requests)
+
+        self.requests_sent += len(requests)
+        self.http_requests_sent += 1
+
+        try:
+            raw_response = await self._request_session_manager.async_make_post_request(
+                self.endpoint_uri, request_data, **self.get_request_kwargs()
+            )
+            response = self.decode_rpc_response(raw_response)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if not isinstance(response, list):
+            if len(batch) == 1:
+                response = [response]
+            else:
+                # O provedor recusou o lote inteiro com um único erro
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(response)
+                return
+
+        responses_by_id = {r.get("id"): r for r in response}
+        for request, future in batch:
+            if future.done():
+                continue  # chamador cancelado
+
+            rpc_response = responses_by_id.get(request["id"])
+            if rpc_response is None:
+                future.set_exception(
+                    ProviderConnectionError(
+                        f"Missing response for request id {request['id']} "
+                        f"({request['method']}) in batch"
+                    )
+                )
+            else:
+                future.set_result(rpc_response)
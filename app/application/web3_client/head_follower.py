@@ -0,0 +1,201 @@
+from collections import deque
+from typing import Callable
+import asyncio
+import time
+
+from web3 import AsyncWeb3, WebSocketProvider
+
+from app.application.web3_client.main import RPC_WS_URL, async_web3
+from app.config import AppConfig
+from app.utils.block_cache import format_block_header, remember_head_block
+from app.utils.loggers import error_logger, logger
+from app.utils.metrics import register_metrics
+
+
+class HeadFollower:
+    """
+    Acompanha a cabeça da cadeia em segundo plano: assina `newHeads` via
+    WebSocket e, se a conexão cair ou não houver endpoint WebSocket, passa
+    para polling de `eth_blockNumber` (tentando o WebSocket de novo a cada
+    `ws_retry_interval` segundos). Os `buffer_size` blocos mais recentes
+    ficam em memória, já no formato da API. Cada bloco novo é repassado aos
+    ouvintes registrados com `add_listener`.
+    """
+
+    def __init__(
+        self,
+        async_web3: AsyncWeb3,
+        ws_url: str | None = None,
+        buffer_size: int = 128,
+        poll_interval: float = 2.0,
+        stale_after: float = 60.0,
+        ws_retry_interval: float = 30.0,
+    ):
+        self.async_web3 = async_web3
+        self.ws_url = ws_url
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.ws_retry_interval = ws_retry_interval
+
+        self.blocks: deque = deque(maxlen=buffer_size)
+        self.finalized_number: int | None = None
+        self.updated_at = 0.0
+        self.source: str | None = None
+        self.heads_received = 0
+        self.reorgs = 0
+
+        self.listeners: list[Callable[[dict], None]] = []
+
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        self.listeners.append(listener)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        while True:
+            if self.ws_url:
+                try:
+                    await self._follow_websocket()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error_logger.error(f"Assinatura newHeads falhou: {e}")
+            await self._poll(self.ws_retry_interval if self.ws_url else None)
+
+    async def _follow_websocket(self) -> None:
+        async with AsyncWeb3(WebSocketProvider(self.ws_url)) as ws_web3:
+            await ws_web3.eth.subscribe("newHeads")
+            self.source = "websocket"
+            logger.info("Head follower subscribed to newHeads")
+            async for message in ws_web3.socket.process_subscriptions():
+                header = message["result"]
+                await self.on_new_head(header["number"], header["hash"].hex())
+
+    async def _poll(self, duration: float | None) -> None:
+        self.source = "polling"
+        deadline = None if duration is None else time.monotonic() + duration
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                await self.on_new_head(await self.async_web3.eth.block_number)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error_logger.error(f"Polling da cabeça da cadeia falhou: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def on_new_head(self, number: int, block_hash: str | None = None) -> None:
+        async with self._lock:
+            latest = self.blocks[-1] if self.blocks else None
+            if latest is not None and latest["number"] == number:
+                if block_hash is None or block_hash == latest["hash"]:
+                    self.updated_at = time.monotonic()
+                    return
+
+            self.heads_received += 1
+            if latest is not None and number <= latest["number"]:
+                # Reorganização: descarta os blocos substituídos
+                self.reorgs += 1
+                while self.blocks and self.blocks[-1]["number"] >= number:
+                    self.blocks.pop()
+                latest = self.blocks[-1] if self.blocks else None
+
+            # Preenche lacunas (ex.: depois de uma reconexão), até o tamanho
+            # do buffer
+            first = number - self.blocks.maxlen + 1
+            if latest is not None:
+                first = max(first, latest["number"] + 1)
+
+            finalized, *blocks = await asyncio.gather(
+                self.async_web3.eth.get_block("finalized"),
+                *(
+                    self.async_web3.eth.get_block(n, full_transactions=False)
+                    for n in range(first, number + 1)
+                ),
+            )
+            self.finalized_number = finalized["number"]
+            remember_head_block("finalized", finalized)
+
+            for block in blocks:
+                block_data = format_block_header(block, "not_finalized")
+                if self.blocks and self.blocks[-1]["hash"] != block_data["parent_hash"]:
+                    # Reorganização mais profunda que o buffer consegue
+                    # conferir: recomeça a partir deste bloco
+                    self.reorgs += 1
+                    self.blocks.clear()
+                self.blocks.append(block_data)
+                for listener in self.listeners:
+                    listener(block_data)
+
+            self.updated_at = time.monotonic()
+
+    def is_fresh(self) -> bool:
+        return (
+            bool(self.blocks) and time.monotonic() - self.updated_at < self.stale_after
+        )
+
+    def _with_status(self, block_data: dict) -> dict:
+        finalized = (
+            self.finalized_number is not None
+            and block_data["number"] <= self.finalized_number
+        )
+        return {**block_data, "status": "finalized" if finalized else "not_finalized"}
+
+    def latest_block(self) -> dict | None:
+        if not self.is_fresh():
+            return None
+        return self._with_status(self.blocks[-1])
+
+    def buffered_block(self, number: int) -> dict | None:
+        """
+        Bloco do buffer sem conferir se o buffer está atualizado (para os
+        ouvintes, chamados antes de `updated_at` ser renovado).
+        """
+        if not self.blocks:
+            return None
+        index = number - self.blocks[0]["number"]
+        if 0 <= index < len(self.blocks):
+            return self._with_status(self.blocks[index])
+        return None
+
+    def get_block(self, number: int) -> dict | None:
+        if not self.is_fresh():
+            return None
+        return self.buffered_block(number)
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "latest_block": self.blocks[-1]["number"] if self.blocks else None,
+            "finalized_block": self.finalized_number,
+            "buffered_blocks": len(self.blocks),
+            "seconds_since_update": (
+                round(time.monotonic() - self.updated_at, 2) if self.blocks else None
+            ),
+            "heads_received": self.heads_received,
+            "reorgs": self.reorgs,
+        }
+
+
+head_follower = HeadFollower(
+    async_web3,
+    ws_url=RPC_WS_URL,
+    buffer_size=AppConfig.HEAD_BUFFER_SIZE,
+    poll_interval=AppConfig.HEAD_POLL_INTERVAL,
+    stale_after=AppConfig.HEAD_STALE_AFTER,
+)
+
+register_metrics("head_follower", head_follower.stats)
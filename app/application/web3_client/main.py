@@ -1,6 +1,35 @@
 from web3 import Web3, AsyncWeb3
 import os
 
+from app.application.web3_client.batching_provider import BatchingHTTPProvider
+from app.application.web3_client.provider_pool import ProviderPool
+from app.config import AppConfig
+from app.utils.metrics import register_metrics
+
 INFURA_URL = f"https://mainnet.infura.io/v3/{os.getenv('API_KEY')}"
-w3 = Web3(Web3.HTTPProvider(INFURA_URL))
-async_web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(INFURA_URL))
+RPC_URLS = AppConfig.RPC_URLS or [INFURA_URL]
+RPC_WS_URL = AppConfig.RPC_WS_URL or (
+    None
+    if AppConfig.RPC_URLS
+    else f"wss://mainnet.infura.io/ws/v3/{os.getenv('API_KEY')}"
+)
+
+w3 = Web3(Web3.HTTPProvider(RPC_URLS[0]))
+
+provider_pool = ProviderPool(
+    [
+        BatchingHTTPProvider(
+            url,
+            batch_window=AppConfig.RPC_BATCH_WINDOW_MS / 1000,
+            max_batch_size=AppConfig.RPC_BATCH_SIZE,
+        )
+        for url in RPC_URLS
+    ],
+    hedged_methods=AppConfig.RPC_HEDGED_METHODS,
+    hedge_percentile=AppConfig.RPC_HEDGE_PERCENTILE,
+    rate_limit=AppConfig.RPC_RATE_LIMIT,
+    max_concurrency=AppConfig.RPC_MAX_CONCURRENCY,
+)
+async_web3 = AsyncWeb3(provider_pool)
+
+register_metrics("rpc", provider_pool.stats)
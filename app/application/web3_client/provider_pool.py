@@ -0,0 +1,265 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, List, Tuple, Union
+from urllib.parse import urlparse
+import asyncio
+import time
+
+from web3.providers.async_base import AsyncBaseProvider, AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from app.application.web3_client.rpc_scheduler import (
+    AdaptiveLimiter,
+    is_throttle_error,
+    is_throttle_response,
+)
+from app.utils.loggers import error_logger
+
+# Ativado apenas nos caminhos sensíveis à latência (ex.: rotas da API)
+_hedging_enabled: ContextVar[bool] = ContextVar("rpc_hedging_enabled", default=False)
+
+
+@contextmanager
+def hedged_requests():
+    """
+    Permite requisições "hedged" para as chamadas feitas dentro do bloco.
+    """
+    token = _hedging_enabled.set(True)
+    try:
+        yield
+    finally:
+        _hedging_enabled.reset(token)
+
+
+class EndpointHealth:
+    """
+    Saúde de um endpoint: latência (média móvel exponencial e amostras
+    recentes para percentis) e taxa de erro de transporte.
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 200):
+        self.alpha = alpha
+        self.latency_ewma: float | None = None
+        self.error_rate = 0.0
+        self.latencies: deque = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.last_error_at = 0.0
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+        self.latency_ewma = (
+            latency
+            if self.latency_ewma is None
+            else self.alpha * latency + (1 - self.alpha) * self.latency_ewma
+        )
+        self.error_rate = (1 - self.alpha) * self.error_rate
+
+    def record_error(self) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.current_error_rate()
+        self.last_error_at = time.monotonic()
+
+    def current_error_rate(self, half_life: float = 30.0) -> float:
+        # A taxa de erro decai com o tempo para que um endpoint que falhou
+        # volte a receber tráfego depois de se recuperar
+        elapsed = time.monotonic() - self.last_error_at
+        return self.error_rate * 0.5 ** (elapsed / half_life)
+
+    def percentile(self, p: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    @property
+    def score(self) -> float:
+        # Endpoints ainda não usados começam com prioridade para serem medidos;
+        # os que só falharam recebem uma latência pessimista
+        if self.latency_ewma is not None:
+            latency = self.latency_ewma
+        else:
+            latency = 0.0 if self.requests == 0 else 1.0
+        return (latency + 0.001 * self.in_flight) * (1 + 20 * self.current_error_rate())
+
+    def stats(self) -> dict:
+        return {
+            "latency_ewma_ms": (
+                round(self.latency_ewma * 1000, 2)
+                if self.latency_ewma is not None
+                else None
+            ),
+            "latency_p95_ms": (
+                round(self.percentile(0.95) * 1000, 2) if self.latencies else None
+            ),
+            "error_rate": round(self.current_error_rate(), 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+        }
+
+
+class ProviderPool(AsyncJSONBaseProvider):
+    """
+    Distribui as chamadas entre vários endpoints RPC, sempre escolhendo o de
+    melhor pontuação (latência x taxa de erro) e tentando o próximo em caso
+    de falha de transporte. Para os métodos em `hedged_methods`, quando
+    habilitado via `hedged_requests()`, dispara uma cópia no segundo melhor
+    endpoint se o primeiro passar do percentil `hedge_percentile` de latência.
+    Cada endpoint tem seu próprio `AdaptiveLimiter` (token bucket de
+    `rate_limit` req/s e concorrência AIMD até `max_concurrency`).
+    """
+
+    def __init__(
+        self,
+        providers: List[AsyncBaseProvider],
+        hedged_methods: set[str] | None = None,
+        hedge_percentile: float = 0.95,
+        hedge_min_delay: float = 0.05,
+        rate_limit: float | None = None,
+        max_concurrency: int = 64,
+        **kwargs: Any,
+    ) -> None:
+        if not providers:
+            raise ValueError("ProviderPool needs at least one provider")
+        super().__init__(**kwargs)
+        self.providers = providers
+        self.health = {id(p): EndpointHealth() for p in providers}
+        self.limiters = {
+            id(p): AdaptiveLimiter(rate=rate_limit, max_concurrency=max_concurrency)
+            for p in providers
+        }
+        self.hedged_methods = hedged_methods or set()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def __str__(self) -> str:
+        return f"ProviderPool({', '.join(self.label(p) for p in self.providers)})"
+
+    def label(self, provider: AsyncBaseProvider) -> str:
+        # Só o host: a URL completa pode conter a chave da API
+        index = self.providers.index(provider)
+        host = urlparse(str(getattr(provider, "endpoint_uri", "") or "")).netloc
+        return f"{index}:{host or type(provider).__name__}"
+
+    def ranked_providers(self) -> List[AsyncBaseProvider]:
+        return sorted(self.providers, key=lambda p: self.health[id(p)].score)
+
+    async def _call(self, provider: AsyncBaseProvider, request_fn, weight: int = 1):
+        health = self.health[id(provider)]
+        limiter = self.limiters[id(provider)]
+        async with limiter.acquire(weight=weight):
+            health.in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await request_fn(provider)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                health.record_error()
+                limiter.record(throttled=is_throttle_error(e))
+                raise
+            else:
+                latency = time.perf_counter() - start
+                health.record_success(latency)
+                responses = response if isinstance(response, list) else [response]
+                limiter.record(
+                    latency=latency,
+                    throttled=any(is_throttle_response(r) for r in responses),
+                )
+                return response
+            finally:
+                health.in_flight -= 1
+
+    async def _call_with_failover(self, request_fn, providers=None, weight: int = 1):
+        last_error: Exception | None = None
+        for provider in providers or self.ranked_providers():
+            try:
+                return await self._call(provider, request_fn, weight=weight)
+            except Exception as e:
+                last_error = e
+                error_logger.error(f"RPC endpoint {self.label(provider)} falhou: {e}")
+        raise last_error
+
+    async def _call_hedged(self, request_fn):
+        primary, secondary, *others = self.ranked_providers()
+        delay = (
+            self.health[id(primary)].percentile(self.hedge_percentile)
+            or self.hedge_min_delay
+        )
+
+        primary_task = asyncio.create_task(self._call(primary, request_fn))
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if done and not primary_task.exception():
+            return primary_task.result()
+
+        self.hedges_sent += 1
+        hedge_task = asyncio.create_task(self._call(secondary, request_fn))
+        pending = {primary_task, hedge_task} - done
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.exception():
+                        if task is hedge_task:
+                            self.hedges_won += 1
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Os dois falharam: tenta os demais endpoints
+        if others:
+            return await self._call_with_failover(request_fn, providers=others)
+        raise hedge_task.exception()
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        def request_fn(provider):
+            return provider.make_request(method, params)
+
+        if (
+            _hedging_enabled.get()
+            and method in self.hedged_methods
+            and len(self.providers) > 1
+        ):
+            return await self._call_hedged(request_fn)
+        return await self._call_with_failover(request_fn)
+
+    async def make_batch_request(
+        self, requests: List[Tuple[RPCEndpoint, Any]]
+    ) -> Union[List[RPCResponse], RPCResponse]:
+        return await self._call_with_failover(
+            lambda provider: provider.make_batch_request(requests),
+            weight=len(requests),
+        )
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        for provider in self.ranked_providers():
+            if await provider.is_connected(show_traceback=show_traceback):
+                return True
+        return False
+
+    async def disconnect(self) -> None:
+        for provider in self.providers:
+            await provider.disconnect()
+
+    def stats(self) -> dict:
+        return {
+            "endpoints": {
+                self.label(p): {
+                    **self.health[id(p)].stats(),
+                    **self.limiters[id(p)].stats(),
+                }
+                for p in self.providers
+            },
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+        }
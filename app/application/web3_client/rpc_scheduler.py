@@ -0,0 +1,228 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import asyncio
+import heapq
+import itertools
+import time
+
+from app.utils.enums import RpcPriority
+
+# Menor valor = atendido primeiro
+PRIORITY_RANK = {RpcPriority.interactive: 0, RpcPriority.bulk: 1}
+
+_rpc_priority: ContextVar[RpcPriority] = ContextVar(
+    "rpc_priority", default=RpcPriority.interactive
+)
+
+
+@contextmanager
+def rpc_priority(priority: RpcPriority):
+    """
+    Define a classe de prioridade das chamadas RPC feitas dentro do bloco.
+    Sem isso, as chamadas são tratadas como tráfego interativo da API.
+    """
+    token = _rpc_priority.set(priority)
+    try:
+        yield
+    finally:
+        _rpc_priority.reset(token)
+
+
+def current_rpc_priority() -> RpcPriority:
+    return _rpc_priority.get()
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    HTTP 429 ou erro JSON-RPC de limite de requisições do provedor.
+    """
+    if getattr(error, "status", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+def is_throttle_response(response) -> bool:
+    if not isinstance(response, dict) or "error" not in response:
+        return False
+    error = response["error"]
+    if not isinstance(error, dict):
+        return False
+    message = str(error.get("message", "")).lower()
+    return (
+        error.get("code") == 429
+        or "rate limit" in message
+        or (error.get("code") == -32005 and "exceeded" in message)
+    )
+
+
+class AdaptiveLimiter:
+    """
+    Orçamento de chamadas RPC de um endpoint: token bucket de `rate`
+    requisições por segundo e limite de concorrência AIMD, que cresce
+    aditivamente com respostas saudáveis e cai pela metade em 429 ou quando a
+    latência passa de `latency_tolerance` vezes a latência de referência.
+    Vagas e tokens são entregues primeiro às chamadas de maior prioridade:
+    uma chamada só é admitida quando há vaga e tokens para ela, na ordem da
+    fila de prioridades. Um lote de `weight` requisições consome `weight`
+    tokens; acima da capacidade do balde, o saldo fica negativo e as
+    chamadas seguintes esperam a reposição das janelas seguintes.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        max_concurrency: int = 64,
+        min_concurrency: int = 1,
+        latency_tolerance: float = 2.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.rate = rate
+        self.tokens = float(rate or 0)
+        self._refilled_at = time.monotonic()
+        self._refill_timer: asyncio.TimerHandle | None = None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max(min_concurrency, max_concurrency // 4))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self.latency_ewma: float | None = None
+        self.baseline_latency: float | None = None
+        self.throttled = 0
+        self.decreases = 0
+
+        self._last_decrease = 0.0
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def acquire(self, priority: RpcPriority | None = None, weight: int = 1):
+        await self._acquire_slot(priority or current_rpc_priority(), weight)
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    async def _acquire_slot(self, priority: RpcPriority, weight: int = 1) -> None:
+        if not self._waiters and self._admit(weight):
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (PRIORITY_RANK[priority], next(self._seq), weight, future)
+        )
+        # agenda a reposição de tokens se a frente da fila depende dela
+        self._wake_waiters()
+        try:
+            # vaga e tokens são transferidos por quem acorda a fila
+            # (in_flight já incrementado)
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release_slot()
+            else:
+                # a chamada que estava na frente pode ter saído da fila
+                self._wake_waiters()
+            raise
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.rate, self.tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
+
+    def _admit(self, weight: int) -> bool:
+        """
+        Reserva vaga e tokens para a chamada, se houver.
+        """
+        if self.in_flight >= int(self.limit):
+            return False
+        if self.rate:
+            self._refill()
+            # basta o balde cheio para um lote maior que a capacidade
+            if self.tokens < min(weight, self.rate):
+                return False
+            self.tokens -= weight
+        self.in_flight += 1
+        return True
+
+    def _wake_waiters(self) -> None:
+        while self._waiters:
+            _, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)  # chamador cancelado
+                continue
+            if not self._admit(weight):
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        # A chamada da frente espera por tokens: acorda quando forem repostos
+        # (reagendado a cada vez, a frente da fila pode ter mudado)
+        if self._refill_timer is not None:
+            self._refill_timer.cancel()
+            self._refill_timer = None
+        if self._waiters and self.rate and self.in_flight < int(self.limit):
+            weight = self._waiters[0][2]
+            delay = (min(weight, self.rate) - self.tokens) / self.rate
+            self._refill_timer = asyncio.get_running_loop().call_later(
+                max(delay, 0.001), self._on_refill
+            )
+
+    def _on_refill(self) -> None:
+        self._refill_timer = None
+        self._wake_waiters()
+
+    def record(self, latency: float | None = None, throttled: bool = False) -> None:
+        if throttled:
+            self.throttled += 1
+            self._decrease()
+            return
+
+        if latency is None:
+            return
+
+        self.latency_ewma = (
+            latency
+            if self.latency_ewma is None
+            else 0.2 * latency + 0.8 * self.latency_ewma
+        )
+        # A referência acompanha a melhor latência e sobe devagar, para
+        # acompanhar mudanças permanentes do endpoint
+        self.baseline_latency = (
+            self.latency_ewma
+            if self.baseline_latency is None
+            else min(self.latency_ewma, self.baseline_latency * 1.001)
+        )
+
+        if self.latency_ewma > self.baseline_latency * self.latency_tolerance:
+            self._decrease()
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._wake_waiters()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        self.limit = max(self.min_concurrency, self.limit / 2)
+
+    def stats(self) -> dict:
+        waiting = [w for w in self._waiters if not w[3].done()]
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting_interactive": sum(1 for w in waiting if w[0] == 0),
+            "waiting_bulk": sum(1 for w in waiting if w[0] == 1),
+            "throttled": self.throttled,
+            "decreases": self.decreases,
+        }
@@ -0,0 +1,84 @@
+"""
+Comandos de linha de comando da aplicação.
+
+    python -m app.cli backfill 17000000 17010000 --concurrency 8
+    python -m app.cli migrate
+"""
+
+import argparse
+import asyncio
+
+from app.application.backfill import BackfillJob
+from app.database import engine, init_db
+from app.dbo.schema_migration import migrate_compact_schema
+from app.utils.enums import BackfillStatus
+
+
+async def run_backfill(
+    from_block: int, to_block: int, concurrency: int | None, interval: float
+) -> BackfillJob:
+    await init_db()
+
+    job = BackfillJob(from_block, to_block, concurrency=concurrency)
+    task = job.start()
+    while not task.done():
+        await asyncio.wait({task}, timeout=interval)
+        p = job.progress()
+        eta = f"{p['eta_seconds']:.0f}s" if p["eta_seconds"] is not None else "-"
+        print(
+            f"[{p['status']}] {p['progress_percent']:.2f}% "
+            f"({p['blocks_done']} done, {p['skipped_blocks']} skipped, "
+            f"{p['failed_blocks']} failed) | "
+            f"{p['blocks_per_second']:.2f} blocks/s, "
+            f"{p['swaps_per_second']:.2f} swaps/s | ETA {eta}",
+            flush=True,
+        )
+    return job
+
+
+async def run_migrate() -> list[str]:
+    async with engine.begin() as conn:
+        migrated = await conn.run_sync(migrate_compact_schema)
+    await engine.dispose()
+    return migrated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill", help="Analisa um intervalo histórico de blocos (retomável)"
+    )
+    backfill.add_argument("from_block", type=int)
+    backfill.add_argument("to_block", type=int)
+    backfill.add_argument("--concurrency", type=int, default=None)
+    backfill.add_argument(
+        "--interval", type=float, default=5.0, help="Segundos entre relatórios"
+    )
+
+    commands.add_parser(
+        "migrate", help="Converte as tabelas antigas para o esquema compacto"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        try:
+            job = asyncio.run(
+                run_backfill(
+                    args.from_block, args.to_block, args.concurrency, args.interval
+                )
+            )
+        except KeyboardInterrupt:
+            # os checkpoints já gravados permitem retomar depois
+            raise SystemExit(130)
+        if job.status != BackfillStatus.completed or job.failed_blocks:
+            raise SystemExit(1)
+    elif args.command == "migrate":
+        migrated = asyncio.run(run_migrate())
+        print(f"Tabelas migradas: {', '.join(migrated) or 'nenhuma'}")
+
+
+if __name__ == "__main__":
+    main()
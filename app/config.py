@@ -24,3 +24,102 @@ class AppConfig:
     SECRET_KEY = os.getenv("SECRET_KEY")
     SQLALCHEMY_ECHO = False
 
+    # Número máximo de transações decodificadas em paralelo por bloco
+    BLOCK_INGESTION_CONCURRENCY = int(os.getenv("BLOCK_INGESTION_CONCURRENCY", 16))
+    # Endpoints RPC separados por vírgula; vazio usa a Infura com API_KEY
+    RPC_URLS = [url.strip() for url in os.getenv("RPC_URLS", "").split(",") if url.strip()]
+    # Métodos que podem receber requisição "hedged" nas rotas da API
+    RPC_HEDGED_METHODS = set(
+        os.getenv("RPC_HEDGED_METHODS", "eth_getBlockByNumber,eth_getBlockByHash").split(",")
+    )
+    # Percentil de latência do endpoint após o qual a cópia é disparada
+    RPC_HEDGE_PERCENTILE = float(os.getenv("RPC_HEDGE_PERCENTILE", 0.95))
+    # Tamanho máximo de um lote JSON-RPC
+    RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", 100))
+    # Janela (ms) em que chamadas RPC concorrentes são agrupadas em um lote;
+    # 0 desativa o agrupamento
+    RPC_BATCH_WINDOW_MS = float(os.getenv("RPC_BATCH_WINDOW_MS", 5))
+    # Orçamento de requisições por segundo de cada endpoint RPC; 0 desativa
+    RPC_RATE_LIMIT = float(os.getenv("RPC_RATE_LIMIT", 50))
+    # Teto do limite adaptativo (AIMD) de chamadas simultâneas por endpoint
+    RPC_MAX_CONCURRENCY = int(os.getenv("RPC_MAX_CONCURRENCY", 64))
+    # Modo de descoberta de swaps: "receipts" (recibos do bloco) ou "logs"
+    SWAP_INGESTION_MODE = os.getenv("SWAP_INGESTION_MODE", "receipts")
+    # Janela máxima (em blocos) de cada eth_getLogs; reduzida sob demanda
+    LOGS_BLOCK_RANGE = int(os.getenv("LOGS_BLOCK_RANGE", 2000))
+    # Quantidade de pools mantidos no cache de metadados em memória
+    POOL_METADATA_CACHE_SIZE = int(os.getenv("POOL_METADATA_CACHE_SIZE", 10000))
+    # Máximo de chamadas agregadas em cada Multicall3 aggregate3
+    MULTICALL_CHUNK_SIZE = int(os.getenv("MULTICALL_CHUNK_SIZE", 200))
+    # Cabeçalhos de blocos finalizados mantidos em memória (imutáveis)
+    BLOCK_HEADER_CACHE_SIZE = int(os.getenv("BLOCK_HEADER_CACHE_SIZE", 10000))
+    # Também persiste os cabeçalhos finalizados na tabela block_headers
+    BLOCK_HEADER_PERSIST = os.getenv("BLOCK_HEADER_PERSIST", "true").lower() == "true"
+    # Tempo (s) em que as cabeças "latest" e "finalized" são reaproveitadas
+    BLOCK_HEAD_CACHE_TTL = float(os.getenv("BLOCK_HEAD_CACHE_TTL", 2))
+    # Endpoint WebSocket para a assinatura newHeads; vazio usa a Infura quando
+    # RPC_URLS não está definido, ou só polling caso contrário
+    RPC_WS_URL = os.getenv("RPC_WS_URL", "")
+    # Acompanha a cabeça da cadeia em segundo plano a partir do startup
+    HEAD_FOLLOWER_ENABLED = os.getenv("HEAD_FOLLOWER_ENABLED", "true").lower() == "true"
+    # Quantidade de blocos recentes mantidos em memória pelo head follower
+    HEAD_BUFFER_SIZE = int(os.getenv("HEAD_BUFFER_SIZE", 128))
+    # Intervalo (s) do polling usado quando o WebSocket não está disponível
+    HEAD_POLL_INTERVAL = float(os.getenv("HEAD_POLL_INTERVAL", 2))
+    # Sem novos blocos há mais que isso (s), o buffer deixa de ser usado
+    HEAD_STALE_AFTER = float(os.getenv("HEAD_STALE_AFTER", 60))
+    # Analisa automaticamente cada bloco novo visto pelo head follower
+    SANDWICH_PIPELINE_ENABLED = (
+        os.getenv("SANDWICH_PIPELINE_ENABLED", "true").lower() == "true"
+    )
+    # Blocos analisados em paralelo pelo pipeline automático
+    SANDWICH_PIPELINE_WORKERS = int(os.getenv("SANDWICH_PIPELINE_WORKERS", 2))
+    # Confirmações esperadas antes de analisar um bloco (reorganizações mais
+    # rasas que isso não chegam ao banco)
+    SANDWICH_PIPELINE_CONFIRMATIONS = int(
+        os.getenv("SANDWICH_PIPELINE_CONFIRMATIONS", 6)
+    )
+    # Blocos aguardando análise; cheia, descarta os mais antigos
+    SANDWICH_PIPELINE_QUEUE_SIZE = int(os.getenv("SANDWICH_PIPELINE_QUEUE_SIZE", 64))
+    # Intervalo (s) antes de refazer os preços de um resultado multi-layered
+    # salvo com algum preço faltando
+    MULTI_LAYERED_PRICE_RETRY_INTERVAL = float(
+        os.getenv("MULTI_LAYERED_PRICE_RETRY_INTERVAL", 300)
+    )
+    # Blocos analisados em paralelo por job de backfill (padrão)
+    BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", 4))
+    # A cada quantos blocos concluídos o backfill grava o checkpoint
+    BACKFILL_CHECKPOINT_BLOCKS = int(os.getenv("BACKFILL_CHECKPOINT_BLOCKS", 100))
+    # Analisa também os sanduíches multi-layered durante o backfill
+    BACKFILL_DETECT = os.getenv("BACKFILL_DETECT", "false").lower() == "true"
+    # Pipeline de ingestão em etapas: tamanho das filas entre etapas e
+    # workers de cada etapa
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 8))
+    PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", 4))
+    PIPELINE_METADATA_WORKERS = int(os.getenv("PIPELINE_METADATA_WORKERS", 2))
+    PIPELINE_DECODE_WORKERS = int(os.getenv("PIPELINE_DECODE_WORKERS", 4))
+    PIPELINE_PERSIST_WORKERS = int(os.getenv("PIPELINE_PERSIST_WORKERS", 1))
+    PIPELINE_DETECT_WORKERS = int(os.getenv("PIPELINE_DETECT_WORKERS", 1))
+    # Escritor write-behind: linhas por transação, janela máxima de espera
+    # (ms) para completar um lote e tamanho da fila de escritas pendentes
+    DB_WRITER_BATCH_ROWS = int(os.getenv("DB_WRITER_BATCH_ROWS", 1000))
+    DB_WRITER_FLUSH_MS = float(os.getenv("DB_WRITER_FLUSH_MS", 50))
+    DB_WRITER_QUEUE_SIZE = int(os.getenv("DB_WRITER_QUEUE_SIZE", 10000))
+    # Perfil do SQLite aplicado em cada conexão: "performance" (WAL,
+    # synchronous=NORMAL, mmap, cache, busy_timeout) ou "default"
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+    # Conexões mantidas no pool (leitores concorrentes) e extras sob demanda
+    SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", 8))
+    SQLITE_POOL_OVERFLOW = int(os.getenv("SQLITE_POOL_OVERFLOW", 8))
+    # Banco usado pela aplicação: "sqlite" (arquivo local) ou "postgresql"
+    # (SQLALCHEMY_DATABASE_URI via asyncpg, para vários workers/processos)
+    DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "sqlite")
+    PG_POOL_SIZE = int(os.getenv("PG_POOL_SIZE", 20))
+    PG_POOL_OVERFLOW = int(os.getenv("PG_POOL_OVERFLOW", 10))
+    # Prepared statements mantidos em cache por conexão asyncpg
+    PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", 500))
+    # A partir de quantas linhas a inserção em lote usa COPY no PostgreSQL
+    PG_COPY_MIN_ROWS = int(os.getenv("PG_COPY_MIN_ROWS", 100))
+    # Linhas buscadas por vez (cursor no servidor) nas leituras por intervalo
+    # de blocos
+    SWAP_RANGE_CHUNK_SIZE = int(os.getenv("SWAP_RANGE_CHUNK_SIZE", 10000))
@@ -1,14 +1,83 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite+aiosqlite:///./sandwiches_attacks.db"
+from app.config import AppConfig
 
-engine: AsyncEngine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
+SQLITE_DATABASE_URL = "sqlite+aiosqlite:///./sandwiches_attacks.db"
+
+# DATABASE_BACKEND=postgresql usa o banco de DB_USER/DB_HOST/... via asyncpg
+DATABASE_URL = (
+    AppConfig.SQLALCHEMY_DATABASE_URI.replace(
+        "postgresql://", "postgresql+asyncpg://", 1
+    )
+    if AppConfig.DATABASE_BACKEND == "postgresql"
+    else SQLITE_DATABASE_URL
 )
 
+# Perfis de armazenamento do SQLite, aplicados a cada nova conexão.
+# "performance": WAL (leitores não bloqueiam atrás do escritor), fsync só nos
+# checkpoints, mmap/cache maiores e espera pelo lock em vez de erro imediato.
+SQLITE_PROFILES = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negativo = KiB (64 MiB)
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def apply_sqlite_profile(engine: AsyncEngine, profile: str) -> None:
+    pragmas = SQLITE_PROFILES[profile]
+    if not pragmas:
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_engine(url: str = DATABASE_URL, profile: str | None = None) -> AsyncEngine:
+    """
+    Cria o engine assíncrono. Para SQLite em arquivo aplica o perfil
+    SQLITE_PROFILE e mantém um pool de conexões para leitores concorrentes;
+    para PostgreSQL (asyncpg) usa um pool maior, com cache de prepared
+    statements por conexão.
+    """
+    options = {"echo": False, "future": True}
+    if url.startswith("postgresql+asyncpg"):
+        options.update(
+            pool_size=AppConfig.PG_POOL_SIZE,
+            max_overflow=AppConfig.PG_POOL_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            connect_args={
+                "prepared_statement_cache_size": AppConfig.PG_STATEMENT_CACHE_SIZE
+            },
+        )
+
+    is_sqlite_file = url.startswith("sqlite") and ":memory:" not in url
+    if is_sqlite_file:
+        options.update(
+            pool_size=AppConfig.SQLITE_POOL_SIZE,
+            max_overflow=AppConfig.SQLITE_POOL_OVERFLOW,
+        )
+
+    engine = create_async_engine(url, **options)
+    if is_sqlite_file:
+        apply_sqlite_profile(engine, profile or AppConfig.SQLITE_PROFILE)
+    return engine
+
+
+engine: AsyncEngine = create_engine(DATABASE_URL)
+
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -20,11 +89,16 @@ Base = declarative_base()
 
 async def init_db() -> None:
     """
-    Executa CREATE TABLE IF NOT EXISTS para todos os modelos.
+    Executa CREATE TABLE IF NOT EXISTS para todos os modelos, migrando antes
+    as tabelas que ainda estão no esquema textual, e cria as colunas e os
+    índices que faltarem.
     Chamar em @app.on_event("startup").
     """
+    # import local: os modelos dependem de Base, definido neste módulo
+    from app.dbo.schema_migration import upgrade_schema
+
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
 
 
 async def restart_db() -> None:
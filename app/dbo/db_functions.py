@@ -1,8 +1,21 @@
-from sqlalchemy import select
+from typing import AsyncIterator
+import time
+
+from sqlalchemy import JSON, delete, func, insert, inspect, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+from app.config import AppConfig
+from app.dbo.types import hex_to_bytes
+from app.utils.functions import dbo_as_dict
 from app.dbo.models import (
+    AnalyzedRange,
+    BlockHeader,
     DexName,
+    MultiLayeredAnalysis,
+    MultiLayeredSandwich,
+    PoolMetadata,
+    SingleDexAnalysis,
     TransactionSwap,
     BlockAnalyzed,
     SandwichAttack,
@@ -10,11 +23,97 @@ from app.dbo.models import (
 )
 
 
+def insert_ignore(session: AsyncSession, model):
+    """
+    INSERT ... ON CONFLICT DO NOTHING no dialeto do banco da sessão.
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    raise NotImplementedError(f"insert_ignore não suporta o dialeto {dialect}")
+
+
+async def bulk_insert_ignore(session: AsyncSession, model, rows: list[dict]) -> None:
+    """
+    Insere as linhas ignorando duplicatas, sem commit. No PostgreSQL, lotes
+    grandes vão por COPY para uma tabela temporária seguido de um único
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING; nos demais casos, um
+    executemany de insert_ignore.
+    """
+    if not rows:
+        return
+    if (
+        session.bind.dialect.name == "postgresql"
+        and len(rows) >= AppConfig.PG_COPY_MIN_ROWS
+        and not any(isinstance(c.type, JSON) for c in model.__table__.columns)
+    ):
+        await copy_insert_ignore(session, model, rows)
+        return
+    await session.execute(insert_ignore(session, model), rows)
+
+
+async def copy_insert_ignore(session: AsyncSession, model, rows: list[dict]) -> None:
+    table = model.__table__.name
+    staging = f"{table}_staging"
+    # chaves das linhas são nomes de atributos ("from_address" -> "from")
+    attrs = [a for a in model.__mapper__.column_attrs if a.key in rows[0]]
+    columns = [a.columns[0].name for a in attrs]
+    column_list = ", ".join(f'"{c}"' for c in columns)
+
+    connection = await session.connection()
+    # executado pelo SQLAlchemy para abrir a transação antes do COPY: a
+    # tabela temporária é esvaziada a cada commit
+    await connection.exec_driver_sql(
+        f'CREATE TEMP TABLE IF NOT EXISTS "{staging}" '
+        f'(LIKE "{table}" INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+    )
+    raw_connection = await connection.get_raw_connection()
+    # o COPY não passa pelos tipos do SQLAlchemy: converte os valores aqui
+    # (hex -> bytea, wei -> numeric)
+    dialect = session.bind.dialect
+    processors = [
+        (a.key, a.columns[0].type.bind_processor(dialect) or (lambda value: value))
+        for a in attrs
+    ]
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging,
+        records=[
+            tuple(process(row.get(key)) for key, process in processors) for row in rows
+        ],
+        columns=columns,
+    )
+    await connection.exec_driver_sql(
+        f'INSERT INTO "{table}" ({column_list}) '
+        f'SELECT {column_list} FROM "{staging}" ON CONFLICT DO NOTHING'
+    )
+    await connection.exec_driver_sql(f'TRUNCATE "{staging}"')
+
+
 # — DexName —
 async def insert_dex_name(
     session: AsyncSession, pool_address: str, dex_name: str
 ) -> None:
-    obj = DexName(pool_address=pool_address, dex_name=dex_name)
+    await session.execute(
+        insert_ignore(session, DexName),
+        [{"pool_address": pool_address, "dex_name": dex_name}],
+    )
+    await session.commit()
+
+
+async def get_dex_name_by_pool_address(
+    session: AsyncSession, pool_address: str
+) -> str | None:
+    with session.no_autoflush:
+        res = await session.get(DexName, pool_address)
+
+    return res.dex_name if res else None
+
+
+# — PoolMetadata —
+async def insert_pool_metadata(session: AsyncSession, metadata: dict) -> None:
+    obj = PoolMetadata(**metadata)
     session.add(obj)
     try:
         await session.commit()
@@ -22,38 +121,131 @@ async def insert_dex_name(
         await session.rollback()  # já existe, ignora
 
 
-async def get_dex_name_by_pool_address(
+async def get_pool_metadata_by_pool_address(
     session: AsyncSession, pool_address: str
-) -> str | None:
+) -> dict | None:
     with session.no_autoflush:
-        res = await session.get(DexName, pool_address)
+        res = await session.get(PoolMetadata, pool_address)
 
-    return res.dex_name if res else None
+    return dbo_as_dict(res) if res else None
+
+
+async def fetch_pool_metadata_by_pool_addresses(
+    session: AsyncSession, pool_addresses: list[str]
+) -> list[dict]:
+    with session.no_autoflush:
+        result = await session.execute(
+            select(PoolMetadata).where(PoolMetadata.pool_address.in_(pool_addresses))
+        )
+    return [dbo_as_dict(obj) for obj in result.scalars().all()]
+
+
+async def insert_many_pool_metadata(
+    session: AsyncSession, metadata_list: list[dict]
+) -> None:
+    session.add_all([PoolMetadata(**metadata) for metadata in metadata_list])
+    try:
+        await session.commit()
+    except IntegrityError:
+        # algum pool já foi salvo por outra tarefa: insere um a um
+        await session.rollback()
+        for metadata in metadata_list:
+            await insert_pool_metadata(session=session, metadata=metadata)
+
+
+# — BlockHeader —
+# Inteiros que podem passar de 64 bits (dificuldade, base fee) são salvos
+# como texto
+BLOCK_HEADER_TEXT_FIELDS = ("base_fee_per_gas", "difficulty", "total_difficulty")
+
+
+def block_header_row(block_data: dict) -> dict:
+    values = {c.name: block_data.get(c.name) for c in BlockHeader.__table__.columns}
+    for field in BLOCK_HEADER_TEXT_FIELDS:
+        if values[field] is not None:
+            values[field] = str(values[field])
+    values["finalized"] = block_data.get("status") == "finalized"
+    return values
+
+
+async def insert_block_header(session: AsyncSession, block_data: dict) -> None:
+    session.add(BlockHeader(**block_header_row(block_data)))
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()  # já existe, ignora
+
+
+async def save_block_header(session: AsyncSession, block_data: dict) -> None:
+    """
+    Grava o cabeçalho do bloco, com as contagens de transações e swaps se o
+    bloco foi analisado (sem commit). Um cabeçalho já salvo é substituído
+    pelo mais recente (bloco reorganizado ou que passou a finalizado),
+    mantendo as contagens que o novo não traz.
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(BlockHeader)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(BlockHeader)
+    else:
+        raise NotImplementedError(f"upsert não suporta o dialeto {dialect}")
+
+    row = block_header_row(block_data)
+    statement = statement.values(row)
+    set_ = {column: statement.excluded[column] for column in row}
+    if row["swap_count"] is None:
+        del set_["swap_count"]
+    await session.execute(
+        statement.on_conflict_do_update(index_elements=[BlockHeader.number], set_=set_)
+    )
+
+
+async def get_block_header_by_number(
+    session: AsyncSession, block_number: int
+) -> dict | None:
+    with session.no_autoflush:
+        res = await session.get(BlockHeader, block_number)
+
+    if res is None:
+        return None
+
+    block_data = dbo_as_dict(res)
+    for field in BLOCK_HEADER_TEXT_FIELDS:
+        if block_data[field] is not None:
+            block_data[field] = int(block_data[field])
+    finalized = block_data.pop("finalized")
+    block_data["status"] = "not_finalized" if finalized is False else "finalized"
+    return block_data
 
 
 # — TransactionSwap —
+def transaction_swap_row(swap_data: dict) -> dict:
+    return {
+        "hash": swap_data["hash"],
+        "block_number": int(swap_data["block_number"]),
+        "log_index": swap_data["log_index"],
+        "transaction_index": swap_data["transaction_index"],
+        "from_address": swap_data["from"],
+        "to_address": swap_data["to"],
+        "dex_name": swap_data.get("dex_name", ""),
+        "token_in": swap_data["tokenIn"],
+        "token_in_address": swap_data.get("tokenInAddress", ""),
+        "token_out": swap_data["tokenOut"],
+        "token_out_address": swap_data.get("tokenOutAddress", ""),
+        "amount_in": swap_data["amountIn"],
+        "amount_out": swap_data["amountOut"],
+        "gas_price": swap_data["gasPrice"],
+        "gas_used": swap_data.get("gasUsed", 0),
+        "gas_fee_wei": swap_data.get("gasFeeWei", "0"),
+        "gas_fee_eth": swap_data.get("gasFeeEth", "0"),
+        "gas_burned": swap_data.get("gasBurned", "0"),  # Gas burned
+        "gas_tipped": swap_data.get("gasTipped", "0"),  # Gas tipped
+    }
+
+
 async def insert_transaction_swap(session: AsyncSession, swap_data: dict) -> None:
-    obj = TransactionSwap(
-        hash=swap_data["hash"],
-        block_number=swap_data["block_number"],
-        log_index=swap_data["log_index"],
-        transaction_index=swap_data["transaction_index"],
-        from_address=swap_data["from"],
-        to_address=swap_data["to"],
-        dex_name=swap_data.get("dex_name", ""),
-        token_in=swap_data["tokenIn"],
-        token_in_address=swap_data.get("tokenInAddress", ""),
-        token_out=swap_data["tokenOut"],
-        token_out_address=swap_data.get("tokenOutAddress", ""),
-        amount_in=swap_data["amountIn"],
-        amount_out=swap_data["amountOut"],
-        gas_price=swap_data["gasPrice"],
-        gas_used=swap_data.get("gasUsed", 0),
-        gas_fee_wei=swap_data.get("gasFeeWei", "0"),
-        gas_fee_eth=swap_data.get("gasFeeEth", "0"),
-        gas_burned=swap_data.get("gasBurned", "0"),  # Gas burned
-        gas_tipped=swap_data.get("gasTipped", "0"),  # Gas tipped
-    )
+    obj = TransactionSwap(**transaction_swap_row(swap_data))
     session.add(obj)
     try:
         await session.commit()
@@ -61,6 +253,35 @@ async def insert_transaction_swap(session: AsyncSession, swap_data: dict) -> Non
         await session.rollback()  # ignora duplicatas
 
 
+async def insert_block_swaps(
+    session: AsyncSession,
+    block_number: int,
+    swaps: list[dict],
+    mark_analyzed: bool = True,
+) -> None:
+    """
+    Insere todos os swaps do bloco em lote (executemany ou COPY, ver
+    bulk_insert_ignore) e, na mesma transação, a marca em blocks_analyzed:
+    ou o bloco inteiro fica salvo, ou nada.
+    """
+    await bulk_insert_ignore(
+        session, TransactionSwap, [transaction_swap_row(swap) for swap in swaps]
+    )
+    if mark_analyzed:
+        await session.execute(
+            insert_ignore(session, BlockAnalyzed),
+            [{"block_number": int(block_number)}],
+        )
+    await session.commit()
+
+
+# Colunas de TransactionSwap pelos nomes dos atributos (from_address,
+# amount_in, ...), base das colunas rotuladas de SWAP_RECORD_COLUMNS
+TRANSACTION_SWAP_COLUMNS = [
+    getattr(TransactionSwap, attr.key) for attr in inspect(TransactionSwap).column_attrs
+]
+
+
 async def get_transaction_swap_by_hash(
     session: AsyncSession, hash_value: str
 ) -> TransactionSwap | None:
@@ -81,7 +302,7 @@ async def fetch_transactions_swap_by_hash(
 
 
 async def fetch_transactions_swap_by_block_number(
-    session: AsyncSession, block_number: str
+    session: AsyncSession, block_number: int
 ) -> list[TransactionSwap]:
     with session.no_autoflush:
         result = await session.execute(
@@ -92,26 +313,241 @@ async def fetch_transactions_swap_by_block_number(
     return result.scalars().all()
 
 
+# Chaves dos swaps no formato consumido pelos detectores (o mesmo dos swaps
+# decodificados na ingestão); as demais colunas mantêm o nome do atributo
+SWAP_RECORD_KEYS = {
+    "from_address": "from",
+    "to_address": "to",
+    "token_in": "tokenIn",
+    "token_in_address": "tokenInAddress",
+    "token_out": "tokenOut",
+    "token_out_address": "tokenOutAddress",
+    "amount_in": "amountIn",
+    "amount_out": "amountOut",
+    "gas_price": "gasPrice",
+    "gas_used": "gasUsed",
+    "gas_fee_wei": "gasFeeWei",
+    "gas_fee_eth": "gasFeeEth",
+    "gas_burned": "gasBurned",
+    "gas_tipped": "gasTipped",
+}
+
+SWAP_RECORD_COLUMNS = [
+    column.label(SWAP_RECORD_KEYS.get(column.key, column.key))
+    for column in TRANSACTION_SWAP_COLUMNS
+]
+
+
+async def fetch_swap_records_by_block_number(
+    session: AsyncSession, block_number: int
+) -> list[dict]:
+    """
+    Swaps do bloco direto como dicts no formato dos detectores, sem
+    instâncias ORM nem validação Pydantic.
+    """
+    result = await session.execute(
+        select(*SWAP_RECORD_COLUMNS)
+        .where(TransactionSwap.block_number == block_number)
+        .order_by(TransactionSwap.transaction_index, TransactionSwap.log_index)
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+async def fetch_transactions_swap_by_pool(
+    session: AsyncSession, pool_address: str, limit: int = 100
+) -> list[TransactionSwap]:
+    with session.no_autoflush:
+        result = await session.execute(
+            select(TransactionSwap)
+            .where(TransactionSwap.to_address == pool_address)
+            .order_by(TransactionSwap.block_number.desc())
+            .limit(limit)
+        )
+    return result.scalars().all()
+
+
+async def fetch_transactions_swap_by_sender(
+    session: AsyncSession, sender: str, limit: int = 100
+) -> list[TransactionSwap]:
+    with session.no_autoflush:
+        result = await session.execute(
+            select(TransactionSwap)
+            .where(TransactionSwap.from_address == sender)
+            .order_by(TransactionSwap.block_number.desc())
+            .limit(limit)
+        )
+    return result.scalars().all()
+
+
+def transactions_swap_range_query(from_block: int, to_block: int):
+    """
+    Swaps de [from_block, to_block] na ordem on-chain, com as mesmas colunas
+    rotuladas das leituras por bloco (SWAP_RECORD_COLUMNS). Segue o índice
+    ix_transactions_swap_block_order.
+    """
+    return (
+        select(*SWAP_RECORD_COLUMNS)
+        .where(TransactionSwap.block_number.between(from_block, to_block))
+        .order_by(
+            TransactionSwap.block_number,
+            TransactionSwap.transaction_index,
+            TransactionSwap.log_index,
+        )
+    )
+
+
+async def stream_transactions_swap_by_range(
+    session: AsyncSession,
+    from_block: int,
+    to_block: int,
+    chunk_size: int | None = None,
+) -> AsyncIterator[list[dict]]:
+    """
+    Percorre os swaps do intervalo em lotes de `chunk_size` dicts no formato
+    dos detectores (como fetch_swap_records_by_block_number), com cursor no
+    servidor: a memória usada não depende do tamanho do intervalo.
+    """
+    query = transactions_swap_range_query(from_block, to_block).execution_options(
+        yield_per=chunk_size or AppConfig.SWAP_RANGE_CHUNK_SIZE
+    )
+    result = await session.stream(query)
+    async for chunk in result.mappings().partitions():
+        yield [dict(row) for row in chunk]
+
+
+async def stream_block_swaps_by_range(
+    session: AsyncSession,
+    from_block: int,
+    to_block: int,
+    chunk_size: int | None = None,
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    """
+    Como stream_transactions_swap_by_range, mas agrupado por bloco: produz
+    (block_number, swaps) para cada bloco do intervalo que tem swaps.
+    """
+    block_number, swaps = None, []
+    async for chunk in stream_transactions_swap_by_range(
+        session, from_block, to_block, chunk_size
+    ):
+        for row in chunk:
+            if row["block_number"] != block_number:
+                if swaps:
+                    yield block_number, swaps
+                block_number, swaps = row["block_number"], []
+            swaps.append(row)
+    if swaps:
+        yield block_number, swaps
+
+
+async def fetch_transactions_swap_by_range(
+    session: AsyncSession, from_block: int, to_block: int
+) -> list[dict]:
+    return [
+        row
+        async for chunk in stream_transactions_swap_by_range(
+            session, from_block, to_block
+        )
+        for row in chunk
+    ]
+
+
 # — BlockAnalyzed —
-async def insert_block_analyzed(session: AsyncSession, block_number: str) -> None:
-    obj = BlockAnalyzed(block_number=block_number)
-    session.add(obj)
-    try:
-        await session.commit()
-    except IntegrityError:
-        await session.rollback()
+async def insert_block_analyzed(session: AsyncSession, block_number: int) -> None:
+    await session.execute(
+        insert_ignore(session, BlockAnalyzed), [{"block_number": int(block_number)}]
+    )
+    await session.commit()
 
 
 async def get_analyzed_blocks_by_block_number(
-    session: AsyncSession, block_number: str
+    session: AsyncSession, block_number: int
 ) -> bool:
-    res = await session.get(BlockAnalyzed, block_number)
-    return res is not None
+    res = await session.get(BlockAnalyzed, int(block_number))
+    if res is not None:
+        return True
+
+    # Blocos processados pelo backfill ficam registrados como intervalos
+    return await is_block_in_analyzed_ranges(session, int(block_number))
+
+
+# — AnalyzedRange —
+async def is_block_in_analyzed_ranges(session: AsyncSession, block_number: int) -> bool:
+    """
+    Os intervalos são fundidos ao salvar e não se sobrepõem: só o último
+    intervalo que começa até o bloco pode contê-lo (uma busca na chave).
+    """
+    end_block = await session.scalar(
+        select(AnalyzedRange.end_block)
+        .where(AnalyzedRange.start_block <= block_number)
+        .order_by(AnalyzedRange.start_block.desc())
+        .limit(1)
+    )
+    return end_block is not None and end_block >= block_number
+
+
+async def fetch_analyzed_ranges(
+    session: AsyncSession, from_block: int, to_block: int
+) -> list[tuple[int, int]]:
+    # Como os intervalos não se sobrepõem, o primeiro que pode cobrir
+    # from_block é o último que começa até ele: limita a busca na chave aos
+    # dois lados em vez de percorrer todos os intervalos anteriores
+    first_start = (
+        select(func.max(AnalyzedRange.start_block))
+        .where(AnalyzedRange.start_block <= from_block)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(AnalyzedRange.start_block, AnalyzedRange.end_block)
+        .where(
+            AnalyzedRange.start_block >= func.coalesce(first_start, from_block),
+            AnalyzedRange.start_block <= to_block,
+            AnalyzedRange.end_block >= from_block,
+        )
+        .order_by(AnalyzedRange.start_block)
+    )
+    return [(start, end) for start, end in result.all()]
+
+
+async def insert_analyzed_ranges(
+    session: AsyncSession, ranges: list[tuple[int, int]], retries: int = 3
+) -> None:
+    """
+    Salva os intervalos analisados fundindo-os com os intervalos sobrepostos
+    ou adjacentes já existentes, em uma única transação.
+    """
+    for attempt in range(retries):
+        try:
+            for start, end in ranges:
+                neighbours = await session.execute(
+                    select(AnalyzedRange.start_block, AnalyzedRange.end_block).where(
+                        AnalyzedRange.start_block <= end + 1,
+                        AnalyzedRange.end_block >= start - 1,
+                    )
+                )
+                for other_start, other_end in neighbours.all():
+                    start = min(start, other_start)
+                    end = max(end, other_end)
+
+                await session.execute(
+                    delete(AnalyzedRange).where(
+                        AnalyzedRange.start_block <= end + 1,
+                        AnalyzedRange.end_block >= start - 1,
+                    )
+                )
+                session.add(AnalyzedRange(start_block=start, end_block=end))
+                await session.flush()
+            await session.commit()
+            return
+        except IntegrityError:
+            # outro processo salvou um intervalo ao mesmo tempo: refaz a fusão
+            await session.rollback()
+            if attempt == retries - 1:
+                raise
 
 
 # — SandwichAttackGroup & SandwichAttack —
 async def insert_attack_group(
-    session: AsyncSession, block_number: str, ta1: str, tv: str, ta2: str
+    session: AsyncSession, block_number: int, ta1: str, tv: str, ta2: str
 ) -> int:
     group = SandwichAttackGroup(block_number=block_number, ta1=ta1, tv=tv, ta2=ta2)
     session.add(group)
@@ -122,7 +558,7 @@ async def insert_attack_group(
 async def insert_attack(
     session: AsyncSession,
     attack_group_id: int,
-    block_number: str,
+    block_number: int,
     hash_value: str,
     from_address: str,
     to_address: str,
@@ -150,7 +586,7 @@ async def insert_attack(
 
 
 async def get_attacks_by_block_number(
-    session: AsyncSession, block_number: str
+    session: AsyncSession, block_number: int
 ) -> list[SandwichAttack]:
     q = await session.execute(
         select(SandwichAttack).where(SandwichAttack.block_number == block_number)
@@ -158,8 +594,32 @@ async def get_attacks_by_block_number(
     return q.scalars().all()
 
 
+async def get_attacks_by_hash(
+    session: AsyncSession, hash_value: str
+) -> list[SandwichAttack]:
+    q = await session.execute(
+        select(SandwichAttack).where(SandwichAttack.hash == hash_value)
+    )
+    return q.scalars().all()
+
+
+async def get_attacks_by_attacker(
+    session: AsyncSession, attacker: str, limit: int = 100
+) -> list[SandwichAttack]:
+    q = await session.execute(
+        select(SandwichAttack)
+        .where(
+            SandwichAttack.from_address == attacker,
+            SandwichAttack.transition_type == "attacker",
+        )
+        .order_by(SandwichAttack.block_number.desc())
+        .limit(limit)
+    )
+    return q.scalars().all()
+
+
 async def get_attack_groups_by_block(
-    session: AsyncSession, block_number: str
+    session: AsyncSession, block_number: int
 ) -> list[SandwichAttackGroup]:
     q = await session.execute(
         select(SandwichAttackGroup).where(
@@ -170,7 +630,7 @@ async def get_attack_groups_by_block(
 
 
 async def get_sandwich_attacks_by_block_grouped_by_attack_group(
-    session: AsyncSession, block_number: str
+    session: AsyncSession, block_number: int
 ) -> list[dict]:
     q = await session.execute(
         select(
@@ -191,31 +651,196 @@ async def get_sandwich_attacks_by_block_grouped_by_attack_group(
         )
         .join(SandwichAttackGroup)
         .where(SandwichAttack.block_number == block_number)
+        # ordem de gravação: grupo a grupo, ta1, tv, ta2
+        .order_by(SandwichAttack.id)
     )
     return [row._mapping for row in q.all()]
 
 
-async def save_detected_sandwich(
-    session: AsyncSession, block: dict, ta1: dict, tv: dict, ta2: dict
+def sandwich_attack_row(block_number: int, tx: dict, transition_type: str) -> dict:
+    return {
+        "block_number": block_number,
+        "hash": tx["hash"],
+        "from_address": tx["from"],
+        "to_address": tx["to"],
+        "token_in": tx["tokenIn"],
+        "token_out": tx["tokenOut"],
+        "amount_in": str(tx["amountIn"]),
+        "amount_out": str(tx["amountOut"]),
+        "gas_price": str(tx["gasPrice"]),
+        "transition_type": transition_type,
+    }
+
+
+async def save_single_dex_sandwiches(
+    session: AsyncSession, block_number: int, sandwiches: list[tuple[dict, dict, dict]]
 ) -> None:
-    # abre uma transação única
-    group_id = await insert_attack_group(
-        session, str(block["number"]), ta1["hash"], tv["hash"], ta2["hash"]
-    )
-    # insere as três txs
-    for tx, ttype in ((ta1, "attacker"), (tv, "victim"), (ta2, "attacker")):
-        session.add(
-            SandwichAttack(
-                attack_group_id=group_id,
-                block_number=str(block["number"]),
-                hash=tx["hash"],
-                from_address=tx["from"],
-                to_address=tx["to"],
-                token_in=tx["tokenIn"],
-                token_out=tx["tokenOut"],
-                amount_in=str(tx["amountIn"]),
-                amount_out=str(tx["amountOut"]),
-                gas_price=str(tx["gasPrice"]),
-                transition_type=ttype,
-            )
+    """
+    Grava os sanduíches (ta1, tv, ta2) do bloco e a marca em
+    single_dex_analyses, sem commit. Idempotente: grupos e swaps já salvos
+    são ignorados pelas chaves únicas, então reanalisar o bloco não duplica.
+    """
+    block_number = int(block_number)
+
+    def key(*txs) -> tuple:
+        return tuple(hex_to_bytes(tx).hex() for tx in txs)
+
+    groups = {
+        key(ta1["hash"], tv["hash"], ta2["hash"]): (ta1, tv, ta2)
+        for ta1, tv, ta2 in sandwiches
+    }
+    if groups:
+        await session.execute(
+            insert_ignore(session, SandwichAttackGroup),
+            [
+                {"block_number": block_number, "ta1": ta1, "tv": tv, "ta2": ta2}
+                for ta1, tv, ta2 in groups
+            ],
         )
+        result = await session.execute(
+            select(
+                SandwichAttackGroup.id,
+                SandwichAttackGroup.ta1,
+                SandwichAttackGroup.tv,
+                SandwichAttackGroup.ta2,
+            ).where(SandwichAttackGroup.block_number == block_number)
+        )
+        group_ids = {key(ta1, tv, ta2): gid for gid, ta1, tv, ta2 in result.all()}
+
+        attacks = []
+        for group_key, (ta1, tv, ta2) in groups.items():
+            for tx, ttype in ((ta1, "attacker"), (tv, "victim"), (ta2, "attacker")):
+                row = sandwich_attack_row(block_number, tx, ttype)
+                row["attack_group_id"] = group_ids[group_key]
+                attacks.append(row)
+        await session.execute(insert_ignore(session, SandwichAttack), attacks)
+
+    await session.execute(
+        insert_ignore(session, SingleDexAnalysis),
+        [{"block_number": block_number, "total_sandwiches": len(groups)}],
+    )
+
+
+async def get_single_dex_analysis(
+    session: AsyncSession, block_number: int
+) -> int | None:
+    """
+    Total de sanduíches single-DEX salvos para o bloco, ou None se o bloco
+    ainda não foi analisado.
+    """
+    res = await session.get(SingleDexAnalysis, int(block_number))
+    return res.total_sandwiches if res else None
+
+
+# — MultiLayeredSandwich —
+# Campos do resultado de detect_multi_layered_burger_sandwiches salvos por
+# sanduíche, além de block/attacker_addr
+MULTI_LAYERED_FIELDS = (
+    "victims_addr",
+    "front_run",
+    "back_run",
+    "victims_txs",
+    "cost_amount",
+    "gain_amount",
+    "cost_usd",
+    "gain_usd",
+    "front_burned_eth",
+    "front_tipped_eth",
+    "back_burned_eth",
+    "back_tipped_eth",
+    "front_burned_usd",
+    "front_tipped_usd",
+    "back_burned_usd",
+    "back_tipped_usd",
+)
+
+
+def multi_layered_row(block_number: int, detector_version: int, sandwich: dict) -> dict:
+    row = {field: sandwich.get(field) for field in MULTI_LAYERED_FIELDS}
+    # um front/back-run isolado vem como hash; agrupados, como lista
+    for field in ("front_run", "back_run"):
+        if isinstance(row[field], str):
+            row[field] = [row[field]]
+    row.update(
+        block_number=int(block_number),
+        detector_version=detector_version,
+        attacker_addr=sandwich["attacker_addr"],
+    )
+    return row
+
+
+async def save_multi_layered_sandwiches(
+    session: AsyncSession,
+    block_number: int,
+    detector_version: int,
+    rows: list[dict],
+    block_hash: str | None = None,
+    prices_resolved: bool = True,
+) -> None:
+    """
+    Substitui os resultados multi-layered do bloco pelos da versão atual do
+    detector (sem commit).
+    """
+    block_number = int(block_number)
+    await session.execute(
+        delete(MultiLayeredSandwich).where(
+            MultiLayeredSandwich.block_number == block_number
+        )
+    )
+    await session.execute(
+        delete(MultiLayeredAnalysis).where(
+            MultiLayeredAnalysis.block_number == block_number
+        )
+    )
+    if rows:
+        await session.execute(insert(MultiLayeredSandwich), rows)
+    await session.execute(
+        insert(MultiLayeredAnalysis),
+        [
+            {
+                "block_number": block_number,
+                "detector_version": detector_version,
+                "total_sandwiches": len(rows),
+                "block_hash": block_hash,
+                "prices_resolved": prices_resolved,
+                "analyzed_at": int(time.time()),
+            }
+        ],
+    )
+
+
+async def get_multi_layered_analysis(
+    session: AsyncSession, block_number: int
+) -> MultiLayeredAnalysis | None:
+    return await session.get(MultiLayeredAnalysis, int(block_number))
+
+
+async def get_multi_layered_sandwiches(
+    session: AsyncSession, block_number: int, detector_version: int
+) -> list[dict] | None:
+    """
+    Sanduíches multi-layered salvos para o bloco, no formato do detector.
+    None quando o bloco ainda não foi analisado por essa versão do detector.
+    """
+    analysis = await session.get(MultiLayeredAnalysis, int(block_number))
+    if analysis is None or analysis.detector_version != detector_version:
+        return None
+    if analysis.total_sandwiches == 0:
+        return []
+
+    result = await session.execute(
+        select(MultiLayeredSandwich)
+        .where(
+            MultiLayeredSandwich.block_number == int(block_number),
+            MultiLayeredSandwich.detector_version == detector_version,
+        )
+        .order_by(MultiLayeredSandwich.id)
+    )
+    return [
+        {
+            "block": obj.block_number,
+            "attacker_addr": obj.attacker_addr,
+            **{field: getattr(obj, field) for field in MULTI_LAYERED_FIELDS},
+        }
+        for obj in result.scalars().all()
+    ]
@@ -0,0 +1,323 @@
+from collections import Counter
+from typing import Awaitable, Callable, List, Tuple
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import AppConfig
+from app.database import AsyncSessionLocal
+from app.dbo.db_functions import (
+    bulk_insert_ignore,
+    multi_layered_row,
+    save_block_header,
+    save_multi_layered_sandwiches,
+    save_single_dex_sandwiches,
+    transaction_swap_row,
+)
+from app.dbo.models import (
+    BlockAnalyzed,
+    DexName,
+    PoolMetadata,
+    TransactionSwap,
+)
+from app.utils.loggers import error_logger
+from app.utils.metrics import register_metrics
+
+
+class WriteOp:
+    """
+    Escrita enfileirada: linhas a inserir (INSERT ... ON CONFLICT DO NOTHING
+    por modelo) e/ou uma função que recebe a sessão. Tudo de uma operação é
+    gravado na mesma transação.
+    """
+
+    __slots__ = ("rows", "fn", "future")
+
+    def __init__(
+        self,
+        rows: List[Tuple[type, List[dict]]] | None = None,
+        fn: Callable[[AsyncSession], Awaitable[None]] | None = None,
+        future: asyncio.Future | None = None,
+    ):
+        self.rows = rows or []
+        self.fn = fn
+        self.future = future
+
+    @property
+    def row_count(self) -> int:
+        return sum(len(rows) for _, rows in self.rows) + (1 if self.fn else 0)
+
+
+class DbWriter:
+    """
+    Escritor write-behind: handlers e etapas do pipeline enfileiram escritas e
+    uma única tarefa as agrupa em transações de até `max_batch_rows` linhas
+    ou `flush_interval` segundos, evitando disputa pelo lock de escrita do
+    SQLite. Com `wait=True` o chamador aguarda o commit do lote. Fora do ciclo
+    de vida da aplicação (CLI, testes) as escritas são feitas na hora.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_batch_rows: int = 1000,
+        flush_interval: float = 0.05,
+        queue_size: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_rows = max_batch_rows
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.batches = 0
+        self.ops = 0
+        self.rows = 0
+        self.failed = 0
+        self.commit_seconds = 0.0
+
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Grava tudo o que ainda está na fila e encerra a tarefa.
+        """
+        if not self.running:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+
+    async def write(
+        self,
+        rows: List[Tuple[type, List[dict]]] | None = None,
+        fn: Callable[[AsyncSession], Awaitable[None]] | None = None,
+        wait: bool = True,
+    ) -> None:
+        if not self.running:
+            await self._commit_batch([WriteOp(rows, fn)], raise_errors=True)
+            return
+
+        future = asyncio.get_running_loop().create_future() if wait else None
+        # fila cheia: o chamador espera (contrapressão)
+        await self.queue.put(WriteOp(rows, fn, future))
+        if future is not None:
+            await future
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            op = await self.queue.get()
+            if op is None:
+                break
+
+            batch = [op]
+            row_count = op.row_count
+            deadline = time.monotonic() + self.flush_interval
+            while row_count < self.max_batch_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    op = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if op is None:
+                    stopping = True
+                    break
+                batch.append(op)
+                row_count += op.row_count
+
+            await self._commit_batch(batch)
+
+    async def _apply(self, session: AsyncSession, batch: List[WriteOp]) -> None:
+        # Linhas do mesmo modelo viram um único executemany (COPY no
+        # PostgreSQL para lotes grandes)
+        rows_by_model: dict = {}
+        for op in batch:
+            for model, rows in op.rows:
+                rows_by_model.setdefault(model, []).extend(rows)
+        for model, rows in rows_by_model.items():
+            await bulk_insert_ignore(session, model, rows)
+
+        for op in batch:
+            if op.fn is not None:
+                await op.fn(session)
+
+    async def _commit_batch(
+        self, batch: List[WriteOp], raise_errors: bool = False
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                await self._apply(session, batch)
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                error_logger.error(f"DbWriter: falha ao gravar: {e}")
+                self._resolve(batch[0], e)
+                if raise_errors:
+                    raise
+                return
+            # isola a operação com problema gravando uma a uma
+            for op in batch:
+                await self._commit_batch([op])
+            return
+
+        self.commit_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.ops += len(batch)
+        self.rows += sum(op.row_count for op in batch)
+        for op in batch:
+            self._resolve(op, None)
+
+    @staticmethod
+    def _resolve(op: WriteOp, error: Exception | None) -> None:
+        if op.future is None or op.future.done():
+            return
+        if error is None:
+            op.future.set_result(None)
+        else:
+            op.future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self.queue.qsize(),
+            "batches": self.batches,
+            "ops": self.ops,
+            "rows": self.rows,
+            "failed": self.failed,
+            "avg_batch_rows": (
+                round(self.rows / self.batches, 1) if self.batches else None
+            ),
+            "rows_per_second": (
+                round(self.rows / self.commit_seconds, 1)
+                if self.commit_seconds > 0
+                else None
+            ),
+        }
+
+
+db_writer = DbWriter(
+    max_batch_rows=AppConfig.DB_WRITER_BATCH_ROWS,
+    flush_interval=AppConfig.DB_WRITER_FLUSH_MS / 1000,
+    queue_size=AppConfig.DB_WRITER_QUEUE_SIZE,
+)
+
+register_metrics("db_writer", db_writer.stats)
+
+
+# — Operações usadas pelos handlers e pelo pipeline —
+async def write_block_swaps(
+    block_number: int,
+    swaps: List[dict],
+    mark_analyzed: bool = True,
+    header: dict | None = None,
+) -> None:
+    """
+    Swaps do bloco, marca de analisado e (se informado) o cabeçalho do bloco
+    com as contagens na mesma transação; aguarda o commit.
+    """
+    rows = [(TransactionSwap, [transaction_swap_row(swap) for swap in swaps])]
+    if mark_analyzed:
+        rows.append((BlockAnalyzed, [{"block_number": int(block_number)}]))
+
+    fn = None
+    if header is not None and AppConfig.BLOCK_HEADER_PERSIST:
+        header = {**header, "swap_count": len(swaps)}
+        fn = lambda session: save_block_header(session, header)  # noqa: E731
+
+    await db_writer.write(rows=rows, fn=fn)
+
+
+async def write_range_swaps(
+    swaps: List[dict], headers: List[dict] | None = None
+) -> None:
+    """
+    Swaps de um intervalo de blocos e (se informados) os cabeçalhos dos
+    blocos com swaps, com as contagens, na mesma transação; aguarda o commit.
+    """
+    if not swaps:
+        return
+
+    if not AppConfig.BLOCK_HEADER_PERSIST:
+        headers = None
+    swap_counts = Counter(int(swap["block_number"]) for swap in swaps)
+
+    async def save_headers(session: AsyncSession) -> None:
+        for header in headers:
+            await save_block_header(
+                session, {**header, "swap_count": swap_counts[header["number"]]}
+            )
+
+    await db_writer.write(
+        rows=[(TransactionSwap, [transaction_swap_row(swap) for swap in swaps])],
+        fn=save_headers if headers else None,
+    )
+
+
+async def write_dex_name(pool_address: str, dex_name: str) -> None:
+    await db_writer.write(
+        rows=[(DexName, [{"pool_address": pool_address, "dex_name": dex_name}])],
+        wait=False,
+    )
+
+
+async def write_pool_metadata(metadata_list: List[dict]) -> None:
+    await db_writer.write(rows=[(PoolMetadata, metadata_list)], wait=False)
+
+
+async def write_block_header(block_data: dict) -> None:
+    await db_writer.write(
+        fn=lambda session: save_block_header(session, block_data), wait=False
+    )
+
+
+async def write_single_dex_sandwiches(
+    block_number: int, sandwiches: List[tuple]
+) -> None:
+    """
+    Todos os sanduíches single-DEX do bloco em uma única operação; aguarda o
+    commit: a resposta é lida do banco em seguida.
+    """
+    await db_writer.write(
+        fn=lambda session: save_single_dex_sandwiches(session, block_number, sandwiches)
+    )
+
+
+async def write_multi_layered_sandwiches(
+    block_number: int,
+    detector_version: int,
+    detected: List[dict],
+    block_hash: str | None = None,
+    prices_resolved: bool = True,
+) -> None:
+    """
+    Aguarda o commit: uma nova requisição para o bloco já encontra o
+    resultado em vez de refazer a detecção e as consultas de preço.
+    """
+    # linhas montadas agora: o chamador ainda altera os dicts do detector
+    rows = [
+        multi_layered_row(block_number, detector_version, sandwich)
+        for sandwich in detected
+    ]
+    await db_writer.write(
+        fn=lambda session: save_multi_layered_sandwiches(
+            session,
+            block_number,
+            detector_version,
+            rows,
+            block_hash=block_hash,
+            prices_resolved=prices_resolved,
+        )
+    )
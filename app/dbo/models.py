@@ -1,69 +1,228 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import JSON, Boolean, Column, Float, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.dbo.types import Address, Amount, BlockNumber, FloatString, Hash
 
 
 class SandwichAttackGroup(Base):
     __tablename__ = "sandwich_attack_group"
 
     id = Column(Integer, primary_key=True, index=True)
-    block_number = Column(String, index=True)
-    ta1 = Column(String, nullable=False)
-    tv = Column(String, nullable=False)
-    ta2 = Column(String, nullable=False)
+    block_number = Column(BlockNumber, index=True)
+    ta1 = Column(Hash, nullable=False)
+    tv = Column(Hash, nullable=False)
+    ta2 = Column(Hash, nullable=False)
 
     attacks = relationship("SandwichAttack", back_populates="group")
 
+    # o mesmo sanduíche detectado de novo não gera outro grupo
+    __table_args__ = (
+        Index(
+            "uq_sandwich_attack_group_block_txs",
+            "block_number",
+            "ta1",
+            "tv",
+            "ta2",
+            unique=True,
+        ),
+    )
+
 
 class SandwichAttack(Base):
     __tablename__ = "sandwiches_attacks"
 
     id = Column(Integer, primary_key=True, index=True)
     attack_group_id = Column(Integer, ForeignKey("sandwich_attack_group.id"))
-    block_number = Column(String, index=True)
-    hash = Column(String, nullable=False)
-    from_address = Column("from", String)
-    to_address = Column("to", String)
+    block_number = Column(BlockNumber, index=True)
+    hash = Column(Hash, nullable=False)
+    from_address = Column("from", Address)
+    to_address = Column("to", Address)
     token_in = Column(String)
     token_out = Column(String)
-    amount_in = Column(String)
-    amount_out = Column(String)
-    gas_price = Column(String)
+    amount_in = Column(Amount)
+    amount_out = Column(Amount)
+    gas_price = Column(Amount)
     transition_type = Column(String)
 
     group = relationship("SandwichAttackGroup", back_populates="attacks")
 
+    __table_args__ = (
+        Index("ix_sandwiches_attacks_hash", "hash"),
+        Index(
+            "uq_sandwiches_attacks_group_hash",
+            "attack_group_id",
+            "hash",
+            unique=True,
+        ),
+        # por pool e por remetente/atacante (transition_type = 'attacker'),
+        # já na ordem de bloco
+        Index("ix_sandwiches_attacks_to_block", "to", "block_number"),
+        Index(
+            "ix_sandwiches_attacks_from_type_block",
+            "from",
+            "transition_type",
+            "block_number",
+        ),
+    )
+
+
+class SingleDexAnalysis(Base):
+    """
+    Bloco já analisado por detect_single_dex_sandwiches; os sanduíches
+    encontrados estão em sandwich_attack_group / sandwiches_attacks.
+    """
+
+    __tablename__ = "single_dex_analyses"
+    block_number = Column(BlockNumber, primary_key=True)
+    total_sandwiches = Column(Integer, nullable=False)
+
+
+class MultiLayeredAnalysis(Base):
+    """
+    Bloco já analisado pelo detector multi-layered e a versão do detector que
+    gerou os resultados salvos em multi_layered_sandwiches.
+
+    `block_hash` identifica o bloco analisado: se uma reorganização o
+    substituir, o resultado deixa de valer. `prices_resolved` falso indica
+    que faltou algum preço e os valores em USD são provisórios.
+    """
+
+    __tablename__ = "multi_layered_analyses"
+    block_number = Column(BlockNumber, primary_key=True)
+    detector_version = Column(Integer, nullable=False)
+    total_sandwiches = Column(Integer, nullable=False)
+    block_hash = Column(Hash)
+    prices_resolved = Column(Boolean)
+    # epoch (s) da análise, para espaçar as novas tentativas de preço
+    analyzed_at = Column(Integer)
+
+
+class MultiLayeredSandwich(Base):
+    __tablename__ = "multi_layered_sandwiches"
+
+    id = Column(Integer, primary_key=True)
+    block_number = Column(BlockNumber, nullable=False)
+    detector_version = Column(Integer, nullable=False)
+    attacker_addr = Column(Address)
+    victims_addr = Column(JSON)
+    # swaps como "<hash>_<log_index>"
+    front_run = Column(JSON)
+    back_run = Column(JSON)
+    victims_txs = Column(JSON)
+    cost_amount = Column(Float)
+    gain_amount = Column(Float)
+    cost_usd = Column(Float)
+    gain_usd = Column(Float)
+    front_burned_eth = Column(Float)
+    front_tipped_eth = Column(Float)
+    back_burned_eth = Column(Float)
+    back_tipped_eth = Column(Float)
+    front_burned_usd = Column(Float)
+    front_tipped_usd = Column(Float)
+    back_burned_usd = Column(Float)
+    back_tipped_usd = Column(Float)
+
+    __table_args__ = (
+        Index(
+            "ix_multi_layered_sandwiches_block_version",
+            "block_number",
+            "detector_version",
+        ),
+    )
+
 
 class BlockAnalyzed(Base):
     __tablename__ = "blocks_analyzed"
-    block_number = Column(String, primary_key=True, index=True)
+    block_number = Column(BlockNumber, primary_key=True, index=True)
+
+
+class AnalyzedRange(Base):
+    """
+    Intervalo fechado [start_block, end_block] de blocos já analisados pelo
+    backfill; intervalos vizinhos são fundidos ao salvar.
+    """
+
+    __tablename__ = "analyzed_ranges"
+    start_block = Column(Integer, primary_key=True)
+    end_block = Column(Integer, nullable=False, index=True)
 
 
 class TransactionSwap(Base):
     __tablename__ = "transactions_swap"
 
-    hash = Column(String, primary_key=True)
-    block_number = Column(String, primary_key=True)
+    hash = Column(Hash, primary_key=True)
+    block_number = Column(BlockNumber, primary_key=True)
     log_index = Column(Integer, primary_key=True)
     transaction_index = Column(Integer)
-    from_address = Column("from", String)
-    to_address = Column("to", String)
+    from_address = Column("from", Address)
+    to_address = Column("to", Address)
     dex_name = Column(String)
     token_in = Column("tokenIn", String)
-    token_in_address = Column("tokenInAddress", String)
+    token_in_address = Column("tokenInAddress", Address)
     token_out = Column("tokenOut", String)
-    token_out_address = Column("tokenOutAddress", String)
-    amount_in = Column("amountIn", String)
-    amount_out = Column("amountOut", String)
-    gas_price = Column("gasPrice", String)
+    token_out_address = Column("tokenOutAddress", Address)
+    amount_in = Column("amountIn", Amount)
+    amount_out = Column("amountOut", Amount)
+    gas_price = Column("gasPrice", Amount)
     gas_used = Column(Integer)
-    gas_fee_wei = Column(String)
-    gas_fee_eth = Column(String)
-    gas_burned = Column(String, nullable=True)
-    gas_tipped = Column(String, nullable=True)
+    gas_fee_wei = Column(Amount)
+    gas_fee_eth = Column(FloatString)
+    gas_burned = Column(FloatString, nullable=True)
+    gas_tipped = Column(FloatString, nullable=True)
+
+    # Busca por hash usa o prefixo da chave primária (hash, block_number,
+    # log_index)
+    __table_args__ = (
+        # leitura de um bloco (ou intervalo) já na ordem das transações
+        Index(
+            "ix_transactions_swap_block_order",
+            "block_number",
+            "transaction_index",
+            "log_index",
+        ),
+        Index("ix_transactions_swap_to_block", "to", "block_number"),
+        Index("ix_transactions_swap_from_block", "from", "block_number"),
+    )
 
 
 class DexName(Base):
     __tablename__ = "dex_name"
     pool_address = Column(String, primary_key=True)
     dex_name = Column(String, nullable=False)
+
+
+class PoolMetadata(Base):
+    __tablename__ = "pool_metadata"
+    pool_address = Column(String, primary_key=True)
+    token0 = Column(String, nullable=False)
+    token1 = Column(String, nullable=False)
+    symbol0 = Column(String)
+    symbol1 = Column(String)
+    decimals0 = Column(Integer, nullable=True)
+    decimals1 = Column(Integer, nullable=True)
+
+
+class BlockHeader(Base):
+    __tablename__ = "block_headers"
+    number = Column(Integer, primary_key=True)
+    hash = Column(String, nullable=False)
+    nonce = Column(String)
+    miner = Column(String)
+    parent_hash = Column(String)
+    timestamp = Column(Integer)
+    size = Column(Integer)
+    gas_used = Column(Integer)
+    base_fee_per_gas = Column(String, nullable=True)
+    gas_limit = Column(Integer)
+    difficulty = Column(String)
+    total_difficulty = Column(String)
+    withdrawals = Column(JSON)
+    extra_data = Column(String)
+    transactions_hashes = Column(JSON)
+    # Preenchidos quando o bloco é analisado
+    transaction_count = Column(Integer, nullable=True)
+    swap_count = Column(Integer, nullable=True)
+    # Falso para blocos ainda reorganizáveis: o cabeçalho é substituído quando
+    # o bloco é buscado de novo. Nulo nas linhas de antes da coluna, quando só
+    # cabeçalhos finalizados eram salvos
+    finalized = Column(Boolean, nullable=True)
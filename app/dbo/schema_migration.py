@@ -0,0 +1,277 @@
+"""
+Migração das tabelas de swaps e sanduíches do esquema textual (tudo String)
+para o esquema compacto de app/dbo/types.py.
+
+Uma tabela ainda está no esquema antigo quando a coluna block_number é texto.
+A migração roda no init_db (inicialização da API e da CLI) e também pode ser
+executada sozinha:
+
+    python -m app.cli migrate
+
+PostgreSQL: ALTER TABLE ... ALTER COLUMN ... TYPE ... USING, no lugar e em
+uma única reescrita por tabela. SQLite (sem ALTER COLUMN): a tabela antiga é
+renomeada, a nova é criada e os dados são copiados em lotes, convertidos pelos
+próprios tipos das colunas.
+"""
+
+from sqlalchemy import String, inspect, insert
+from sqlalchemy.engine import Connection
+
+from app.database import Base
+from app.dbo.models import (
+    BlockAnalyzed,
+    SandwichAttack,
+    SandwichAttackGroup,
+    TransactionSwap,
+)
+from app.dbo.types import (
+    AMOUNT_BYTES,
+    Address,
+    Amount,
+    BlockNumber,
+    FloatString,
+    Hash,
+)
+from app.utils.loggers import logger
+
+# Pais antes dos filhos (sandwiches_attacks -> sandwich_attack_group)
+COMPACT_MODELS = (BlockAnalyzed, TransactionSwap, SandwichAttackGroup, SandwichAttack)
+
+# Tipo no PostgreSQL e expressão que converte o texto antigo
+POSTGRES_CONVERSIONS = {
+    BlockNumber: ("INTEGER", "{column}::integer"),
+    Hash: ("BYTEA", "decode(regexp_replace({column}, '^0x', ''), 'hex')"),
+    Address: ("BYTEA", "decode(regexp_replace({column}, '^0x', ''), 'hex')"),
+    Amount: ("NUMERIC(78, 0)", "NULLIF({column}, '')::numeric(78, 0)"),
+    FloatString: ("DOUBLE PRECISION", "NULLIF({column}, '')::double precision"),
+}
+
+MIGRATION_BATCH_ROWS = 5000
+
+
+def legacy_tables(connection: Connection) -> list:
+    inspector = inspect(connection)
+    tables = []
+    for model in COMPACT_MODELS:
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            continue
+        columns = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+        if isinstance(columns.get("block_number"), String):
+            tables.append(table)
+    return tables
+
+
+def migrate_compact_schema(connection: Connection) -> list[str]:
+    """
+    Converte as tabelas que ainda estão no esquema textual e retorna seus
+    nomes. Usar via AsyncConnection.run_sync, dentro de uma transação.
+    """
+    tables = legacy_tables(connection)
+    if not tables:
+        return []
+
+    if connection.dialect.name == "postgresql":
+        for table in tables:
+            migrate_postgres_table(connection, table)
+    else:
+        migrate_sqlite_tables(connection, tables)
+
+    logger.info(f"Esquema compacto: tabelas migradas {[t.name for t in tables]}")
+    return [t.name for t in tables]
+
+
+def deduplicate_sandwich_groups(connection: Connection) -> None:
+    """
+    Antes da chave única (block_number, ta1, tv, ta2) cada nova requisição
+    regravava os mesmos grupos: remove as duplicatas para que os índices
+    únicos possam ser criados.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table("sandwich_attack_group"):
+        return
+    existing = {i["name"] for i in inspector.get_indexes("sandwich_attack_group")}
+    if "uq_sandwich_attack_group_block_txs" in existing:
+        return
+
+    delete_duplicate_sandwich_groups(
+        connection, "sandwich_attack_group", "sandwiches_attacks"
+    )
+
+
+def delete_duplicate_sandwich_groups(
+    connection: Connection, groups_table: str, attacks_table: str, text: bool = False
+) -> None:
+    """
+    Mantém o grupo de menor id de cada sanduíche e um swap por (grupo, hash).
+    Com `text`, as tabelas ainda estão no esquema textual e os hashes são
+    comparados sem o prefixo 0x, como ficarão depois da conversão.
+    """
+
+    def key(column: str) -> str:
+        return f"lower(replace({column}, '0x', ''))" if text else column
+
+    first_groups = (
+        f'SELECT MIN(id) FROM "{groups_table}" '
+        f"GROUP BY block_number, {key('ta1')}, {key('tv')}, {key('ta2')}"
+    )
+    connection.exec_driver_sql(
+        f'DELETE FROM "{attacks_table}" WHERE attack_group_id NOT IN ({first_groups})'
+    )
+    connection.exec_driver_sql(
+        f'DELETE FROM "{groups_table}" WHERE id NOT IN ({first_groups})'
+    )
+    connection.exec_driver_sql(
+        f'DELETE FROM "{attacks_table}" WHERE id NOT IN '
+        f'(SELECT MIN(id) FROM "{attacks_table}" '
+        f"GROUP BY attack_group_id, {key('hash')})"
+    )
+
+
+def add_missing_columns(connection: Connection) -> None:
+    """
+    create_all também não adiciona colunas novas a tabelas existentes:
+    adiciona as colunas anuláveis declaradas nos modelos que faltam no banco.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(
+                f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+            )
+
+
+def create_missing_indexes(connection: Connection) -> None:
+    """
+    create_all não cria índices novos em tabelas que já existem: cria os
+    índices declarados nos modelos que ainda faltam no banco.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """
+    Sequência completa do init_db: migra as tabelas do esquema textual, cria
+    as tabelas e colunas que faltam, remove sanduíches duplicados e cria os
+    índices que faltam.
+    """
+    migrate_compact_schema(connection)
+    Base.metadata.create_all(connection)
+    widen_sqlite_amounts(connection)
+    add_missing_columns(connection)
+    deduplicate_sandwich_groups(connection)
+    create_missing_indexes(connection)
+
+
+def widen_sqlite_amounts(connection: Connection) -> None:
+    """
+    SQLite: regrava com largura fixa os valores Amount gravados por versões
+    anteriores do esquema compacto (BLOB com sinal e tamanho mínimo, que não
+    ordenava corretamente).
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        columns = [c.name for c in table.columns if isinstance(c.type, Amount)]
+        if not columns or not inspector.has_table(table.name):
+            continue
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        narrow = " OR ".join(f'length("{name}") != {AMOUNT_BYTES}' for name in columns)
+        assignments = ", ".join(f'"{name}" = ?' for name in columns)
+        while True:
+            rows = connection.exec_driver_sql(
+                f'SELECT rowid, {column_list} FROM "{table.name}" '
+                f"WHERE {narrow} LIMIT ?",
+                (MIGRATION_BATCH_ROWS,),
+            ).all()
+            if not rows:
+                break
+            connection.exec_driver_sql(
+                f'UPDATE "{table.name}" SET {assignments} WHERE rowid = ?',
+                [
+                    tuple(widen_amount(value) for value in row[1:]) + (row[0],)
+                    for row in rows
+                ],
+            )
+
+
+def widen_amount(value: bytes | None) -> bytes | None:
+    if value is None:
+        return None
+    value = int.from_bytes(value, "big", signed=True)
+    if value < 0:
+        # fora do uint256: não tem representação na largura fixa
+        logger.warning(f"Valor negativo descartado na migração de Amount: {value}")
+        return None
+    return value.to_bytes(AMOUNT_BYTES, "big")
+
+
+def migrate_postgres_table(connection: Connection, table) -> None:
+    alterations = []
+    for column in table.columns:
+        conversion = POSTGRES_CONVERSIONS.get(type(column.type))
+        if conversion is None:
+            continue
+        sql_type, using = conversion
+        name = f'"{column.name}"'
+        alterations.append(
+            f"ALTER COLUMN {name} TYPE {sql_type} USING {using.format(column=name)}"
+        )
+    connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ' + ", ".join(alterations))
+
+
+def migrate_sqlite_tables(connection: Connection, tables: list) -> None:
+    inspector = inspect(connection)
+    legacy_columns = {}
+    for table in tables:
+        legacy_columns[table.name] = [
+            c["name"] for c in inspector.get_columns(table.name)
+        ]
+        # os nomes dos índices seriam recriados pela tabela nova
+        for index in inspector.get_indexes(table.name):
+            connection.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+        connection.exec_driver_sql(
+            f'ALTER TABLE "{table.name}" RENAME TO "{table.name}_legacy"'
+        )
+
+    # As tabelas novas já nascem com os índices únicos dos sanduíches: as
+    # duplicatas gravadas antes deles são removidas antes da cópia
+    names = {table.name for table in tables}
+    groups, attacks = SandwichAttackGroup.__tablename__, SandwichAttack.__tablename__
+    if {groups, attacks} <= names:
+        delete_duplicate_sandwich_groups(
+            connection, f"{groups}_legacy", f"{attacks}_legacy", text=True
+        )
+
+    Base.metadata.create_all(connection, tables=tables)
+
+    for table in tables:
+        columns = [
+            c.name for c in table.columns if c.name in legacy_columns[table.name]
+        ]
+        copy_legacy_rows(connection, table, columns)
+        connection.exec_driver_sql(f'DROP TABLE "{table.name}_legacy"')
+
+
+def copy_legacy_rows(connection: Connection, table, columns: list[str]) -> None:
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    last_rowid = 0
+    while True:
+        rows = connection.exec_driver_sql(
+            f'SELECT rowid, {column_list} FROM "{table.name}_legacy" '
+            f"WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, MIGRATION_BATCH_ROWS),
+        ).all()
+        if not rows:
+            return
+        last_rowid = rows[-1][0]
+        connection.execute(insert(table), [dict(zip(columns, row[1:])) for row in rows])
@@ -0,0 +1,125 @@
+"""
+Tipos de coluna do esquema compacto. Hashes e endereços são gravados como
+bytes (32 e 20), números de bloco como inteiros e valores em wei como
+NUMERIC(78, 0) no PostgreSQL; para o resto da aplicação os valores continuam
+com a forma de antes (hex, str).
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+
+from eth_utils import to_checksum_address
+from sqlalchemy import Float, Integer, LargeBinary, Numeric
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+
+def hex_to_bytes(value: str | bytes) -> bytes:
+    if isinstance(value, bytes):
+        return bytes(value)
+    return bytes.fromhex(value.removeprefix("0x"))
+
+
+@lru_cache(maxsize=65536)
+def bytes_to_address(value: bytes) -> str:
+    return to_checksum_address(value) if value else ""
+
+
+class BlockNumber(TypeDecorator):
+    """
+    Número do bloco como INTEGER; aceita também a forma textual ("123").
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(value)
+
+
+class Hash(TypeDecorator):
+    """
+    Hash de 32 bytes (BLOB/bytea), lido como hex sem o prefixo 0x, no mesmo
+    formato de HexBytes.hex() usado na ingestão.
+    """
+
+    impl = LargeBinary(32)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else hex_to_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else bytes(value).hex()
+
+
+class Address(TypeDecorator):
+    """
+    Endereço de 20 bytes (BLOB/bytea), lido em formato checksum. String
+    vazia (endereço desconhecido) vira bytes vazios e volta como "".
+    """
+
+    impl = LargeBinary(20)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else hex_to_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else bytes_to_address(bytes(value))
+
+
+# Largura do Amount no SQLite (uint256)
+AMOUNT_BYTES = 32
+
+
+class Amount(TypeDecorator):
+    """
+    Inteiro sem limite de 64 bits (uint256 em wei), lido como str.
+
+    PostgreSQL: NUMERIC(78, 0), exato e comparável. SQLite: NUMERIC perderia
+    precisão acima de 64 bits, então o valor é gravado como BLOB big-endian
+    sem sinal de 32 bytes. Com largura fixa, a comparação byte a byte do
+    SQLite segue a ordem numérica (ORDER BY e filtros por faixa funcionam).
+    """
+
+    impl = Numeric(78, 0)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.NUMERIC(78, 0))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or value == "":
+            return None
+        value = int(value)
+        if dialect.name == "postgresql":
+            return Decimal(value)
+        if not 0 <= value < 2**256:
+            raise ValueError(f"Valor fora do intervalo uint256: {value}")
+        return value.to_bytes(AMOUNT_BYTES, "big")
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return str(int.from_bytes(value, "big"))
+        return str(int(value))
+
+
+class FloatString(TypeDecorator):
+    """
+    Valor em ETH já calculado como float na ingestão (REAL / double
+    precision), lido como str.
+    """
+
+    impl = Float
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None or value == "" else float(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else str(value)
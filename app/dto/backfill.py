@@ -0,0 +1,29 @@
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class BackfillRequest(BaseModel):
+    from_block: int = Field(ge=0, description="First block of the range")
+    to_block: int = Field(ge=0, description="Last block of the range (inclusive)")
+    concurrency: int | None = Field(
+        default=None, ge=1, le=64, description="Blocks analyzed in parallel"
+    )
+
+
+class BackfillJobResponse(BaseModel):
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed", "cancelled"]
+    from_block: int
+    to_block: int
+    concurrency: int
+    total_blocks: int
+    skipped_blocks: int
+    blocks_done: int
+    failed_blocks: int
+    swaps: int
+    progress_percent: float
+    elapsed_seconds: float
+    blocks_per_second: float
+    swaps_per_second: float
+    eta_seconds: float | None
+    error: str | None
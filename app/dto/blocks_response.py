@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -26,6 +26,9 @@ class BlockItem(BaseModel):
     withdrawals: List[Withdrawal]
     extra_data: str
     transactions_hashes: List[str]
+    # Só para blocos já analisados
+    transaction_count: Optional[int] = None
+    swap_count: Optional[int] = None
 
 
 class BlocksResponse(BaseModel):
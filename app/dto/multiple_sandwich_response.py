@@ -1,27 +1,42 @@
 from typing import List, Dict, Union, Optional
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 
 
 class SwapEvent(BaseModel):
-    to_address: str
-    amount_out: str
-    gas_fee_wei: str
-    gas_price: str
-    gas_fee_eth: str
+    """
+    Aceita também os swaps no formato dos detectores ("from", "tokenIn",
+    ...): a validação acontece só aqui, na resposta HTTP.
+    """
+
+    to_address: str = Field(validation_alias=AliasChoices("to_address", "to"))
+    amount_out: str = Field(validation_alias=AliasChoices("amount_out", "amountOut"))
+    gas_fee_wei: str = Field(validation_alias=AliasChoices("gas_fee_wei", "gasFeeWei"))
+    gas_price: str = Field(validation_alias=AliasChoices("gas_price", "gasPrice"))
+    gas_fee_eth: str = Field(validation_alias=AliasChoices("gas_fee_eth", "gasFeeEth"))
     hash: str
-    from_address: str
-    gas_burned: str
+    from_address: str = Field(validation_alias=AliasChoices("from_address", "from"))
+    gas_burned: str = Field(validation_alias=AliasChoices("gas_burned", "gasBurned"))
     block_number: str
-    token_in: str
-    gas_tipped: str
+    token_in: str = Field(validation_alias=AliasChoices("token_in", "tokenIn"))
+    gas_tipped: str = Field(validation_alias=AliasChoices("gas_tipped", "gasTipped"))
     log_index: int
-    token_in_address: str
+    token_in_address: str = Field(
+        validation_alias=AliasChoices("token_in_address", "tokenInAddress")
+    )
     transaction_index: int
-    token_out: str
+    token_out: str = Field(validation_alias=AliasChoices("token_out", "tokenOut"))
     dex_name: str
-    token_out_address: str
-    amount_in: str
-    gas_used: int
+    token_out_address: str = Field(
+        validation_alias=AliasChoices("token_out_address", "tokenOutAddress")
+    )
+    amount_in: str = Field(validation_alias=AliasChoices("amount_in", "amountIn"))
+    gas_used: int = Field(validation_alias=AliasChoices("gas_used", "gasUsed"))
+
+    # O banco guarda o número do bloco como inteiro; a API mantém o texto
+    @field_validator("block_number", mode="before")
+    @classmethod
+    def block_number_as_str(cls, value):
+        return str(value)
 
 
 class Swaps(BaseModel):
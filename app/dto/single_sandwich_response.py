@@ -1,5 +1,5 @@
 from typing import List, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class Swap(BaseModel):
@@ -22,6 +22,12 @@ class SandwichItem(BaseModel):
     ta2: str
     swaps: List[Swap]
 
+    # O banco guarda o número do bloco como inteiro; a API mantém o texto
+    @field_validator("block_number", mode="before")
+    @classmethod
+    def block_number_as_str(cls, value):
+        return str(value)
+
 
 class SingleSandwichResponse(BaseModel):
     block_number: int
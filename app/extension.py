@@ -10,6 +10,10 @@ from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncGenerator
 from app.database import init_db, AsyncSessionLocal
+from app.application.web3_client.head_follower import head_follower
+from app.application.sandwich_pipeline import sandwich_pipeline
+from app.dbo.db_writer import db_writer
+from app.config import AppConfig
 
 import logging
 
@@ -45,6 +49,11 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    db_writer.start()
+    if AppConfig.HEAD_FOLLOWER_ENABLED:
+        if AppConfig.SANDWICH_PIPELINE_ENABLED:
+            sandwich_pipeline.start()
+        head_follower.start()
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -54,5 +63,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 @app.on_event("shutdown")
 async def shutdown():
-    pass
+    await head_follower.stop()
+    await sandwich_pipeline.stop()
+    # grava as escritas pendentes antes de encerrar
+    await db_writer.stop()
     # await app.state.db.close()
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException
+
+from app.application.backfill import backfill_jobs, start_backfill
+from app.dto.backfill import BackfillJobResponse, BackfillRequest
+
+router = APIRouter(
+    prefix="/backfill",
+    tags=["Backfill"],
+    dependencies=[],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.post(
+    "/",
+    summary="Start a historical backfill over a block range.",
+    response_model=BackfillJobResponse,
+)
+async def create_backfill(request: BackfillRequest):
+    if request.to_block < request.from_block:
+        raise HTTPException(
+            status_code=400,
+            detail="to_block must be greater than or equal to from_block",
+        )
+
+    job = start_backfill(
+        from_block=request.from_block,
+        to_block=request.to_block,
+        concurrency=request.concurrency,
+    )
+
+    return job.progress()
+
+
+@router.get(
+    "/",
+    summary="List the backfill jobs of this process.",
+    response_model=list[BackfillJobResponse],
+)
+async def list_backfills():
+    return [job.progress() for job in backfill_jobs.values()]
+
+
+@router.get(
+    "/{job_id}",
+    summary="Progress, throughput and ETA of a backfill job.",
+    response_model=BackfillJobResponse,
+)
+async def get_backfill(job_id: str):
+    job = backfill_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backfill job {job_id} not found")
+
+    return job.progress()
+
+
+@router.delete(
+    "/{job_id}",
+    summary="Cancel a backfill job, keeping its checkpoints.",
+    response_model=BackfillJobResponse,
+)
+async def cancel_backfill(job_id: str):
+    job = backfill_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backfill job {job_id} not found")
+
+    job.cancel()
+
+    return job.progress()
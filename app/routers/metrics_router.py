@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from app.utils.metrics import collect_metrics
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get(
+    "/",
+    summary="Internal cache, RPC and pipeline metrics.",
+)
+async def get_metrics():
+    return collect_metrics()
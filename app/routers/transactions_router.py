@@ -44,14 +44,9 @@ async def get_transaction_by_hash(
     summary="Fetch the latests transactions.",
     response_model=list[TransactionResponse],
 )
-async def fetch_latest_transactions(
-    session: AsyncSession = Depends(get_db),
-    limit: int = 10,
-):
+async def fetch_latest_transactions(limit: int = 10):
     try:
-        transactions = await fetch_latests_transactions_application(
-            limit=limit, session=session
-        )
+        transactions = await fetch_latests_transactions_application(limit=limit)
 
         return transactions
     except BlockNotFound:
@@ -0,0 +1,124 @@
+from web3 import AsyncWeb3
+import time
+
+from app.config import AppConfig
+from app.database import AsyncSessionLocal
+from app.dbo.db_functions import get_block_header_by_number
+from app.dbo.db_writer import write_block_header
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import register_metrics
+from app.utils.single_flight import SingleFlight
+
+# Cabeçalhos de blocos finalizados nunca mudam: podem ficar em cache sem
+# expiração, em memória e (opcionalmente) na tabela block_headers.
+block_header_cache = LRUCache(AppConfig.BLOCK_HEADER_CACHE_SIZE)
+block_header_flight = SingleFlight("block_header")
+
+# "latest" e "finalized" mudam a cada bloco/época: cache curto por TTL
+head_cache: dict[str, tuple[float, dict]] = {}
+head_flight = SingleFlight("block_head")
+
+block_cache_stats = {"head_hits": 0, "head_fetches": 0, "db_hits": 0}
+
+
+def format_block_header(block, status: str) -> dict:
+    """
+    Converte o bloco retornado pelo web3 no formato servido pela API. Aceita
+    blocos com ou sem as transações completas.
+    """
+    transactions = block["transactions"]
+    return {
+        "hash": block["hash"].hex(),
+        "number": block["number"],
+        "nonce": block["nonce"].hex(),
+        "miner": block["miner"],
+        "parent_hash": block["parentHash"].hex(),
+        "timestamp": block["timestamp"],
+        "status": status,
+        "size": block.get("size", 0),
+        "gas_used": block["gasUsed"],
+        "base_fee_per_gas": block.get("baseFeePerGas"),
+        "gas_limit": block["gasLimit"],
+        "difficulty": block.get("difficulty", 0),
+        "total_difficulty": block.get("totalDifficulty", 0),
+        "withdrawals": [dict(w) for w in block.get("withdrawals", [])],
+        "extra_data": block.get("extraData", "").hex(),
+        "transactions_hashes": [
+            tx.hex() if isinstance(tx, bytes) else tx["hash"].hex()
+            for tx in transactions
+        ],
+        "transaction_count": len(transactions),
+    }
+
+
+async def get_head_block(async_web3: AsyncWeb3, tag: str) -> dict:
+    """
+    Retorna o bloco "latest" ou "finalized", reaproveitando a última resposta
+    por BLOCK_HEAD_CACHE_TTL segundos.
+    """
+    cached = head_cache.get(tag)
+    if (
+        cached is not None
+        and time.monotonic() - cached[0] < AppConfig.BLOCK_HEAD_CACHE_TTL
+    ):
+        block_cache_stats["head_hits"] += 1
+        return cached[1]
+
+    async def fetch():
+        block_cache_stats["head_fetches"] += 1
+        block = await async_web3.eth.get_block(tag)
+        head_cache[tag] = (time.monotonic(), block)
+        return block
+
+    return await head_flight.do(tag, fetch)
+
+
+def remember_head_block(tag: str, block: dict) -> None:
+    """
+    Reaproveita um bloco "latest"/"finalized" buscado por outro caminho
+    (ex.: o head follower) como resposta em cache de get_head_block.
+    """
+    head_cache[tag] = (time.monotonic(), block)
+
+
+async def is_block_finalized(async_web3: AsyncWeb3, block_number: int) -> bool:
+    finalized = await get_head_block(async_web3, "finalized")
+    return block_number <= finalized["number"]
+
+
+async def get_finalized_block_header(block_number: int) -> dict | None:
+    """
+    Busca o cabeçalho de um bloco finalizado no LRU e, se habilitado, na
+    tabela block_headers. Retorna None se o bloco ainda não foi visto.
+    """
+    block_data = block_header_cache.get(block_number)
+    if block_data is not None or not AppConfig.BLOCK_HEADER_PERSIST:
+        return block_data
+
+    async def load():
+        async with AsyncSessionLocal() as session:
+            block_data = await get_block_header_by_number(
+                session=session, block_number=block_number
+            )
+        # Cabeçalho salvo antes da finalização: pode ter sido reorganizado
+        if block_data is None or block_data["status"] != "finalized":
+            return None
+        block_cache_stats["db_hits"] += 1
+        block_header_cache.set(block_number, block_data)
+        return block_data
+
+    return await block_header_flight.do(block_number, load)
+
+
+async def cache_finalized_block_header(block_data: dict) -> None:
+    block_header_cache.set(block_data["number"], block_data)
+
+    if AppConfig.BLOCK_HEADER_PERSIST:
+        await write_block_header(block_data)
+
+
+def block_cache_metrics() -> dict:
+    return {"memory": block_header_cache.stats(), **block_cache_stats}
+
+
+register_metrics("block_cache", block_cache_metrics)
@@ -4,3 +4,21 @@ from enum import Enum
 class UserRole(str, Enum):
     admin = "admin"
     consultant = "consultant"
+
+
+class SwapIngestionMode(str, Enum):
+    receipts = "receipts"
+    logs = "logs"
+
+
+class RpcPriority(str, Enum):
+    interactive = "interactive"
+    bulk = "bulk"
+
+
+class BackfillStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    cancelled = "cancelled"
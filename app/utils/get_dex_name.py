@@ -2,10 +2,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 import os
 
-from app.dbo.db_functions import get_dex_name_by_pool_address, insert_dex_name
+from app.dbo.db_functions import get_dex_name_by_pool_address
+from app.dbo.db_writer import write_dex_name
+from app.utils.single_flight import SingleFlight
+
+dex_name_flight = SingleFlight("dex_name")
 
 
 async def get_dex_name(pool_address, session: AsyncSession | None = None):
+    # Vários swaps do mesmo pool pedem o nome ao mesmo tempo: uma só consulta
+    return await dex_name_flight.do(
+        pool_address, lambda: fetch_dex_name(pool_address, session)
+    )
+
+
+async def fetch_dex_name(pool_address, session: AsyncSession | None = None):
     dex_name = await get_dex_name_by_pool_address(
         pool_address=pool_address,
         session=session,
@@ -38,9 +49,5 @@ async def get_dex_name(pool_address, session: AsyncSession | None = None):
     }
     dex_name = dex_map.get(contract_name, contract_name or "Unknown")
 
-    await insert_dex_name(
-        session=session,
-        pool_address=pool_address,
-        dex_name=dex_name,
-    )
+    await write_dex_name(pool_address=pool_address, dex_name=dex_name)
     return dex_name if dex_name else None
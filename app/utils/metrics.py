@@ -0,0 +1,15 @@
+from typing import Callable, Dict
+
+_metrics_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Registra uma função que devolve as métricas atuais de um componente,
+    exibidas em GET /metrics.
+    """
+    _metrics_providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, dict]:
+    return {name: provider() for name, provider in _metrics_providers.items()}
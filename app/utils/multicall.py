@@ -0,0 +1,100 @@
+from eth_abi import decode
+from eth_utils import function_signature_to_4byte_selector
+from web3 import AsyncWeb3
+import asyncio
+
+from app.config import AppConfig
+from app.utils.loggers import error_logger
+
+# Multicall3 tem o mesmo endereço em todas as redes EVM
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+
+TOKEN0_CALL = function_signature_to_4byte_selector("token0()")
+TOKEN1_CALL = function_signature_to_4byte_selector("token1()")
+SYMBOL_CALL = function_signature_to_4byte_selector("symbol()")
+DECIMALS_CALL = function_signature_to_4byte_selector("decimals()")
+
+
+async def aggregate3(
+    async_web3: AsyncWeb3,
+    calls: list[tuple[str, bytes]],
+    chunk_size: int | None = None,
+) -> list[tuple[bool, bytes]]:
+    """
+    Executa as chamadas (target, callData) via Multicall3 aggregate3, em
+    pedaços de até `chunk_size` chamadas. Falhas individuais não derrubam o
+    lote: cada resultado é (success, returnData). Se um pedaço inteiro falhar,
+    todas as suas chamadas retornam (False, b"").
+    """
+    chunk_size = chunk_size or AppConfig.MULTICALL_CHUNK_SIZE
+    multicall = async_web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+    async def _call_chunk(chunk):
+        try:
+            return await multicall.functions.aggregate3(
+                [(target, True, call_data) for target, call_data in chunk]
+            ).call()
+        except Exception as e:
+            error_logger.error(f"Erro no aggregate3 ({len(chunk)} chamadas): {e}")
+            return [(False, b"")] * len(chunk)
+
+    chunks = [calls[i : i + chunk_size] for i in range(0, len(calls), chunk_size)]
+    results = await asyncio.gather(*(_call_chunk(chunk) for chunk in chunks))
+
+    return [tuple(result) for chunk_results in results for result in chunk_results]
+
+
+def decode_address(return_data: bytes) -> str | None:
+    if len(return_data) < 32:
+        return None
+    return AsyncWeb3.to_checksum_address(decode(["address"], return_data)[0])
+
+
+def decode_uint(return_data: bytes) -> int | None:
+    if len(return_data) < 32:
+        return None
+    return decode(["uint256"], return_data)[0]
+
+
+def decode_symbol(return_data: bytes) -> str | None:
+    """
+    Decodifica o retorno de symbol(), aceitando tanto `string` quanto o
+    formato não padrão `bytes32` (ex.: MKR, SAI).
+    """
+    if len(return_data) < 32:
+        return None
+    if len(return_data) == 32:
+        return return_data.rstrip(b"\x00").decode("utf-8", errors="ignore") or None
+    try:
+        return decode(["string"], return_data)[0]
+    except Exception:
+        return return_data[:32].rstrip(b"\x00").decode("utf-8", errors="ignore") or None
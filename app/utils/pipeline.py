@@ -0,0 +1,132 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, List
+import asyncio
+import time
+
+from app.utils.loggers import error_logger
+
+
+class Stage:
+    """
+    Etapa de um pipeline: `workers` tarefas consomem a fila de entrada
+    (limitada a `queue_size` itens) e aplicam `handler` em cada item, que o
+    altera no lugar. Quando a fila da etapa seguinte enche, os workers
+    esperam, propagando a contrapressão até quem submete os itens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[None]],
+        workers: int = 1,
+        queue_size: int = 8,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0
+        self.latencies: deque = deque(maxlen=500)
+
+    def record(self, latency: float) -> None:
+        self.latencies.append(latency)
+
+    def stats(self) -> dict:
+        ordered = sorted(self.latencies)
+        return {
+            "workers": self.workers,
+            "busy_workers": self.busy,
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "processed": self.processed,
+            "failed": self.failed,
+            "latency_avg_ms": (
+                round(1000 * sum(ordered) / len(ordered), 2) if ordered else None
+            ),
+            "latency_p95_ms": (
+                round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 2)
+                if ordered
+                else None
+            ),
+        }
+
+
+class Pipeline:
+    """
+    Encadeia etapas por filas limitadas. Cada item passa por todas as etapas
+    em ordem; ao sair da última (ou falhar em qualquer uma) `on_done(item,
+    error)` é chamado.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        on_done: Callable[[Any, Exception | None], Awaitable[None]] | None = None,
+    ):
+        self.stages = stages
+        self.on_done = on_done
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        for index, stage in enumerate(self.stages):
+            next_stage = (
+                self.stages[index + 1] if index + 1 < len(self.stages) else None
+            )
+            self._tasks += [
+                asyncio.create_task(self._worker(stage, next_stage))
+                for _ in range(stage.workers)
+            ]
+
+    async def submit(self, item: Any) -> None:
+        await self.stages[0].queue.put(item)
+
+    async def join(self) -> None:
+        # Um item só sai da fila de uma etapa depois de entrar na seguinte
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, stage: Stage, next_stage: Stage | None) -> None:
+        while True:
+            item = await stage.queue.get()
+            try:
+                stage.busy += 1
+                start = time.perf_counter()
+                try:
+                    await stage.handler(item)
+                finally:
+                    stage.busy -= 1
+                    stage.record(time.perf_counter() - start)
+            except asyncio.CancelledError:
+                stage.queue.task_done()
+                raise
+            except Exception as e:
+                stage.failed += 1
+                await self._finish(item, e)
+            else:
+                stage.processed += 1
+                if next_stage is not None:
+                    await next_stage.queue.put(item)
+                else:
+                    await self._finish(item, None)
+            stage.queue.task_done()
+
+    async def _finish(self, item: Any, error: Exception | None) -> None:
+        if self.on_done is None:
+            return
+        try:
+            await self.on_done(item, error)
+        except Exception as e:
+            # um erro no callback não pode derrubar o worker da etapa
+            error_logger.error(f"Pipeline on_done falhou: {e}")
+
+    def stats(self) -> dict:
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,262 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from web3 import AsyncWeb3
+import asyncio
+
+from app.config import AppConfig
+from app.dbo.db_functions import (
+    fetch_pool_metadata_by_pool_addresses,
+    get_pool_metadata_by_pool_address,
+)
+from app.dbo.db_writer import write_pool_metadata
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import register_metrics
+from app.utils.single_flight import SingleFlight
+from app.utils.multicall import (
+    DECIMALS_CALL,
+    SYMBOL_CALL,
+    TOKEN0_CALL,
+    TOKEN1_CALL,
+    aggregate3,
+    decode_address,
+    decode_symbol,
+    decode_uint,
+)
+
+POOL_ABI = [
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "token0",
+        "outputs": [{"name": "", "type": "address"}],
+        "type": "function",
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "token1",
+        "outputs": [{"name": "", "type": "address"}],
+        "type": "function",
+    },
+]
+
+TOKEN_ABI = [
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "symbol",
+        "outputs": [{"name": "", "type": "string"}],
+        "type": "function",
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "type": "function",
+    },
+]
+
+# Metadados de pool nunca mudam: cache em memória na frente da tabela
+# pool_metadata, consultados antes de qualquer eth_call.
+pool_metadata_cache = LRUCache(AppConfig.POOL_METADATA_CACHE_SIZE)
+token_metadata_cache = LRUCache(AppConfig.POOL_METADATA_CACHE_SIZE * 2)
+pool_metadata_flight = SingleFlight("pool_metadata")
+pool_metadata_stats = {"db_hits": 0, "rpc_fetches": 0, "multicall_fetches": 0}
+
+
+def cache_pool_metadata(metadata: dict) -> None:
+    pool_metadata_cache.set(metadata["pool_address"], metadata)
+    for token, symbol, decimals in (
+        (metadata["token0"], metadata["symbol0"], metadata["decimals0"]),
+        (metadata["token1"], metadata["symbol1"], metadata["decimals1"]),
+    ):
+        token_metadata_cache.set(token, {"symbol": symbol, "decimals": decimals})
+
+
+async def fetch_token_metadata(
+    async_web3: AsyncWeb3, token_address: str
+) -> tuple[str, int | None]:
+    """
+    Busca symbol() e decimals() do token. Se symbol() falhar, usa o próprio
+    endereço como símbolo (mesmo comportamento do decodificador).
+    """
+    token = async_web3.eth.contract(address=token_address, abi=TOKEN_ABI)
+    symbol, decimals = await asyncio.gather(
+        token.functions.symbol().call(),
+        token.functions.decimals().call(),
+        return_exceptions=True,
+    )
+    if isinstance(symbol, Exception):
+        symbol = token_address
+    if isinstance(decimals, Exception):
+        decimals = None
+    return symbol, decimals
+
+
+async def fetch_pool_metadata(async_web3: AsyncWeb3, pool_address: str) -> dict:
+    pool = async_web3.eth.contract(address=pool_address, abi=POOL_ABI)
+    token0, token1 = await asyncio.gather(
+        pool.functions.token0().call(),
+        pool.functions.token1().call(),
+    )
+    (symbol0, decimals0), (symbol1, decimals1) = await asyncio.gather(
+        fetch_token_metadata(async_web3, token0),
+        fetch_token_metadata(async_web3, token1),
+    )
+    return {
+        "pool_address": pool_address,
+        "token0": token0,
+        "token1": token1,
+        "symbol0": symbol0,
+        "symbol1": symbol1,
+        "decimals0": decimals0,
+        "decimals1": decimals1,
+    }
+
+
+async def get_pool_metadata(
+    async_web3: AsyncWeb3, pool_address: str, session: AsyncSession | None = None
+) -> dict:
+    """
+    Retorna token0/token1, símbolos e decimais do pool, consultando em ordem
+    o LRU em memória, a tabela pool_metadata e, por último, a blockchain.
+    Buscas concorrentes pelo mesmo pool compartilham a mesma chamada.
+    """
+    metadata = pool_metadata_cache.get(pool_address)
+    if metadata is not None:
+        return metadata
+
+    return await pool_metadata_flight.do(
+        pool_address,
+        lambda: load_pool_metadata(async_web3, pool_address, session),
+    )
+
+
+async def load_pool_metadata(
+    async_web3: AsyncWeb3, pool_address: str, session: AsyncSession | None = None
+) -> dict:
+    if session is not None:
+        metadata = await get_pool_metadata_by_pool_address(
+            session=session, pool_address=pool_address
+        )
+        if metadata is not None:
+            pool_metadata_stats["db_hits"] += 1
+            cache_pool_metadata(metadata)
+            return metadata
+
+    pool_metadata_stats["rpc_fetches"] += 1
+    metadata = await fetch_pool_metadata(async_web3, pool_address)
+    cache_pool_metadata(metadata)
+
+    if session is not None:
+        await write_pool_metadata([metadata])
+
+    return metadata
+
+
+async def resolve_pools_metadata(
+    async_web3: AsyncWeb3,
+    pool_addresses: list[str],
+    session: AsyncSession | None = None,
+) -> None:
+    """
+    Resolve de uma vez os metadados de todos os pools ainda desconhecidos:
+    primeiro na tabela pool_metadata e depois via Multicall3, com uma rodada
+    para token0/token1 e outra para symbol/decimals dos tokens novos. Pools
+    que não responderem ficam para o fallback de get_pool_metadata.
+    """
+    unresolved = [
+        pool
+        for pool in dict.fromkeys(pool_addresses)
+        if pool not in pool_metadata_cache
+    ]
+    if not unresolved:
+        return
+
+    if session is not None:
+        for metadata in await fetch_pool_metadata_by_pool_addresses(
+            session=session, pool_addresses=unresolved
+        ):
+            pool_metadata_stats["db_hits"] += 1
+            cache_pool_metadata(metadata)
+        unresolved = [pool for pool in unresolved if pool not in pool_metadata_cache]
+        if not unresolved:
+            return
+
+    token_results = await aggregate3(
+        async_web3,
+        [(pool, call) for pool in unresolved for call in (TOKEN0_CALL, TOKEN1_CALL)],
+    )
+
+    pools_tokens = {}
+    for idx, pool in enumerate(unresolved):
+        (ok0, data0), (ok1, data1) = token_results[2 * idx : 2 * idx + 2]
+        token0 = decode_address(data0) if ok0 else None
+        token1 = decode_address(data1) if ok1 else None
+        if token0 and token1:
+            pools_tokens[pool] = (token0, token1)
+
+    new_tokens = [
+        token
+        for token in dict.fromkeys(t for pair in pools_tokens.values() for t in pair)
+        if token not in token_metadata_cache
+    ]
+    token_info_results = await aggregate3(
+        async_web3,
+        [
+            (token, call)
+            for token in new_tokens
+            for call in (SYMBOL_CALL, DECIMALS_CALL)
+        ],
+    )
+
+    tokens_metadata = {}
+    for idx, token in enumerate(new_tokens):
+        (ok_symbol, symbol_data), (ok_decimals, decimals_data) = token_info_results[
+            2 * idx : 2 * idx + 2
+        ]
+        symbol = decode_symbol(symbol_data) if ok_symbol else None
+        tokens_metadata[token] = {
+            # mesmo fallback do decodificador: sem symbol(), usa o endereço
+            "symbol": symbol or token,
+            "decimals": decode_uint(decimals_data) if ok_decimals else None,
+        }
+
+    resolved = []
+    for pool, (token0, token1) in pools_tokens.items():
+        info0 = tokens_metadata.get(token0) or token_metadata_cache.get(token0)
+        info1 = tokens_metadata.get(token1) or token_metadata_cache.get(token1)
+        if info0 is None or info1 is None:
+            continue
+        metadata = {
+            "pool_address": pool,
+            "token0": token0,
+            "token1": token1,
+            "symbol0": info0["symbol"],
+            "symbol1": info1["symbol"],
+            "decimals0": info0["decimals"],
+            "decimals1": info1["decimals"],
+        }
+        cache_pool_metadata(metadata)
+        resolved.append(metadata)
+
+    pool_metadata_stats["multicall_fetches"] += len(resolved)
+
+    if session is not None and resolved:
+        await write_pool_metadata(resolved)
+
+
+def get_cached_token_decimals(token_address: str) -> int | None:
+    token = token_metadata_cache.get(token_address)
+    return token["decimals"] if token else None
+
+
+def pool_metadata_metrics() -> dict:
+    return {
+        "memory": pool_metadata_cache.stats(),
+        "tokens": token_metadata_cache.stats(),
+        **pool_metadata_stats,
+    }
+
+
+register_metrics("pool_metadata", pool_metadata_metrics)
@@ -0,0 +1,72 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+import asyncio
+
+from app.utils.metrics import register_metrics
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    """
+    Deduplica chamadas concorrentes idênticas: enquanto uma chamada com a
+    mesma chave estiver em andamento, as demais aguardam o mesmo resultado
+    (ou a mesma exceção) em vez de repetir o trabalho.
+
+    A chamada roda no contexto de quem chegou primeiro. Se esse chamador for
+    cancelado, quem estava aguardando tenta novamente e um deles assume.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        _flights.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while key in self._inflight:
+            self.shared += 1
+            try:
+                # shield: cancelar um seguidor não cancela a chamada compartilhada
+                return await asyncio.shield(self._inflight[key])
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            if future.done() and not future.cancelled():
+                # evita o aviso "exception was never retrieved" sem seguidores
+                future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
+
+
+_flights: List[SingleFlight] = []
+
+
+def single_flight_metrics() -> dict:
+    return {flight.name: flight.stats() for flight in _flights}
+
+
+register_metrics("single_flight", single_flight_metrics)
@@ -1,9 +1,18 @@
 from app.application.web3_client.main import async_web3
+from app.utils.pool_metadata import get_cached_token_decimals
+from app.utils.single_flight import SingleFlight
 import httpx
 import os
 
+binance_price_flight = SingleFlight("binance_price")
+token_decimals_flight = SingleFlight("token_decimals")
+
 
 async def get_binance_price(symbol: str):
+    return await binance_price_flight.do(symbol, lambda: fetch_binance_price(symbol))
+
+
+async def fetch_binance_price(symbol: str):
     if symbol == "USDT":
         return 1.0
     if symbol == "WETH":
@@ -22,6 +31,16 @@ async def get_binance_price(symbol: str):
 
 
 async def get_token_decimals(token_address):
+    decimals = get_cached_token_decimals(token_address)
+    if decimals is not None:
+        return decimals
+
+    return await token_decimals_flight.do(
+        token_address, lambda: fetch_token_decimals(token_address)
+    )
+
+
+async def fetch_token_decimals(token_address):
     contract = async_web3.eth.contract(
         address=token_address,
         abi=[
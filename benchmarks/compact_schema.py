@@ -0,0 +1,204 @@
+"""
+Esquema textual (legado) x esquema compacto: tamanho da tabela e dos
+índices e latência de consultas por intervalo de blocos.
+
+Gera um banco no esquema antigo, copia o arquivo e migra a cópia com
+migrate_compact_schema. Nos dois bancos é criado o mesmo índice em
+block_number para a consulta por intervalo.
+
+    ENV=dev python -m benchmarks.compact_schema --blocks 2000 --swaps-per-block 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from app.database import create_engine
+from app.dbo.schema_migration import migrate_compact_schema
+
+FIRST_BLOCK = 17_000_000
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE blocks_analyzed (block_number VARCHAR NOT NULL, "
+    "PRIMARY KEY (block_number))",
+    "CREATE INDEX ix_blocks_analyzed_block_number ON blocks_analyzed (block_number)",
+    "CREATE TABLE transactions_swap (hash VARCHAR NOT NULL, "
+    "block_number VARCHAR NOT NULL, log_index INTEGER NOT NULL, "
+    'transaction_index INTEGER, "from" VARCHAR, "to" VARCHAR, dex_name VARCHAR, '
+    '"tokenIn" VARCHAR, "tokenInAddress" VARCHAR, "tokenOut" VARCHAR, '
+    '"tokenOutAddress" VARCHAR, "amountIn" VARCHAR, "amountOut" VARCHAR, '
+    '"gasPrice" VARCHAR, gas_used INTEGER, gas_fee_wei VARCHAR, '
+    "gas_fee_eth VARCHAR, gas_burned VARCHAR, gas_tipped VARCHAR, "
+    "PRIMARY KEY (hash, block_number, log_index))",
+]
+
+RANGE_INDEX = (
+    "CREATE INDEX bench_transactions_swap_block ON transactions_swap (block_number)"
+)
+
+
+def address() -> str:
+    return f"0x{random.getrandbits(160):040x}"
+
+
+def legacy_rows(block_number: int, count: int):
+    for i in range(count):
+        gas_used = random.randint(90_000, 300_000)
+        gas_price = random.randint(10**9, 10**11)
+        yield (
+            f"{random.getrandbits(256):064x}",
+            str(block_number),
+            i,
+            i,
+            address(),
+            address(),
+            "Uniswap V2",
+            "WETH",
+            address(),
+            "USDC",
+            address(),
+            str(random.getrandbits(random.choice((64, 80, 96)))),
+            str(random.getrandbits(random.choice((32, 64, 80)))),
+            str(gas_price),
+            gas_used,
+            str(gas_used * gas_price),
+            str(gas_used * gas_price / 1e18),
+            str(gas_used * 10**9 / 1e18),
+            str(gas_used * (gas_price - 10**9) / 1e18),
+        )
+
+
+def build_legacy_db(path: str, blocks: int, swaps_per_block: int) -> None:
+    db = sqlite3.connect(path)
+    for statement in LEGACY_SCHEMA:
+        db.execute(statement)
+    for block_number in range(FIRST_BLOCK, FIRST_BLOCK + blocks):
+        db.executemany(
+            f"INSERT INTO transactions_swap VALUES ({', '.join('?' * 19)})",
+            legacy_rows(block_number, swaps_per_block),
+        )
+        db.execute("INSERT INTO blocks_analyzed VALUES (?)", (str(block_number),))
+    db.commit()
+    db.close()
+
+
+def object_sizes(path: str) -> dict:
+    db = sqlite3.connect(path)
+    db.execute("VACUUM")
+    sizes = dict(
+        db.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat "
+            "WHERE name IN ('transactions_swap', "
+            "'sqlite_autoindex_transactions_swap_1', 'bench_transactions_swap_block') "
+            "GROUP BY name"
+        ).fetchall()
+    )
+    db.close()
+    return {
+        "table": sizes["transactions_swap"],
+        "primary_key": sizes["sqlite_autoindex_transactions_swap_1"],
+        "block_index": sizes["bench_transactions_swap_block"],
+    }
+
+
+async def range_latencies(
+    path: str, legacy: bool, blocks: int, span: int, queries: int
+) -> list[float]:
+    engine = create_engine(f"sqlite+aiosqlite:///{path}")
+    latencies = []
+    async with engine.connect() as conn:
+        for _ in range(queries):
+            start = random.randint(FIRST_BLOCK, FIRST_BLOCK + blocks - span)
+            bounds = (start, start + span - 1)
+            if legacy:
+                # mesmo número de dígitos: a comparação textual ainda acerta
+                bounds = tuple(str(b) for b in bounds)
+            began = time.perf_counter()
+            rows = (
+                await conn.exec_driver_sql(
+                    "SELECT * FROM transactions_swap "
+                    "WHERE block_number BETWEEN ? AND ? "
+                    "ORDER BY block_number, transaction_index, log_index",
+                    bounds,
+                )
+            ).all()
+            latencies.append(time.perf_counter() - began)
+            assert rows
+    await engine.dispose()
+    return latencies
+
+
+async def migrate(path: str) -> float:
+    engine = create_engine(f"sqlite+aiosqlite:///{path}")
+    began = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate_compact_schema)
+    elapsed = time.perf_counter() - began
+    await engine.dispose()
+    return elapsed
+
+
+def add_range_index(path: str) -> None:
+    db = sqlite3.connect(path)
+    db.execute(RANGE_INDEX)
+    db.commit()
+    db.close()
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--swaps-per-block", type=int, default=100)
+    parser.add_argument("--span", type=int, default=50, help="Blocos por consulta")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    legacy_path = os.path.join(directory, "legacy.db")
+    compact_path = os.path.join(directory, "compact.db")
+
+    build_legacy_db(legacy_path, args.blocks, args.swaps_per_block)
+    shutil.copy(legacy_path, compact_path)
+    migration_seconds = await migrate(compact_path)
+    for path in (legacy_path, compact_path):
+        add_range_index(path)
+
+    rows = args.blocks * args.swaps_per_block
+    print(f"{rows} swaps, migração em {migration_seconds:.1f}s")
+    print(
+        f"{'esquema':<8} {'tabela':>10} {'pk':>10} {'idx bloco':>10} "
+        f"{'B/linha':>8} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for name, path, legacy in (
+        ("legado", legacy_path, True),
+        ("compacto", compact_path, False),
+    ):
+        sizes = object_sizes(path)
+        latencies = await range_latencies(
+            path, legacy, args.blocks, args.span, args.queries
+        )
+        print(
+            f"{name:<8} {sizes['table'] / 2**20:>8.1f}MB "
+            f"{sizes['primary_key'] / 2**20:>8.1f}MB "
+            f"{sizes['block_index'] / 2**20:>8.1f}MB "
+            f"{sizes['table'] / rows:>8.0f} "
+            f"{statistics.median(latencies) * 1000:>8.2f} "
+            f"{percentile(latencies, 0.99) * 1000:>8.2f}"
+        )
+
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+Leitura de um intervalo de blocos: uma consulta ORM por bloco
+(fetch_transactions_swap_by_block_number) x leitura em lotes com cursor no
+servidor (stream_block_swaps_by_range).
+
+Gera um banco SQLite temporário com --blocks * --swaps-per-block swaps e lê
+o intervalo inteiro pelos dois caminhos.
+
+    ENV=dev python -m benchmarks.range_reads --blocks 10000 --swaps-per-block 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_engine
+from app.dbo.db_functions import (
+    fetch_transactions_swap_by_block_number,
+    stream_block_swaps_by_range,
+    transaction_swap_row,
+)
+from app.dbo.models import TransactionSwap
+
+FIRST_BLOCK = 17_000_000
+
+
+def address() -> str:
+    return f"0x{random.getrandbits(160):040x}"
+
+
+def make_swaps(block_number: int, count: int) -> list[dict]:
+    swaps = []
+    for i in range(count):
+        gas_used = random.randint(90_000, 300_000)
+        gas_price = random.randint(10**9, 10**11)
+        swaps.append(
+            transaction_swap_row(
+                {
+                    "hash": f"{random.getrandbits(256):064x}",
+                    "block_number": block_number,
+                    "log_index": i,
+                    "transaction_index": i,
+                    "from": address(),
+                    "to": address(),
+                    "dex_name": "Uniswap V2",
+                    "tokenIn": "WETH",
+                    "tokenInAddress": address(),
+                    "tokenOut": "USDC",
+                    "tokenOutAddress": address(),
+                    "amountIn": str(random.getrandbits(80)),
+                    "amountOut": str(random.getrandbits(64)),
+                    "gasPrice": str(gas_price),
+                    "gas_used": gas_used,
+                    "gas_fee_wei": str(gas_used * gas_price),
+                    "gas_fee_eth": str(gas_used * gas_price / 1e18),
+                    "gas_burned": str(gas_used * 10**9 / 1e18),
+                    "gas_tipped": str(gas_used * (gas_price - 10**9) / 1e18),
+                }
+            )
+        )
+    return swaps
+
+
+async def build_db(engine, blocks: int, swaps_per_block: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for block_number in range(FIRST_BLOCK, FIRST_BLOCK + blocks):
+            await conn.execute(
+                insert(TransactionSwap), make_swaps(block_number, swaps_per_block)
+            )
+
+
+async def read_per_block(session_factory, blocks: int) -> int:
+    count = 0
+    async with session_factory() as session:
+        for block_number in range(FIRST_BLOCK, FIRST_BLOCK + blocks):
+            swaps = await fetch_transactions_swap_by_block_number(
+                session=session, block_number=block_number
+            )
+            count += len(swaps)
+            # sem isso o identity map guarda todas as instâncias lidas
+            session.expunge_all()
+    return count
+
+
+async def read_range(session_factory, blocks: int, chunk_size: int) -> int:
+    count = 0
+    async with session_factory() as session:
+        async for _, swaps in stream_block_swaps_by_range(
+            session, FIRST_BLOCK, FIRST_BLOCK + blocks - 1, chunk_size
+        ):
+            count += len(swaps)
+    return count
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=10000)
+    parser.add_argument("--swaps-per-block", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'r.db')}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession)
+
+    began = time.perf_counter()
+    await build_db(engine, args.blocks, args.swaps_per_block)
+    rows = args.blocks * args.swaps_per_block
+    print(f"{rows} swaps em {args.blocks} blocos ({time.perf_counter() - began:.0f}s)")
+
+    print(f"{'leitura':<22} {'tempo s':>8} {'swaps/s':>10} {'consultas':>10}")
+    for name, read, queries in (
+        (
+            "uma consulta por bloco",
+            lambda: read_per_block(session_factory, args.blocks),
+            args.blocks,
+        ),
+        (
+            "intervalo em lotes",
+            lambda: read_range(session_factory, args.blocks, args.chunk_size),
+            1,
+        ),
+    ):
+        began = time.perf_counter()
+        count = await read()
+        elapsed = time.perf_counter() - began
+        assert count == rows
+        print(f"{name:<22} {elapsed:>8.2f} {count / elapsed:>10.0f} {queries:>10}")
+
+    await engine.dispose()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
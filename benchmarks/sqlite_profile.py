@@ -0,0 +1,135 @@
+"""
+Latência de leitura sob carga de escrita concorrente, por perfil de SQLite.
+
+Um escritor grava blocos de swaps continuamente (um INSERT em lote + commit
+por bloco) enquanto leitores consultam os swaps de blocos já gravados.
+
+    ENV=dev python -m benchmarks.sqlite_profile --seconds 10 --readers 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SQLITE_PROFILES, Base, create_engine
+from app.dbo.db_functions import (
+    fetch_transactions_swap_by_block_number,
+    insert_block_swaps,
+)
+
+
+def make_swaps(block_number: int, count: int) -> list[dict]:
+    return [
+        {
+            "hash": f"0x{block_number:032x}{i:032x}",
+            "block_number": block_number,
+            "log_index": i,
+            "transaction_index": i,
+            "from": f"0x{random.getrandbits(160):040x}",
+            "to": f"0x{random.getrandbits(160):040x}",
+            "tokenIn": "WETH",
+            "tokenOut": "USDC",
+            "amountIn": str(random.getrandbits(64)),
+            "amountOut": str(random.getrandbits(64)),
+            "gasPrice": str(random.getrandbits(40)),
+        }
+        for i in range(count)
+    ]
+
+
+async def run_profile(
+    profile: str, seconds: float, readers: int, swaps_per_block: int
+) -> dict:
+    directory = tempfile.mkdtemp()
+    engine = create_engine(
+        f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}", profile
+    )
+    session_factory = sessionmaker(
+        bind=engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # blocos iniciais para os leitores
+    async with session_factory() as session:
+        for block_number in range(100):
+            await insert_block_swaps(
+                session, block_number, make_swaps(block_number, swaps_per_block)
+            )
+
+    written = [100]
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+
+    async def writer():
+        async with session_factory() as session:
+            while time.monotonic() < deadline:
+                block_number = written[0]
+                await insert_block_swaps(
+                    session, block_number, make_swaps(block_number, swaps_per_block)
+                )
+                written[0] += 1
+
+    async def reader():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            block_number = random.randrange(written[0])
+            start = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    await fetch_transactions_swap_by_block_number(
+                        session, str(block_number)
+                    )
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    await engine.dispose()
+
+    latencies.sort()
+    quantile = lambda q: 1000 * latencies[int(q * (len(latencies) - 1))]
+    return {
+        "profile": profile,
+        "reads": len(latencies),
+        "read_errors": errors,
+        "read_p50_ms": quantile(0.50),
+        "read_p95_ms": quantile(0.95),
+        "read_p99_ms": quantile(0.99),
+        "read_mean_ms": 1000 * statistics.mean(latencies),
+        "blocks_written": written[0] - 100,
+    }
+
+
+async def main(args) -> None:
+    print(
+        f"{'profile':<12} {'reads':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'blocks written':>15}"
+    )
+    for profile in args.profiles:
+        r = await run_profile(profile, args.seconds, args.readers, args.swaps)
+        print(
+            f"{r['profile']:<12} {r['reads']:>7} {r['read_errors']:>6} "
+            f"{r['read_p50_ms']:>8.2f} {r['read_p95_ms']:>8.2f} "
+            f"{r['read_p99_ms']:>8.2f} {r['blocks_written']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--swaps", type=int, default=150, help="swaps por bloco")
+    parser.add_argument(
+        "--profiles", nargs="+", default=list(SQLITE_PROFILES), choices=SQLITE_PROFILES
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""
+Custo por swap do caminho de leitura dos detectores: instâncias ORM +
+TransactionSwapSchema.model_validate(...).model_dump(by_alias=True) (antes,
+uma vez na rota e outra no detector multi-layered) x dicts lidos direto do
+banco com fetch_swap_records_by_block_number.
+
+    ENV=dev python -m benchmarks.swap_read_path --swaps 5000
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_engine
+from app.dbo.db_functions import (
+    fetch_swap_records_by_block_number,
+    fetch_transactions_swap_by_block_number,
+)
+from app.dbo.models import TransactionSwap
+from app.dto.schemas import TransactionSwapSchema
+from benchmarks.range_reads import make_swaps
+
+BLOCK_NUMBER = 17_000_000
+
+
+def validate_and_dump(swaps) -> list[dict]:
+    return [
+        TransactionSwapSchema.model_validate(s).model_dump(by_alias=True) for s in swaps
+    ]
+
+
+async def orm_path(session) -> list[dict]:
+    swaps = await fetch_transactions_swap_by_block_number(session, BLOCK_NUMBER)
+    # rota (detecção single-dex) e, de novo, o detector multi-layered
+    return validate_and_dump(validate_and_dump(swaps))
+
+
+async def records_path(session) -> list[dict]:
+    return await fetch_swap_records_by_block_number(session, BLOCK_NUMBER)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--swaps", type=int, default=5000, help="Swaps no bloco")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'r.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(TransactionSwap), make_swaps(BLOCK_NUMBER, args.swaps)
+        )
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession)
+
+    results = {}
+    for name, read in (("ORM + Pydantic", orm_path), ("registros", records_path)):
+        timings = []
+        for _ in range(args.runs):
+            # sessão nova a cada execução, como em uma requisição
+            async with session_factory() as session:
+                began = time.perf_counter()
+                swaps = await read(session)
+                timings.append(time.perf_counter() - began)
+        assert len(swaps) == args.swaps
+        results[name] = swaps
+        per_swap = statistics.median(timings) / args.swaps * 1e6
+        print(f"{name:<16} {per_swap:>8.1f} µs/swap")
+
+    # os dois caminhos entregam os mesmos dicts aos detectores
+    assert results["ORM + Pydantic"] == results["registros"]
+
+    await engine.dispose()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
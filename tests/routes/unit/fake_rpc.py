@@ -0,0 +1,55 @@
+from contextlib import asynccontextmanager
+from typing import Callable
+import asyncio
+import inspect
+
+from aiohttp import web
+
+
+@asynccontextmanager
+async def fake_rpc_server(handle: Callable[[dict], dict], port: int = 0):
+    """
+    Servidor JSON-RPC local para testes. `handle` (síncrono ou assíncrono)
+    recebe cada requisição e devolve o dict de resposta; lotes são respondidos em ordem invertida para
+    garantir que o cliente casa as respostas pelo id.
+    """
+    received: list = []
+
+    async def answer(rpc_request):
+        response = handle(rpc_request)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    async def handler(request):
+        body = await request.json()
+        received.append(body)
+        if isinstance(body, list):
+            responses = await asyncio.gather(*(answer(r) for r in reversed(body)))
+            return web.json_response(list(responses))
+        return web.json_response(await answer(body))
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}", received
+    finally:
+        await runner.cleanup()
+
+
+def rpc_result(request: dict, result) -> dict:
+    return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+
+def rpc_error(request: dict, code: int, message: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request["id"],
+        "error": {"code": code, "message": message},
+    }
@@ -0,0 +1,25 @@
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+
+
+@asynccontextmanager
+async def memory_db(create_tables: bool = True):
+    """
+    Banco SQLite em memória para testes de persistência. Produz (engine,
+    session_factory), já com as tabelas dos modelos ou vazio (para montar um
+    esquema legado), e descarta o engine ao sair.
+    """
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    if create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine, sessionmaker(
+            bind=engine, class_=AsyncSession, expire_on_commit=False
+        )
+    finally:
+        await engine.dispose()
@@ -0,0 +1,145 @@
+import asyncio
+
+from app.application import backfill as backfill_module
+from app.application import block_ingestion
+from app.application.backfill import (
+    BackfillJob,
+    merge_ranges,
+    missing_ranges,
+    split_ranges,
+)
+from app.config import AppConfig
+from app.dbo.db_functions import (
+    fetch_analyzed_ranges,
+    insert_analyzed_ranges,
+    is_block_in_analyzed_ranges,
+)
+from app.utils.enums import BackfillStatus
+from tests.routes.unit.memory_db import memory_db
+
+
+def test_merge_and_missing_ranges():
+    assert merge_ranges([5, 3, 4, 9, 10, 12]) == [(3, 5), (9, 10), (12, 12)]
+    assert missing_ranges(1, 20, [(3, 5), (9, 10), (18, 30)]) == [
+        (1, 2),
+        (6, 8),
+        (11, 17),
+    ]
+    assert missing_ranges(1, 5, [(0, 10)]) == []
+    assert split_ranges([(1, 10), (20, 21)], 4) == [(1, 4), (5, 8), (9, 10), (20, 21)]
+
+
+def test_backfill_checkpoints_ranges_and_resumes(monkeypatch):
+    ingested = []
+    fail_once = {105}
+
+    async def fake_fetch(work):
+        await asyncio.sleep(0)
+        if work["block_number"] in fail_once:
+            fail_once.discard(work["block_number"])
+            raise RuntimeError("rpc error")
+
+    async def fake_decode(work):
+        work["swaps"] = [{"hash": f"0x{work['block_number']}"}] * 2
+
+    async def fake_persist(work):
+        assert work["mark_analyzed"] is False
+        ingested.append(work["block_number"])
+
+    async def noop(work):
+        pass
+
+    monkeypatch.setattr(block_ingestion, "fetch_block_stage", fake_fetch)
+    monkeypatch.setattr(block_ingestion, "resolve_metadata_stage", noop)
+    monkeypatch.setattr(block_ingestion, "decode_stage", fake_decode)
+    monkeypatch.setattr(block_ingestion, "persist_stage", fake_persist)
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            monkeypatch.setattr(backfill_module, "AsyncSessionLocal", session_factory)
+
+            first = BackfillJob(100, 109, concurrency=3, checkpoint_blocks=4)
+            await first.start()
+
+            async with session_factory() as session:
+                ranges = await fetch_analyzed_ranges(session, 0, 1000)
+
+            second = BackfillJob(100, 109, concurrency=3)
+            await second.start()
+
+            async with session_factory() as session:
+                final_ranges = await fetch_analyzed_ranges(session, 0, 1000)
+        return first, second, ranges, final_ranges
+
+    first, second, ranges, final_ranges = asyncio.run(run())
+
+    assert first.status == BackfillStatus.completed
+    assert first.failed_blocks == [105]
+    assert first.swaps == 18
+    assert ranges == [(100, 104), (106, 109)]
+
+    # a segunda execução só refaz o bloco que falhou
+    assert second.skipped_blocks == 9
+    assert second.blocks_done == 1
+    assert final_ranges == [(100, 109)]
+    assert second.progress()["progress_percent"] == 100.0
+    assert sorted(ingested) == list(range(100, 110))
+
+
+def test_logs_mode_backfill_ingests_and_checkpoints_ranges(monkeypatch):
+    ingested = []
+
+    async def fake_ingest_range(from_block, to_block, detect=False):
+        await asyncio.sleep(0)
+        if from_block == 104:
+            raise RuntimeError("rpc error")
+        ingested.append((from_block, to_block))
+        return [{"hash": f"0x{from_block}"}]
+
+    monkeypatch.setattr(AppConfig, "SWAP_INGESTION_MODE", "logs")
+    monkeypatch.setattr(AppConfig, "LOGS_BLOCK_RANGE", 4)
+    monkeypatch.setattr(block_ingestion, "ingest_range", fake_ingest_range)
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            monkeypatch.setattr(backfill_module, "AsyncSessionLocal", session_factory)
+            async with session_factory() as session:
+                await insert_analyzed_ranges(session, [(110, 111)])
+
+            job = BackfillJob(100, 113, concurrency=2)
+            await job.start()
+
+            async with session_factory() as session:
+                ranges = await fetch_analyzed_ranges(session, 0, 1000)
+        return job, ranges
+
+    job, ranges = asyncio.run(run())
+
+    assert job.status == BackfillStatus.completed
+    assert sorted(ingested) == [(100, 103), (108, 109), (112, 113)]
+    assert job.failed_blocks == [104, 105, 106, 107]
+    assert job.blocks_done == 8
+    assert job.swaps == 3
+    assert ranges == [(100, 103), (108, 113)]
+
+
+def test_analyzed_range_lookups():
+    async def run():
+        async with memory_db() as (_, session_factory):
+            async with session_factory() as session:
+                await insert_analyzed_ranges(session, [(1, 5), (10, 20), (30, 40)])
+
+            async with session_factory() as session:
+                overlapping = await fetch_analyzed_ranges(session, 12, 35)
+                before_all = await fetch_analyzed_ranges(session, 0, 3)
+                contained = [
+                    await is_block_in_analyzed_ranges(session, n)
+                    for n in (0, 1, 5, 7, 15, 20, 25, 40, 41)
+                ]
+        return overlapping, before_all, contained
+
+    overlapping, before_all, contained = asyncio.run(run())
+
+    assert overlapping == [(10, 20), (30, 40)]
+    assert before_all == [(1, 5)]
+    assert contained == [False, True, True, False, True, True, False, True, False]
@@ -0,0 +1,62 @@
+from web3 import AsyncWeb3
+from web3.exceptions import Web3RPCError
+import asyncio
+
+from app.application.web3_client.batching_provider import BatchingHTTPProvider
+from tests.routes.unit.fake_rpc import fake_rpc_server, rpc_error, rpc_result
+
+
+def handle(request):
+    if request["method"] == "eth_blockNumber":
+        return rpc_result(request, "0x10")
+    return rpc_error(request, -32000, "boom")
+
+
+def test_concurrent_calls_are_coalesced_into_batches():
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            provider = BatchingHTTPProvider(url, batch_window=0.01, max_batch_size=4)
+            w3 = AsyncWeb3(provider)
+
+            results = await asyncio.gather(*[w3.eth.block_number for _ in range(10)])
+            await provider.disconnect()
+
+            return results, received, provider
+
+    results, received, provider = asyncio.run(run())
+
+    assert results == [16] * 10
+    assert [len(body) for body in received] == [4, 4, 2]
+    assert provider.requests_sent == 10
+    assert provider.http_requests_sent == 3
+
+
+def test_errors_are_dispatched_to_the_right_caller():
+    async def run():
+        async with fake_rpc_server(handle) as (url, _):
+            w3 = AsyncWeb3(BatchingHTTPProvider(url, batch_window=0.01))
+
+            results = await asyncio.gather(
+                w3.eth.block_number, w3.eth.chain_id, return_exceptions=True
+            )
+            await w3.provider.disconnect()
+            return results
+
+    block_number, chain_id = asyncio.run(run())
+
+    assert block_number == 16
+    assert isinstance(chain_id, Web3RPCError)
+
+
+def test_batching_disabled_sends_plain_requests():
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            w3 = AsyncWeb3(BatchingHTTPProvider(url, batch_window=0))
+            await asyncio.gather(w3.eth.block_number, w3.eth.block_number)
+            await w3.provider.disconnect()
+            return received
+
+    received = asyncio.run(run())
+
+    assert all(isinstance(body, dict) for body in received)
+    assert len(received) == 2
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.config import AppConfig
+from app.utils import block_cache
+
+
+class FakeEth:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_block(self, tag):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"number": 100 + self.calls}
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+def test_head_blocks_are_shared_until_ttl_expires(monkeypatch):
+    monkeypatch.setattr(AppConfig, "BLOCK_HEAD_CACHE_TTL", 60)
+    block_cache.head_cache.clear()
+    web3 = FakeWeb3()
+
+    async def run():
+        heads = await asyncio.gather(
+            *[block_cache.get_head_block(web3, "latest") for _ in range(5)]
+        )
+        heads.append(await block_cache.get_head_block(web3, "latest"))
+        return heads
+
+    heads = asyncio.run(run())
+
+    assert web3.eth.calls == 1
+    assert {head["number"] for head in heads} == {101}
+
+    monkeypatch.setattr(AppConfig, "BLOCK_HEAD_CACHE_TTL", 0)
+    head = asyncio.run(block_cache.get_head_block(web3, "latest"))
+    assert head["number"] == 102
+
+
+def test_finalized_headers_are_served_from_memory(monkeypatch):
+    monkeypatch.setattr(AppConfig, "BLOCK_HEADER_PERSIST", False)
+    block_cache.block_header_cache.clear()
+
+    async def run():
+        missing = await block_cache.get_finalized_block_header(42)
+        await block_cache.cache_finalized_block_header(
+            {"number": 42, "hash": "ab", "status": "finalized"}
+        )
+        return missing, await block_cache.get_finalized_block_header(42)
+
+    missing, cached = asyncio.run(run())
+
+    assert missing is None
+    assert cached["hash"] == "ab"
@@ -0,0 +1,170 @@
+import asyncio
+
+from hexbytes import HexBytes
+from sqlalchemy import inspect
+
+from app.application import block_ingestion
+from app.config import AppConfig
+from app.dbo import db_writer as db_writer_module
+from app.dbo.db_functions import (
+    get_block_header_by_number,
+    insert_block_header,
+    save_block_header,
+)
+from app.dbo.schema_migration import add_missing_columns
+from app.utils import block_cache
+from app.utils.block_cache import format_block_header
+from tests.routes.unit.memory_db import memory_db
+
+# block_headers como era criada antes das colunas de contagem
+LEGACY_BLOCK_HEADERS = (
+    "CREATE TABLE block_headers (number INTEGER NOT NULL, hash VARCHAR NOT NULL, "
+    "nonce VARCHAR, miner VARCHAR, parent_hash VARCHAR, timestamp INTEGER, "
+    "size INTEGER, gas_used INTEGER, base_fee_per_gas VARCHAR, gas_limit INTEGER, "
+    "difficulty VARCHAR, total_difficulty VARCHAR, withdrawals JSON, "
+    "extra_data VARCHAR, transactions_hashes JSON, PRIMARY KEY (number))"
+)
+
+
+def make_block(full_transactions: bool) -> dict:
+    hashes = [HexBytes(bytes([n]) * 32) for n in (1, 2)]
+    return {
+        "hash": HexBytes(b"\xaa" * 32),
+        "number": 100,
+        "nonce": HexBytes(b"\x00" * 8),
+        "miner": "0x" + "11" * 20,
+        "parentHash": HexBytes(b"\xbb" * 32),
+        "timestamp": 1_700_000_000,
+        "size": 1000,
+        "gasUsed": 21000,
+        "baseFeePerGas": 10**9,
+        "gasLimit": 30_000_000,
+        "extraData": HexBytes(b""),
+        "transactions": (
+            [{"hash": h, "transactionIndex": i} for i, h in enumerate(hashes)]
+            if full_transactions
+            else hashes
+        ),
+    }
+
+
+def test_header_format_accepts_blocks_with_full_transactions():
+    light = format_block_header(make_block(False), "finalized")
+    full = format_block_header(make_block(True), "finalized")
+
+    assert full == light
+    assert full["transaction_count"] == 2
+    assert full["transactions_hashes"][0] == "01" * 32
+
+
+def test_analysis_counts_are_added_to_existing_headers():
+    async def run():
+        async with memory_db(create_tables=False) as (engine, session_factory):
+            async with engine.begin() as conn:
+                await conn.exec_driver_sql(LEGACY_BLOCK_HEADERS)
+                await conn.run_sync(add_missing_columns)
+                columns = await conn.run_sync(
+                    lambda c: {
+                        col["name"] for col in inspect(c).get_columns("block_headers")
+                    }
+                )
+
+            header = format_block_header(make_block(False), "finalized")
+            async with session_factory() as session:
+                # cabeçalho salvo antes pela API, sem a contagem de swaps
+                await insert_block_header(session, header)
+                before = await get_block_header_by_number(session, 100)
+
+            async with session_factory() as session:
+                await save_block_header(session, {**header, "swap_count": 3})
+                await session.commit()
+
+            async with session_factory() as session:
+                after = await get_block_header_by_number(session, 100)
+        return columns, before, after
+
+    columns, before, after = asyncio.run(run())
+
+    assert {"transaction_count", "swap_count"} <= columns
+    assert before["swap_count"] is None
+    assert after["transaction_count"] == 2
+    assert after["swap_count"] == 3
+    assert after["base_fee_per_gas"] == 10**9
+
+
+def test_headers_saved_before_finality_are_replaced(monkeypatch):
+    monkeypatch.setattr(AppConfig, "BLOCK_HEADER_PERSIST", True)
+    block_cache.block_header_cache.clear()
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            monkeypatch.setattr(block_cache, "AsyncSessionLocal", session_factory)
+            header = format_block_header(make_block(False), "not_finalized")
+            async with session_factory() as session:
+                await save_block_header(session, {**header, "swap_count": 3})
+                await session.commit()
+            provisional = await block_cache.get_finalized_block_header(100)
+
+            # o bloco foi reorganizado e depois finalizado com outro hash
+            reorged = {**make_block(False), "hash": HexBytes(b"\xcc" * 32)}
+            async with session_factory() as session:
+                await save_block_header(
+                    session, format_block_header(reorged, "finalized")
+                )
+                await session.commit()
+            final = await block_cache.get_finalized_block_header(100)
+        return provisional, final
+
+    provisional, final = asyncio.run(run())
+
+    # não finalizado: a rota busca o bloco de novo em vez de confiar no banco
+    assert provisional is None
+    assert final["hash"] == "cc" * 32
+    assert final["status"] == "finalized"
+    assert final["swap_count"] == 3
+
+
+def test_range_ingestion_stores_the_fetched_headers(monkeypatch):
+    swap = {
+        "hash": "01" * 32,
+        "block_number": 100,
+        "log_index": 0,
+        "transaction_index": 0,
+        "from": "0x" + "11" * 20,
+        "to": "0x" + "33" * 20,
+        "tokenIn": "WETH",
+        "tokenOut": "USDC",
+        "amountIn": "1",
+        "amountOut": "2",
+        "gasPrice": "3",
+    }
+
+    async def fake_logs(async_web3, from_block, to_block):
+        yield [make_block(False)], []
+
+    async def fake_decode(pairs, base_fees, concurrency=None):
+        return [swap]
+
+    async def not_finalized(async_web3, block_number):
+        return False
+
+    monkeypatch.setattr(AppConfig, "BLOCK_HEADER_PERSIST", True)
+    monkeypatch.setattr(block_ingestion, "iter_swap_transactions_by_logs", fake_logs)
+    monkeypatch.setattr(block_ingestion, "decode_transactions", fake_decode)
+    monkeypatch.setattr(block_ingestion, "is_block_finalized", not_finalized)
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            monkeypatch.setattr(
+                db_writer_module.db_writer, "session_factory", session_factory
+            )
+            await block_ingestion.ingest_range(100, 110)
+            async with session_factory() as session:
+                return await get_block_header_by_number(session, 100)
+
+    header = asyncio.run(run())
+
+    assert header["hash"] == "aa" * 32
+    assert header["status"] == "not_finalized"
+    assert header["swap_count"] == 1
+    assert header["transaction_count"] == 2
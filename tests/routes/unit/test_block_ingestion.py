@@ -0,0 +1,58 @@
+import asyncio
+import contextlib
+
+from hexbytes import HexBytes
+
+from app.application import block_ingestion
+
+
+def test_decoded_swaps_keep_chain_order_and_concurrency_limit(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_decode(async_web3, tx_hash, tx, receipt, session, base_fee_per_gas):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # transações do começo do bloco terminam por último
+        await asyncio.sleep(0.001 * (10 - tx["transactionIndex"]))
+        running -= 1
+        if tx["transactionIndex"] == 3:
+            return None
+        return [
+            {
+                "block_number": str(tx["blockNumber"]),
+                "transaction_index": tx["transactionIndex"],
+                "log_index": log_index,
+                "base_fee": base_fee_per_gas,
+            }
+            for log_index in (receipt["first_log"] + 1, receipt["first_log"])
+        ]
+
+    monkeypatch.setattr(block_ingestion, "decode_swap_events", fake_decode)
+    monkeypatch.setattr(block_ingestion, "AsyncSessionLocal", contextlib.nullcontext)
+
+    pairs = [
+        (
+            {
+                "hash": HexBytes(bytes([block, index])),
+                "blockNumber": block,
+                "transactionIndex": index,
+            },
+            {"first_log": 2 * index},
+        )
+        for block in (101, 100)
+        for index in reversed(range(5))
+    ]
+
+    swaps = asyncio.run(
+        block_ingestion.decode_swap_pairs(pairs, {100: 7, 101: 8}, concurrency=3)
+    )
+
+    positions = [
+        (int(s["block_number"]), s["transaction_index"], s["log_index"]) for s in swaps
+    ]
+    assert positions == sorted(positions)
+    assert len(positions) == 16
+    assert {s["base_fee"] for s in swaps if s["block_number"] == "100"} == {7}
+    assert peak == 3
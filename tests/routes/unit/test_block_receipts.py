@@ -0,0 +1,71 @@
+from web3 import AsyncWeb3
+import asyncio
+
+from app.application.swap_details import get_block_with_receipts
+from app.config import AppConfig
+from tests.routes.unit.fake_rpc import fake_rpc_server, rpc_error, rpc_result
+
+BLOCK_NUMBER = 100
+TX_COUNT = 5
+
+
+def tx_hash(index: int) -> str:
+    return "0x" + f"{index + 1:064x}"
+
+
+def handle(request):
+    method, params = request["method"], request["params"]
+    if method == "eth_getBlockReceipts":
+        return rpc_error(
+            request, -32601, "the method eth_getBlockReceipts does not exist"
+        )
+    if method == "eth_getBlockByNumber":
+        return rpc_result(
+            request,
+            {
+                "number": hex(BLOCK_NUMBER),
+                "baseFeePerGas": hex(10**9),
+                "transactions": [
+                    {
+                        "hash": tx_hash(i),
+                        "blockNumber": hex(BLOCK_NUMBER),
+                        "transactionIndex": hex(i),
+                    }
+                    for i in range(TX_COUNT)
+                ],
+            },
+        )
+    if method == "eth_getTransactionReceipt":
+        index = int(params[0], 16) - 1
+        return rpc_result(
+            request,
+            {
+                "transactionHash": params[0],
+                "blockNumber": hex(BLOCK_NUMBER),
+                "transactionIndex": hex(index),
+                "gasUsed": hex(21000),
+                "logs": [],
+            },
+        )
+    raise AssertionError(f"método inesperado: {method}")
+
+
+def test_receipts_fall_back_to_batches_when_block_receipts_is_rejected(monkeypatch):
+    monkeypatch.setattr(AppConfig, "RPC_BATCH_SIZE", 2)
+
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+            block, pairs = await get_block_with_receipts(w3, BLOCK_NUMBER)
+        return block, pairs, received
+
+    block, pairs, received = asyncio.run(run())
+
+    assert block["number"] == BLOCK_NUMBER
+    assert len(pairs) == TX_COUNT
+    for index, (tx, receipt) in enumerate(pairs):
+        assert tx["transactionIndex"] == receipt["transactionIndex"] == index
+        assert tx["hash"] == receipt["transactionHash"]
+    # lotes de até RPC_BATCH_SIZE recibos depois da recusa
+    batches = [body for body in received if isinstance(body, list)]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.dbo.db_functions import (
+    fetch_transactions_swap_by_block_number,
+    get_analyzed_blocks_by_block_number,
+    get_dex_name_by_pool_address,
+    insert_block_swaps,
+    insert_dex_name,
+)
+from tests.routes.unit.memory_db import memory_db
+
+
+def make_swap(block_number, log_index):
+    return {
+        "hash": f"0x{log_index:064x}",
+        "block_number": block_number,
+        "log_index": log_index,
+        "transaction_index": log_index // 2,
+        "from": "0x" + "11" * 20,
+        "to": "0x" + "22" * 20,
+        "tokenIn": "WETH",
+        "tokenOut": "USDC",
+        "amountIn": "1",
+        "amountOut": "2000",
+        "gasPrice": "10",
+    }
+
+
+def test_block_swaps_are_inserted_once_with_the_analyzed_marker():
+    async def run():
+        swaps = [make_swap(100, i) for i in range(150)]
+        async with memory_db() as (_, session_factory):
+            async with session_factory() as session:
+                await insert_block_swaps(session, 100, swaps)
+                # reprocessar o bloco não duplica nem falha
+                await insert_block_swaps(
+                    session, 100, swaps[:10] + [make_swap(100, 150)]
+                )
+                await insert_dex_name(session, "0xpool", "Uniswap V2")
+                await insert_dex_name(session, "0xpool", "Uniswap V2")
+
+                stored = await fetch_transactions_swap_by_block_number(session, "100")
+                analyzed = await get_analyzed_blocks_by_block_number(session, "100")
+                dex_name = await get_dex_name_by_pool_address(session, "0xpool")
+        return stored, analyzed, dex_name
+
+    stored, analyzed, dex_name = asyncio.run(run())
+
+    assert len(stored) == 151
+    assert stored[0].from_address == "0x" + "11" * 20
+    assert stored[0].token_in == "WETH"
+    assert analyzed is True
+    assert dex_name == "Uniswap V2"
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.dbo.db_writer import DbWriter
+from app.dbo.models import BlockAnalyzed, DexName
+from tests.routes.unit.memory_db import memory_db
+
+
+async def count(session_factory, model):
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+def test_concurrent_writes_are_grouped_and_flushed_on_stop():
+    async def run():
+        async with memory_db() as (_, session_factory):
+            writer = DbWriter(session_factory, max_batch_rows=100, flush_interval=0.02)
+            writer.start()
+
+            await asyncio.gather(
+                *(
+                    writer.write(rows=[(BlockAnalyzed, [{"block_number": str(n)}])])
+                    for n in range(50)
+                )
+            )
+            # escritas sem espera ficam na fila até o stop
+            for n in range(20):
+                await writer.write(
+                    rows=[(DexName, [{"pool_address": f"0x{n}", "dex_name": "V2"}])],
+                    wait=False,
+                )
+            await writer.stop()
+
+            return (
+                await count(session_factory, BlockAnalyzed),
+                await count(session_factory, DexName),
+                writer.stats(),
+            )
+
+    analyzed, dex_names, stats = asyncio.run(run())
+
+    assert analyzed == 50
+    assert dex_names == 20
+    assert stats["ops"] == 70
+    assert stats["batches"] < 10
+    assert stats["queue_depth"] == 0
+
+
+def test_failing_write_does_not_discard_the_rest_of_the_batch():
+    async def failing(session):
+        raise RuntimeError("boom")
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            writer = DbWriter(session_factory, flush_interval=0.02)
+            writer.start()
+
+            results = await asyncio.gather(
+                writer.write(rows=[(BlockAnalyzed, [{"block_number": "1"}])]),
+                writer.write(fn=failing),
+                writer.write(rows=[(BlockAnalyzed, [{"block_number": "2"}])]),
+                return_exceptions=True,
+            )
+            await writer.stop()
+
+            # fora do ciclo de vida a escrita é feita na hora
+            await writer.write(rows=[(BlockAnalyzed, [{"block_number": "3"}])])
+            with pytest.raises(RuntimeError):
+                await writer.write(fn=failing)
+
+            analyzed = await count(session_factory, BlockAnalyzed)
+            return results, analyzed, writer.stats()
+
+    results, analyzed, stats = asyncio.run(run())
+
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], RuntimeError)
+    assert analyzed == 3
+    assert stats["failed"] == 2
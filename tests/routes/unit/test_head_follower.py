@@ -0,0 +1,77 @@
+import asyncio
+
+from hexbytes import HexBytes
+
+from app.application.web3_client.head_follower import HeadFollower
+
+
+def block_hash(number, fork=0):
+    return HexBytes(bytes([fork, number % 256]) * 16)
+
+
+class FakeEth:
+    def __init__(self):
+        self.head = 0
+        self.fork = 0
+        self.calls = 0
+
+    async def get_block(self, number, full_transactions=False):
+        self.calls += 1
+        if number == "finalized":
+            number = self.head - 2
+        fork = self.fork if number == self.head else 0
+        return {
+            "number": number,
+            "hash": block_hash(number, fork),
+            "parentHash": block_hash(number - 1),
+            "nonce": HexBytes(b"\x00" * 8),
+            "miner": "0x0000000000000000000000000000000000000000",
+            "timestamp": 1_700_000_000 + number * 12,
+            "gasUsed": 1,
+            "gasLimit": 2,
+            "extraData": HexBytes(b""),
+            "transactions": [HexBytes(b"\x01" * 32)],
+        }
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+def test_buffer_follows_head_fills_gaps_and_handles_reorgs():
+    web3 = FakeWeb3()
+    follower = HeadFollower(web3, buffer_size=4)
+
+    async def run():
+        web3.eth.head = 10
+        await follower.on_new_head(10)
+        web3.eth.head = 13
+        await follower.on_new_head(13)
+
+        # mesma altura, outro hash: o bloco 13 é substituído
+        web3.eth.fork = 1
+        await follower.on_new_head(13, block_hash(13, fork=1).hex())
+
+    asyncio.run(run())
+
+    assert [b["number"] for b in follower.blocks] == [10, 11, 12, 13]
+    assert follower.reorgs == 1
+    assert follower.get_block(13)["hash"] == block_hash(13, fork=1).hex()
+    assert follower.get_block(11)["status"] == "finalized"
+    assert follower.latest_block()["status"] == "not_finalized"
+    assert follower.get_block(9) is None
+
+    calls = web3.eth.calls
+    asyncio.run(follower.on_new_head(13))
+    assert web3.eth.calls == calls
+
+
+def test_stale_buffer_is_not_served():
+    web3 = FakeWeb3()
+    follower = HeadFollower(web3, stale_after=0)
+    web3.eth.head = 5
+    asyncio.run(follower.on_new_head(5))
+
+    assert follower.latest_block() is None
+    assert follower.get_block(5) is None
@@ -0,0 +1,46 @@
+import asyncio
+import contextlib
+
+from app.application import transactions_application
+from app.config import AppConfig
+
+
+def test_latest_transactions_are_fetched_concurrently_up_to_limit(monkeypatch):
+    hashes = [f"0x{n:064x}" for n in range(20)]
+    fetched = []
+    running = 0
+    peak = 0
+
+    async def fake_get_transaction(transaction_hash, session):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # as primeiras transações terminam por último
+        await asyncio.sleep(0.01 * (20 - int(transaction_hash, 16)))
+        running -= 1
+        fetched.append(transaction_hash)
+        return {"transaction_hash": transaction_hash}
+
+    monkeypatch.setattr(
+        transactions_application.head_follower,
+        "latest_block",
+        lambda: {"number": 1, "transactions_hashes": hashes},
+    )
+    monkeypatch.setattr(
+        transactions_application,
+        "get_transaction_by_hash_application",
+        fake_get_transaction,
+    )
+    monkeypatch.setattr(
+        transactions_application, "AsyncSessionLocal", contextlib.nullcontext
+    )
+    monkeypatch.setattr(AppConfig, "BLOCK_INGESTION_CONCURRENCY", 4)
+
+    transactions = asyncio.run(
+        transactions_application.fetch_latests_transactions_application(limit=10)
+    )
+
+    # só as `limit` primeiras, na ordem do bloco
+    assert [t["transaction_hash"] for t in transactions] == hashes[:10]
+    assert sorted(fetched) == hashes[:10]
+    assert peak == 4
@@ -0,0 +1,213 @@
+import asyncio
+
+from app.application import blocks_application
+from app.dbo import db_writer as db_writer_module
+from app.dbo.db_functions import insert_block_swaps
+from app.dto.multiple_sandwich_response import MultipleSandwichResponse
+from tests.routes.unit.memory_db import memory_db
+
+ATTACKER = "0x" + "11" * 20
+VICTIM = "0x" + "22" * 20
+
+
+def make_swap(log_index, sender):
+    return {
+        "hash": f"{log_index:064x}",
+        "block_number": 100,
+        "log_index": log_index,
+        "transaction_index": log_index,
+        "from": sender,
+        "to": "0x" + "33" * 20,
+        "tokenIn": "WETH",
+        "tokenOut": "USDC",
+        "amountIn": "1",
+        "amountOut": "2",
+        "gasPrice": "3",
+    }
+
+
+def detection():
+    return {
+        "block": 100,
+        "attacker_addr": ATTACKER,
+        "victims_addr": [VICTIM],
+        "front_run": [f"{0:064x}_0"],
+        "front_run_log_index": 0,
+        "victims_txs": [f"{1:064x}_1", f"{2:064x}_2"],
+        "back_run": [f"{3:064x}_3"],
+        "back_run_log_index": 3,
+        "cost_amount": 1.5,
+        "gain_amount": 1.6,
+        "cost_usd": 10.0,
+        "gain_usd": 12.5,
+        "front_burned_eth": 0.001,
+        "front_tipped_eth": 0.002,
+        "back_burned_eth": 0.003,
+        "back_tipped_eth": 0.004,
+        "front_burned_usd": 1.0,
+        "front_tipped_usd": 2.0,
+        "back_burned_usd": 3.0,
+        "back_tipped_usd": 4.0,
+    }
+
+
+HASH = "aa" * 32
+
+
+def use_memory_db(monkeypatch, session_factory, detect, ingested):
+    """
+    Detecção e ingestão falsas; a gravação passa pelo DbWriter de verdade,
+    apontado para o banco em memória.
+    """
+
+    async def analyzed(session, block_number):
+        return True
+
+    async def ingest(block_number):
+        ingested.append(block_number)
+
+    monkeypatch.setattr(db_writer_module.db_writer, "session_factory", session_factory)
+    monkeypatch.setattr(
+        blocks_application, "detect_multi_layered_burger_sandwiches", detect
+    )
+    monkeypatch.setattr(
+        blocks_application, "get_analyzed_blocks_by_block_number", analyzed
+    )
+    monkeypatch.setattr(blocks_application, "ingest_block", ingest)
+
+
+def set_head_block(monkeypatch, block_hash):
+    monkeypatch.setattr(
+        blocks_application.head_follower,
+        "get_block",
+        lambda n: {"number": n, "hash": block_hash, "base_fee_per_gas": 7},
+    )
+
+
+async def insert_swaps(session_factory):
+    senders = [ATTACKER, VICTIM, VICTIM, ATTACKER]
+    async with session_factory() as session:
+        await insert_block_swaps(
+            session, 100, [make_swap(i, s) for i, s in enumerate(senders)]
+        )
+
+
+async def analyze(monkeypatch, detect, versions, hashes=None, ingested=None):
+    """
+    Analisa o bloco 100 uma vez por versão do detector em `versions` (com o
+    hash do bloco em `hashes` na cabeça da cadeia), com um banco em memória,
+    e retorna as respostas.
+    """
+    hashes = hashes or [HASH] * len(versions)
+    ingested = [] if ingested is None else ingested
+    async with memory_db() as (_, session_factory):
+        use_memory_db(monkeypatch, session_factory, detect, ingested)
+        await insert_swaps(session_factory)
+
+        responses = []
+        async with session_factory() as session:
+            for version, block_hash in zip(versions, hashes):
+                monkeypatch.setattr(
+                    blocks_application, "MULTI_LAYERED_DETECTOR_VERSION", version
+                )
+                set_head_block(monkeypatch, block_hash)
+                responses.append(
+                    await blocks_application.analyze_multi_layered_burger_sandwiches(
+                        session, 100
+                    )
+                )
+    return responses
+
+
+def test_multi_layered_results_are_served_from_the_db_until_the_version_changes(
+    monkeypatch,
+):
+    calls = []
+
+    async def fake_detect(session, block, base_fee_per_gas):
+        calls.append(block["number"])
+        return [detection()]
+
+    # nova versão do detector na terceira requisição: o bloco é reanalisado
+    first, cached, recomputed = asyncio.run(
+        analyze(monkeypatch, fake_detect, versions=(1, 1, 2))
+    )
+
+    assert calls == [100, 100]
+    assert first["total_sandwiches"] == cached["total_sandwiches"] == 1
+    sandwich = cached["sandwiches"][0]
+    assert sandwich["attacker_addr"] == ATTACKER
+    assert sandwich["gain_usd"] == 12.5
+    assert "front_burned_eth" not in sandwich
+    assert [s["log_index"] for s in sandwich["swaps"]["victims"]] == [1, 2]
+    assert sandwich["swaps"]["back_run"][0]["log_index"] == 3
+    # os swaps no formato dos detectores só são validados na resposta HTTP
+    response = MultipleSandwichResponse.model_validate(cached).model_dump(by_alias=True)
+    front_run = response["sandwiches"][0]["swaps"]["front_run"][0]
+    assert front_run["from_address"] == ATTACKER
+    assert front_run["token_in"] == "WETH"
+    assert recomputed["total_sandwiches"] == 1
+
+
+def test_results_of_a_reorged_block_are_replaced(monkeypatch):
+    calls = []
+    ingested = []
+
+    async def fake_detect(session, block, base_fee_per_gas):
+        calls.append(block["number"])
+        return [detection()]
+
+    asyncio.run(
+        analyze(
+            monkeypatch,
+            fake_detect,
+            versions=(1, 1, 1),
+            hashes=(HASH, HASH, "bb" * 32),
+            ingested=ingested,
+        )
+    )
+
+    # o hash na cabeça mudou: o bloco é extraído e analisado de novo
+    assert calls == [100, 100]
+    assert ingested == [100]
+
+
+def test_results_with_missing_prices_are_stored_and_retried(monkeypatch):
+    calls = []
+    ingested = []
+
+    async def fake_detect(session, block, base_fee_per_gas):
+        calls.append(block["number"])
+        # o preço só aparece na segunda tentativa
+        return [{**detection(), "prices_resolved": len(calls) > 1}]
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            use_memory_db(monkeypatch, session_factory, fake_detect, ingested)
+            set_head_block(monkeypatch, HASH)
+            await insert_swaps(session_factory)
+
+            responses = []
+            async with session_factory() as session:
+                # o intervalo de nova tentativa só se esgota na terceira
+                for interval in (3600, 3600, 0, 0):
+                    monkeypatch.setattr(
+                        blocks_application.AppConfig,
+                        "MULTI_LAYERED_PRICE_RETRY_INTERVAL",
+                        interval,
+                    )
+                    responses.append(
+                        await blocks_application.analyze_multi_layered_burger_sandwiches(
+                            session, 100
+                        )
+                    )
+        return responses
+
+    responses = asyncio.run(run())
+
+    # guardado com o preço faltando, refeito uma vez e depois servido do banco,
+    # sem extrair o bloco de novo
+    assert calls == [100, 100]
+    assert [r["total_sandwiches"] for r in responses] == [1, 1, 1, 1]
+    assert "prices_resolved" not in responses[0]["sandwiches"][0]
+    assert ingested == []
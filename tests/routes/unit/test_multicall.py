@@ -0,0 +1,77 @@
+from eth_abi import decode, encode
+from web3 import AsyncWeb3
+import asyncio
+
+from app.utils import pool_metadata
+from app.utils.multicall import (
+    DECIMALS_CALL,
+    SYMBOL_CALL,
+    TOKEN0_CALL,
+    TOKEN1_CALL,
+    decode_symbol,
+)
+from tests.routes.unit.fake_rpc import fake_rpc_server, rpc_result
+
+POOL = AsyncWeb3.to_checksum_address("0x" + "33" * 20)
+BROKEN_POOL = AsyncWeb3.to_checksum_address("0x" + "44" * 20)
+WETH = AsyncWeb3.to_checksum_address("0x" + "11" * 20)
+MKR = AsyncWeb3.to_checksum_address("0x" + "22" * 20)
+
+
+def answer_call(target: str, call_data: bytes) -> tuple[bool, bytes]:
+    target = AsyncWeb3.to_checksum_address(target)
+    if target == POOL and call_data == TOKEN0_CALL:
+        return True, encode(["address"], [WETH])
+    if target == POOL and call_data == TOKEN1_CALL:
+        return True, encode(["address"], [MKR])
+    if target == WETH and call_data == SYMBOL_CALL:
+        return True, encode(["string"], ["WETH"])
+    if target == MKR and call_data == SYMBOL_CALL:
+        # MKR devolve bytes32 em vez de string
+        return True, b"MKR".ljust(32, b"\x00")
+    if call_data == DECIMALS_CALL and target in (WETH, MKR):
+        return True, encode(["uint8"], [18])
+    return False, b""
+
+
+def handle(request):
+    if request["method"] == "eth_chainId":
+        return rpc_result(request, "0x1")
+
+    data = bytes.fromhex(request["params"][0]["data"][2:])
+    (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+    results = [answer_call(target, call_data) for target, _, call_data in calls]
+    return rpc_result(request, "0x" + encode(["(bool,bytes)[]"], [results]).hex())
+
+
+def test_decode_symbol_accepts_string_and_bytes32():
+    assert decode_symbol(encode(["string"], ["USDC"])) == "USDC"
+    assert decode_symbol(b"MKR".ljust(32, b"\x00")) == "MKR"
+    assert decode_symbol(b"") is None
+
+
+def test_resolve_pools_metadata_uses_two_multicalls():
+    pool_metadata.pool_metadata_cache.clear()
+    pool_metadata.token_metadata_cache.clear()
+
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+            await pool_metadata.resolve_pools_metadata(w3, [POOL, BROKEN_POOL, POOL])
+            await w3.provider.disconnect()
+            return [r for r in received if r["method"] == "eth_call"]
+
+    eth_calls = asyncio.run(run())
+
+    assert len(eth_calls) == 2
+    assert pool_metadata.pool_metadata_cache.get(POOL) == {
+        "pool_address": POOL,
+        "token0": WETH,
+        "token1": MKR,
+        "symbol0": "WETH",
+        "symbol1": "MKR",
+        "decimals0": 18,
+        "decimals1": 18,
+    }
+    assert BROKEN_POOL not in pool_metadata.pool_metadata_cache
+    assert pool_metadata.get_cached_token_decimals(MKR) == 18
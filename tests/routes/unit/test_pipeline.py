@@ -0,0 +1,46 @@
+import asyncio
+
+from app.utils.pipeline import Pipeline, Stage
+
+
+def test_items_flow_through_stages_with_bounded_queues():
+    done = []
+    max_depth = 0
+
+    async def produce(item):
+        item["value"] = item["n"] * 2
+
+    async def slow_consume(item):
+        nonlocal max_depth
+        max_depth = max(max_depth, consume.queue.qsize())
+        await asyncio.sleep(0.002)
+        if item["n"] == 3:
+            raise ValueError("boom")
+
+    async def on_done(item, error):
+        done.append((item["n"], item.get("value"), type(error).__name__))
+
+    produce_stage = Stage("produce", produce, workers=2, queue_size=2)
+    consume = Stage("consume", slow_consume, workers=1, queue_size=2)
+    pipeline = Pipeline([produce_stage, consume], on_done=on_done)
+
+    async def run():
+        pipeline.start()
+        for n in range(10):
+            await pipeline.submit({"n": n})
+        await pipeline.join()
+        await pipeline.stop()
+
+    asyncio.run(run())
+
+    assert sorted(n for n, _, _ in done) == list(range(10))
+    assert all(value == n * 2 for n, value, _ in done)
+    assert [n for n, _, error in done if error != "NoneType"] == [3]
+    # a etapa lenta nunca acumula mais que o tamanho da sua fila
+    assert max_depth <= 2
+
+    stats = pipeline.stats()
+    assert stats["produce"]["processed"] == 10
+    assert stats["consume"]["processed"] == 9
+    assert stats["consume"]["failed"] == 1
+    assert stats["consume"]["latency_avg_ms"] >= 2
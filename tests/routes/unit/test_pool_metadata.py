@@ -0,0 +1,103 @@
+import asyncio
+
+from app.dbo.models import PoolMetadata
+from app.utils import pool_metadata
+from app.utils.lru_cache import LRUCache
+from tests.routes.unit.memory_db import memory_db
+
+
+def make_metadata(n: int) -> dict:
+    return {
+        "pool_address": f"0x{n:040x}",
+        "token0": f"0x{n + 100:040x}",
+        "token1": f"0x{n + 200:040x}",
+        "symbol0": f"T{n}A",
+        "symbol1": f"T{n}B",
+        "decimals0": 18,
+        "decimals1": 6,
+    }
+
+
+class UnusableSession:
+    def __getattr__(self, name):
+        raise AssertionError("o banco não deveria ser consultado")
+
+
+def fresh_caches(monkeypatch, maxsize: int = 16) -> list:
+    """
+    Caches vazios e uma busca on-chain falsa que registra os pools pedidos.
+    """
+    monkeypatch.setattr(pool_metadata, "pool_metadata_cache", LRUCache(maxsize))
+    monkeypatch.setattr(pool_metadata, "token_metadata_cache", LRUCache(maxsize * 2))
+    monkeypatch.setattr(
+        pool_metadata,
+        "pool_metadata_stats",
+        {"db_hits": 0, "rpc_fetches": 0, "multicall_fetches": 0},
+    )
+    fetched = []
+
+    async def fake_fetch(async_web3, pool_address):
+        fetched.append(pool_address)
+        return make_metadata(int(pool_address, 16))
+
+    monkeypatch.setattr(pool_metadata, "fetch_pool_metadata", fake_fetch)
+    return fetched
+
+
+def test_memory_hit_skips_database_and_rpc(monkeypatch):
+    fetched = fresh_caches(monkeypatch)
+    metadata = make_metadata(1)
+    pool_metadata.cache_pool_metadata(metadata)
+
+    result = asyncio.run(
+        pool_metadata.get_pool_metadata(
+            None, metadata["pool_address"], session=UnusableSession()
+        )
+    )
+
+    assert result == metadata
+    assert fetched == []
+    assert pool_metadata.pool_metadata_stats["db_hits"] == 0
+
+
+def test_database_hit_skips_rpc_and_fills_the_cache(monkeypatch):
+    fetched = fresh_caches(monkeypatch)
+    metadata = make_metadata(2)
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            async with session_factory() as session:
+                session.add(PoolMetadata(**metadata))
+                await session.commit()
+
+            async with session_factory() as session:
+                return await pool_metadata.get_pool_metadata(
+                    None, metadata["pool_address"], session=session
+                )
+
+    result = asyncio.run(run())
+
+    assert result == metadata
+    assert fetched == []
+    assert pool_metadata.pool_metadata_stats["db_hits"] == 1
+    assert pool_metadata.pool_metadata_cache.get(metadata["pool_address"]) == metadata
+    assert pool_metadata.token_metadata_cache.get(metadata["token1"]) == {
+        "symbol": "T2B",
+        "decimals": 6,
+    }
+
+
+def test_least_recently_used_pool_is_evicted(monkeypatch):
+    fetched = fresh_caches(monkeypatch, maxsize=2)
+    a, b, c = (make_metadata(n)["pool_address"] for n in (1, 2, 3))
+
+    async def run():
+        for pool in (a, b, a, c, a, b):
+            await pool_metadata.get_pool_metadata(None, pool)
+
+    asyncio.run(run())
+
+    # `a` foi usado antes de `c` entrar, então `b` saiu do cache
+    assert fetched == [a, b, c, b]
+    assert b in pool_metadata.pool_metadata_cache
+    assert c not in pool_metadata.pool_metadata_cache
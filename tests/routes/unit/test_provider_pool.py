@@ -0,0 +1,117 @@
+from contextlib import AsyncExitStack
+from aiohttp import web
+from web3 import AsyncHTTPProvider, AsyncWeb3
+import asyncio
+
+from app.application.web3_client.provider_pool import ProviderPool, hedged_requests
+from tests.routes.unit.fake_rpc import fake_rpc_server, rpc_result
+
+
+def http_provider(url: str) -> AsyncHTTPProvider:
+    # sem as novas tentativas internas do web3: o pool faz o failover
+    return AsyncHTTPProvider(url, exception_retry_configuration=None)
+
+
+def block_handler(name: str, delay: float = 0.0):
+    async def handle(request):
+        await asyncio.sleep(delay)
+        if request["method"] == "eth_blockNumber":
+            return rpc_result(request, "0x10")
+        return rpc_result(
+            request,
+            {
+                "number": "0x10",
+                "hash": "0x" + "00" * 32,
+                "extraData": "0x" + name.encode().hex(),
+                "transactions": [],
+            },
+        )
+
+    return handle
+
+
+async def broken_handler(request):
+    raise web.HTTPInternalServerError()
+
+
+async def start_servers(stack: AsyncExitStack, *handlers):
+    return [await stack.enter_async_context(fake_rpc_server(h)) for h in handlers]
+
+
+def test_routes_to_the_fastest_endpoint_and_fails_over():
+    async def run():
+        async with AsyncExitStack() as stack:
+            (slow, _), (broken, _), (fast, _) = await start_servers(
+                stack,
+                block_handler("slow", 0.05),
+                broken_handler,
+                block_handler("fast"),
+            )
+            pool = ProviderPool([http_provider(url) for url in (slow, broken, fast)])
+            w3 = AsyncWeb3(pool)
+            for _ in range(10):
+                assert await w3.eth.block_number == 16
+            await pool.disconnect()
+            return pool
+
+    pool = asyncio.run(run())
+
+    slow_health, broken_health, fast_health = (
+        pool.health[id(p)] for p in pool.providers
+    )
+    assert broken_health.errors >= 1
+    assert fast_health.requests >= 8
+    assert fast_health.latency_ewma < slow_health.latency_ewma
+    assert pool.ranked_providers()[0] is pool.providers[2]
+
+
+def test_hedged_request_is_answered_by_the_second_endpoint():
+    async def run():
+        async with AsyncExitStack() as stack:
+            (primary, _), (secondary, _) = await start_servers(
+                stack, block_handler("primary", 0.3), block_handler("secondary", 0.3)
+            )
+            pool = ProviderPool(
+                [http_provider(primary), http_provider(secondary)],
+                hedged_methods={"eth_getBlockByNumber"},
+                hedge_min_delay=0.05,
+            )
+            # o primeiro endpoint é medido como rápido, mas passa a demorar
+            pool.health[id(pool.providers[0])].record_success(0.01)
+            pool.health[id(pool.providers[1])].record_success(0.02)
+
+            w3 = AsyncWeb3(pool)
+            with hedged_requests():
+                started = asyncio.get_running_loop().time()
+                block = await w3.eth.get_block(16)
+                elapsed = asyncio.get_running_loop().time() - started
+            await pool.disconnect()
+            return pool, block, elapsed
+
+    pool, block, elapsed = asyncio.run(run())
+
+    assert block["number"] == 16
+    assert pool.hedges_sent == 1
+    assert elapsed < 0.6
+
+
+def test_no_hedging_outside_hedged_requests():
+    async def run():
+        async with AsyncExitStack() as stack:
+            (a, _), (b, b_calls) = await start_servers(
+                stack, block_handler("a", 0.1), block_handler("b")
+            )
+            pool = ProviderPool(
+                [http_provider(a), http_provider(b)],
+                hedged_methods={"eth_getBlockByNumber"},
+                hedge_min_delay=0.01,
+            )
+            pool.health[id(pool.providers[1])].record_success(1.0)
+            await AsyncWeb3(pool).eth.get_block(16)
+            await pool.disconnect()
+            return pool, b_calls
+
+    pool, b_calls = asyncio.run(run())
+
+    assert pool.hedges_sent == 0
+    assert not [c for c in b_calls if c["method"] == "eth_getBlockByNumber"]
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.dbo.db_functions import (
+    fetch_analyzed_ranges,
+    fetch_swap_records_by_block_number,
+    fetch_transactions_swap_by_block_number,
+    fetch_transactions_swap_by_hash,
+    fetch_transactions_swap_by_pool,
+    fetch_transactions_swap_by_range,
+    fetch_transactions_swap_by_sender,
+    get_attacks_by_attacker,
+    is_block_in_analyzed_ranges,
+    get_attacks_by_hash,
+    get_sandwich_attacks_by_block_grouped_by_attack_group,
+)
+from tests.routes.unit.memory_db import memory_db
+
+ADDRESS = "0x" + "11" * 20
+HASH = "22" * 32
+
+# Cada consulta dos caminhos de leitura e o índice que ela deve usar
+QUERIES = [
+    (
+        lambda s: fetch_transactions_swap_by_block_number(s, 100),
+        ["ix_transactions_swap_block_order"],
+    ),
+    (
+        lambda s: fetch_swap_records_by_block_number(s, 100),
+        ["ix_transactions_swap_block_order"],
+    ),
+    (
+        lambda s: fetch_transactions_swap_by_range(s, 100, 200),
+        ["ix_transactions_swap_block_order"],
+    ),
+    (
+        lambda s: fetch_transactions_swap_by_hash(s, HASH),
+        ["sqlite_autoindex_transactions_swap_1"],
+    ),
+    (
+        lambda s: fetch_transactions_swap_by_pool(s, ADDRESS),
+        ["ix_transactions_swap_to_block"],
+    ),
+    (
+        lambda s: fetch_transactions_swap_by_sender(s, ADDRESS),
+        ["ix_transactions_swap_from_block"],
+    ),
+    (
+        lambda s: get_attacks_by_hash(s, HASH),
+        ["ix_sandwiches_attacks_hash"],
+    ),
+    (
+        lambda s: get_attacks_by_attacker(s, ADDRESS),
+        ["ix_sandwiches_attacks_from_type_block"],
+    ),
+    (
+        lambda s: get_sandwich_attacks_by_block_grouped_by_attack_group(s, 100),
+        ["ix_sandwiches_attacks_block_number", "INTEGER PRIMARY KEY"],
+    ),
+    (
+        # limitada aos dois lados, não a todos os intervalos anteriores
+        lambda s: fetch_analyzed_ranges(s, 100, 200),
+        ["INTEGER PRIMARY KEY (rowid>? AND rowid<?)"],
+    ),
+    (
+        lambda s: is_block_in_analyzed_ranges(s, 100),
+        ["INTEGER PRIMARY KEY (rowid<?)"],
+    ),
+]
+
+
+def query_plan(run_query) -> list[str]:
+    """
+    Executa a consulta capturando o SQL emitido e devolve o EXPLAIN QUERY
+    PLAN de cada SELECT.
+    """
+
+    async def run():
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        async with memory_db() as (engine, session_factory):
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            async with session_factory() as session:
+                await run_query(session)
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+            plan = []
+            async with engine.connect() as conn:
+                for statement, parameters in statements:
+                    rows = await conn.exec_driver_sql(
+                        "EXPLAIN QUERY PLAN " + statement, parameters
+                    )
+                    plan.extend(row[-1] for row in rows)
+        return plan
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("run_query, indexes", QUERIES)
+def test_read_paths_use_indexes_without_scans_or_sorts(run_query, indexes):
+    plan = query_plan(run_query)
+
+    assert plan
+    assert not [step for step in plan if step.startswith("SCAN")], plan
+    assert not [step for step in plan if "TEMP B-TREE" in step], plan
+    for index in indexes:
+        assert any(index in step for step in plan), plan
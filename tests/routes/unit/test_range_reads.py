@@ -0,0 +1,88 @@
+import asyncio
+
+from app.dbo.db_functions import (
+    fetch_swap_records_by_block_number,
+    insert_block_swaps,
+    stream_block_swaps_by_range,
+    stream_transactions_swap_by_range,
+)
+from tests.routes.unit.memory_db import memory_db
+
+
+def make_swap(block_number, transaction_index, log_index):
+    return {
+        "hash": f"{block_number:032x}{transaction_index:032x}",
+        "block_number": block_number,
+        "log_index": log_index,
+        "transaction_index": transaction_index,
+        "from": "0x" + "11" * 20,
+        "to": "0x" + "22" * 20,
+        "tokenIn": "WETH",
+        "tokenOut": "USDC",
+        "amountIn": str(10**20),
+        "amountOut": "2",
+        "gasPrice": "3",
+    }
+
+
+def test_range_reads_stream_chunks_in_chain_order():
+    async def run():
+        async with memory_db() as (_, session_factory):
+            async with session_factory() as session:
+                # gravados fora de ordem, com um bloco sem swaps (102)
+                for block_number in (103, 101, 100):
+                    swaps = [make_swap(block_number, tx, tx * 2) for tx in (2, 0, 1)]
+                    await insert_block_swaps(session, block_number, swaps)
+
+            async with session_factory() as session:
+                chunks = [
+                    chunk
+                    async for chunk in stream_transactions_swap_by_range(
+                        session, 101, 103, chunk_size=4
+                    )
+                ]
+                blocks = [
+                    (block_number, [row["log_index"] for row in swaps])
+                    async for block_number, swaps in stream_block_swaps_by_range(
+                        session, 100, 102, chunk_size=2
+                    )
+                ]
+        return chunks, blocks
+
+    chunks, blocks = asyncio.run(run())
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    rows = [row for chunk in chunks for row in chunk]
+    assert [(r["block_number"], r["transaction_index"]) for r in rows] == [
+        (101, 0),
+        (101, 1),
+        (101, 2),
+        (103, 0),
+        (103, 1),
+        (103, 2),
+    ]
+    # mesmas chaves das leituras por bloco consumidas pelos detectores
+    assert rows[0]["amountIn"] == str(10**20)
+    assert rows[0]["from"] == "0x" + "11" * 20
+    assert "amount_in" not in rows[0]
+    assert blocks == [(100, [0, 2, 4]), (101, [0, 2, 4])]
+
+
+def test_range_and_block_reads_return_the_same_records():
+    async def run():
+        async with memory_db() as (_, session_factory):
+            async with session_factory() as session:
+                swaps = [make_swap(100, tx, tx) for tx in (1, 0)]
+                await insert_block_swaps(session, 100, swaps)
+
+            async with session_factory() as session:
+                by_block = await fetch_swap_records_by_block_number(session, 100)
+                by_range = [
+                    swaps
+                    async for _, swaps in stream_block_swaps_by_range(session, 100, 100)
+                ]
+        return by_block, by_range
+
+    by_block, by_range = asyncio.run(run())
+
+    assert by_range == [by_block]
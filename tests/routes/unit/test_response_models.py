@@ -0,0 +1,35 @@
+from app.dto.multiple_sandwich_response import SwapEvent
+from app.dto.single_sandwich_response import SandwichItem
+
+
+def test_block_numbers_stay_strings_in_responses():
+    item = SandwichItem(
+        attack_group_id=1, block_number=100, ta1="a", tv="b", ta2="c", swaps=[]
+    )
+    # swap no formato dos detectores, com o número do bloco lido do banco
+    event = SwapEvent.model_validate(
+        {
+            "hash": "ab",
+            "block_number": 100,
+            "log_index": 0,
+            "transaction_index": 0,
+            "from": "0x" + "11" * 20,
+            "to": "0x" + "22" * 20,
+            "dex_name": "Uniswap V2",
+            "tokenIn": "WETH",
+            "tokenInAddress": "0x" + "33" * 20,
+            "tokenOut": "USDC",
+            "tokenOutAddress": "0x" + "44" * 20,
+            "amountIn": "1",
+            "amountOut": "2",
+            "gasPrice": "3",
+            "gasUsed": 21000,
+            "gasFeeWei": "4",
+            "gasFeeEth": "0.1",
+            "gasBurned": "0.05",
+            "gasTipped": "0.05",
+        }
+    )
+
+    assert item.model_dump()["block_number"] == "100"
+    assert event.model_dump()["block_number"] == "100"
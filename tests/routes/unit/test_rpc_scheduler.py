@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from app.application.web3_client.rpc_scheduler import AdaptiveLimiter, rpc_priority
+from app.utils.enums import RpcPriority
+
+
+def test_interactive_calls_are_served_before_bulk():
+    limiter = AdaptiveLimiter(max_concurrency=4)
+    limiter.limit = 1
+    order = []
+
+    async def call(name, priority):
+        with rpc_priority(priority):
+            async with limiter.acquire():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+    async def run():
+        blocker = asyncio.create_task(call("first", RpcPriority.bulk))
+        await asyncio.sleep(0)
+        bulk = [
+            asyncio.create_task(call(f"bulk{i}", RpcPriority.bulk)) for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("api", RpcPriority.interactive))
+        await asyncio.gather(blocker, interactive, *bulk)
+
+    asyncio.run(run())
+
+    assert order == ["first", "api", "bulk0", "bulk1", "bulk2"]
+
+
+def test_concurrency_backs_off_on_throttling_and_grows_back():
+    limiter = AdaptiveLimiter(max_concurrency=16, decrease_cooldown=0)
+    initial = limiter.limit
+
+    limiter.record(throttled=True)
+    assert limiter.limit == initial / 2
+    assert limiter.stats()["throttled"] == 1
+
+    for _ in range(50):
+        limiter.record(latency=0.05)
+    assert initial / 2 < limiter.limit <= 16
+
+    # latência muito acima da referência também reduz o limite
+    grown = limiter.limit
+    for _ in range(10):
+        limiter.record(latency=1.0)
+    assert limiter.limit < grown
+
+
+def test_cancelled_waiter_does_not_leak_slots():
+    limiter = AdaptiveLimiter(max_concurrency=4)
+    limiter.limit = 1
+
+    async def hold(event):
+        async with limiter.acquire():
+            await event.wait()
+
+    async def run():
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(asyncio.Event()))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert limiter.in_flight == 0
+
+
+def test_interactive_calls_skip_bulk_calls_waiting_for_tokens():
+    limiter = AdaptiveLimiter(rate=20, max_concurrency=64)
+    order = []
+
+    async def call(name, priority):
+        with rpc_priority(priority):
+            async with limiter.acquire():
+                order.append(name)
+
+    async def run():
+        # esgota o balde
+        await asyncio.gather(*(call("warmup", RpcPriority.bulk) for _ in range(20)))
+        bulk = [
+            asyncio.create_task(call(f"bulk{i}", RpcPriority.bulk)) for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("api", RpcPriority.interactive))
+        await asyncio.gather(interactive, *bulk)
+
+    asyncio.run(run())
+
+    assert order[20:] == ["api", "bulk0", "bulk1", "bulk2"]
+
+
+def test_oversized_batches_are_charged_their_full_weight():
+    limiter = AdaptiveLimiter(rate=1000, max_concurrency=64)
+
+    async def run():
+        async with limiter.acquire(weight=1500):
+            pass
+        began = time.monotonic()
+        async with limiter.acquire():
+            pass
+        return time.monotonic() - began
+
+    # 1500 tokens com capacidade 1000: a próxima chamada espera os 500 que
+    # faltaram (0,5s a 1000 req/s)
+    assert asyncio.run(run()) >= 0.45
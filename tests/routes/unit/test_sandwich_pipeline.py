@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+from app.application import blocks_application
+from app.application import sandwich_pipeline as pipeline_module
+from app.application.sandwich_pipeline import SandwichPipeline
+from app.application.web3_client.head_follower import HeadFollower
+from app.dbo import db_writer as db_writer_module
+from app.dbo.db_functions import get_multi_layered_analysis
+from tests.routes.unit.memory_db import memory_db
+
+
+def test_new_heads_are_analyzed_and_lag_is_tracked(monkeypatch):
+    analyzed = []
+
+    async def fake_analysis(session, block_number):
+        analyzed.append(block_number)
+        if block_number == 2:
+            raise RuntimeError("boom")
+        return {"block_number": block_number, "total_sandwiches": 1}
+
+    monkeypatch.setattr(
+        pipeline_module, "fetch_multi_layered_burger_sandwiches", fake_analysis
+    )
+    follower = HeadFollower(async_web3=None)
+    pipeline = SandwichPipeline(follower, workers=1)
+
+    async def run():
+        pipeline.start()
+        for number in (1, 2, 3):
+            block_data = {"number": number, "timestamp": int(time.time()) - 5}
+            follower.blocks.append(block_data)
+            for listener in follower.listeners:
+                listener(block_data)
+        await pipeline.queue.join()
+        await pipeline.stop()
+
+    asyncio.run(run())
+
+    stats = pipeline.stats()
+    assert analyzed == [1, 2, 3]
+    assert stats["blocks_processed"] == 2
+    assert stats["blocks_failed"] == 1
+    assert stats["last_block"] == 3
+    assert stats["blocks_behind_head"] == 0
+    assert stats["lag_seconds"] >= 5
+    assert stats["sandwiches_detected"] == 2
+
+
+def announce(follower, numbers):
+    for number in numbers:
+        block_data = {"number": number, "timestamp": int(time.time())}
+        follower.blocks.append(block_data)
+        for listener in follower.listeners:
+            listener(block_data)
+
+
+def test_blocks_are_analyzed_only_after_confirmations(monkeypatch):
+    analyzed = []
+
+    async def fake_analysis(session, block_number):
+        analyzed.append(block_number)
+        return {"block_number": block_number, "total_sandwiches": 0}
+
+    monkeypatch.setattr(
+        pipeline_module, "fetch_multi_layered_burger_sandwiches", fake_analysis
+    )
+    follower = HeadFollower(async_web3=None)
+    pipeline = SandwichPipeline(follower, workers=1, confirmations=2)
+
+    async def run():
+        pipeline.start()
+        announce(follower, range(1, 6))
+        await pipeline.queue.join()
+        await pipeline.stop()
+
+    asyncio.run(run())
+
+    # cabeça em 5: só os blocos com 2 confirmações foram analisados
+    assert analyzed == [1, 2, 3]
+
+
+def test_full_queue_drops_the_oldest_blocks(monkeypatch):
+    analyzed = []
+    release = asyncio.Event()
+
+    async def fake_analysis(session, block_number):
+        analyzed.append(block_number)
+        await release.wait()
+        return {"block_number": block_number, "total_sandwiches": 0}
+
+    monkeypatch.setattr(
+        pipeline_module, "fetch_multi_layered_burger_sandwiches", fake_analysis
+    )
+    follower = HeadFollower(async_web3=None)
+    pipeline = SandwichPipeline(follower, workers=1, queue_size=2)
+
+    async def run():
+        pipeline.start()
+        announce(follower, [1])
+        # o worker fica preso na análise do bloco 1
+        await asyncio.sleep(0)
+        announce(follower, range(2, 7))
+        queued = [block["number"] for block in list(pipeline.queue._queue)]
+        release.set()
+        await pipeline.queue.join()
+        await pipeline.stop()
+        return queued
+
+    queued = asyncio.run(run())
+
+    assert queued == [5, 6]
+    assert analyzed == [1, 5, 6]
+    assert pipeline.stats()["blocks_dropped"] == 3
+
+
+def test_confirmed_blocks_are_stored_before_finality(monkeypatch):
+    detections = []
+
+    async def fake_detect(session, block, base_fee_per_gas):
+        detections.append(block["number"])
+        return []
+
+    async def analyzed(session, block_number):
+        return True
+
+    follower = HeadFollower(async_web3=None)
+    # finalização bem atrás das confirmações, como na rede principal
+    follower.finalized_number = 0
+    pipeline = SandwichPipeline(follower, workers=1, confirmations=2)
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            monkeypatch.setattr(pipeline_module, "AsyncSessionLocal", session_factory)
+            monkeypatch.setattr(
+                db_writer_module.db_writer, "session_factory", session_factory
+            )
+            monkeypatch.setattr(blocks_application, "head_follower", follower)
+            monkeypatch.setattr(
+                blocks_application,
+                "detect_multi_layered_burger_sandwiches",
+                fake_detect,
+            )
+            monkeypatch.setattr(
+                blocks_application, "get_analyzed_blocks_by_block_number", analyzed
+            )
+
+            pipeline.start()
+            for number in (1, 2, 3):
+                block_data = {
+                    "number": number,
+                    "hash": f"{number:064x}",
+                    "timestamp": int(time.time()),
+                    "base_fee_per_gas": 7,
+                }
+                follower.blocks.append(block_data)
+                follower.updated_at = time.monotonic()
+                for listener in follower.listeners:
+                    listener(block_data)
+            await pipeline.queue.join()
+            await pipeline.stop()
+
+            async with session_factory() as session:
+                analysis = await get_multi_layered_analysis(session, 1)
+                # a rota lê o resultado salvo pelo pipeline
+                await blocks_application.fetch_multi_layered_burger_sandwiches(
+                    session, 1
+                )
+        return analysis
+
+    analysis = asyncio.run(run())
+
+    assert analysis.block_hash == f"{1:064x}"
+    assert analysis.total_sandwiches == 0
+    assert detections == [1]
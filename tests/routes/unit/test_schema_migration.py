@@ -0,0 +1,202 @@
+import asyncio
+
+from sqlalchemy import func, inspect, select
+
+from app.database import Base
+from app.dbo.models import SandwichAttack, SandwichAttackGroup, TransactionSwap
+from app.dbo.schema_migration import migrate_compact_schema, upgrade_schema
+from tests.routes.unit.memory_db import memory_db
+
+# Esquema textual anterior, como era criado pelo create_all
+LEGACY_SCHEMA = [
+    "CREATE TABLE blocks_analyzed (block_number VARCHAR NOT NULL, PRIMARY KEY (block_number))",
+    "CREATE INDEX ix_blocks_analyzed_block_number ON blocks_analyzed (block_number)",
+    "CREATE TABLE transactions_swap (hash VARCHAR NOT NULL, block_number VARCHAR NOT NULL, "
+    'log_index INTEGER NOT NULL, transaction_index INTEGER, "from" VARCHAR, "to" VARCHAR, '
+    'dex_name VARCHAR, "tokenIn" VARCHAR, "tokenInAddress" VARCHAR, "tokenOut" VARCHAR, '
+    '"tokenOutAddress" VARCHAR, "amountIn" VARCHAR, "amountOut" VARCHAR, "gasPrice" VARCHAR, '
+    "gas_used INTEGER, gas_fee_wei VARCHAR, gas_fee_eth VARCHAR, gas_burned VARCHAR, "
+    "gas_tipped VARCHAR, PRIMARY KEY (hash, block_number, log_index))",
+    "CREATE TABLE sandwich_attack_group (id INTEGER NOT NULL, block_number VARCHAR, "
+    "ta1 VARCHAR NOT NULL, tv VARCHAR NOT NULL, ta2 VARCHAR NOT NULL, PRIMARY KEY (id))",
+    "CREATE INDEX ix_sandwich_attack_group_block_number ON sandwich_attack_group (block_number)",
+    "CREATE TABLE sandwiches_attacks (id INTEGER NOT NULL, attack_group_id INTEGER, "
+    'block_number VARCHAR, hash VARCHAR NOT NULL, "from" VARCHAR, "to" VARCHAR, '
+    "token_in VARCHAR, token_out VARCHAR, amount_in VARCHAR, amount_out VARCHAR, "
+    "gas_price VARCHAR, transition_type VARCHAR, PRIMARY KEY (id), "
+    "FOREIGN KEY(attack_group_id) REFERENCES sandwich_attack_group (id))",
+]
+
+SENDER = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+POOL = "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359"
+BIG_AMOUNT = str(2**200 + 7)
+
+
+def test_legacy_text_tables_are_migrated_to_the_compact_schema():
+    async def run():
+        async with memory_db(create_tables=False) as (engine, session_factory):
+            async with engine.begin() as conn:
+                for statement in LEGACY_SCHEMA:
+                    await conn.exec_driver_sql(statement)
+                await conn.exec_driver_sql(
+                    "INSERT INTO transactions_swap VALUES ('ab' || printf('%062d', 0), "
+                    f"'100', 3, 1, '{SENDER}', '{POOL}', 'Uniswap V2', 'WETH', '', "
+                    f"'USDC', '{POOL}', '{BIG_AMOUNT}', '2000', '15000000000', 21000, "
+                    "'315000000000000', '0.000315', '0.0001', '0.0002')"
+                )
+                await conn.exec_driver_sql("INSERT INTO blocks_analyzed VALUES ('100')")
+                await conn.exec_driver_sql(
+                    "INSERT INTO sandwich_attack_group VALUES (1, '100', "
+                    "'0x' || printf('%064d', 1), printf('%064d', 2), printf('%064d', 3))"
+                )
+                await conn.exec_driver_sql(
+                    "INSERT INTO sandwiches_attacks VALUES (1, 1, '100', printf('%064d', 1), "
+                    f"'{SENDER}', '{POOL}', 'WETH', 'USDC', '1', '2', '3', 'attacker')"
+                )
+
+            async with engine.begin() as conn:
+                migrated = await conn.run_sync(migrate_compact_schema)
+                await conn.run_sync(Base.metadata.create_all)
+                # rodar de novo não faz nada
+                again = await conn.run_sync(migrate_compact_schema)
+                tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+
+            async with session_factory() as session:
+                swap = (await session.execute(select(TransactionSwap))).scalar_one()
+                group = (
+                    await session.execute(select(SandwichAttackGroup))
+                ).scalar_one()
+                attack = (await session.execute(select(SandwichAttack))).scalar_one()
+                in_range = await session.execute(
+                    select(TransactionSwap.hash).where(
+                        TransactionSwap.block_number.between(99, 101)
+                    )
+                )
+                in_range = in_range.scalars().all()
+        return migrated, again, tables, swap, group, attack, in_range
+
+    migrated, again, tables, swap, group, attack, in_range = asyncio.run(run())
+
+    assert set(migrated) == {
+        "blocks_analyzed",
+        "transactions_swap",
+        "sandwich_attack_group",
+        "sandwiches_attacks",
+    }
+    assert again == []
+    assert not [t for t in tables if t.endswith("_legacy")]
+
+    assert swap.block_number == 100
+    assert swap.hash == "ab" + "0" * 62
+    assert swap.from_address == SENDER
+    assert swap.token_in_address == ""
+    assert swap.amount_in == BIG_AMOUNT
+    assert swap.gas_price == "15000000000"
+    assert swap.gas_fee_eth == "0.000315"
+    assert in_range == [swap.hash]
+
+    assert group.ta1 == "0" * 63 + "1"
+    assert attack.attack_group_id == group.id
+    assert attack.to_address == POOL
+    assert attack.amount_out == "2"
+
+
+def test_startup_upgrade_removes_duplicate_legacy_sandwich_groups():
+    async def run():
+        async with memory_db(create_tables=False) as (engine, session_factory):
+            async with engine.begin() as conn:
+                for statement in LEGACY_SCHEMA:
+                    await conn.exec_driver_sql(statement)
+                # o mesmo sanduíche gravado três vezes, uma delas com prefixo 0x
+                for group_id, prefix in ((1, ""), (2, "0x"), (3, "")):
+                    await conn.exec_driver_sql(
+                        f"INSERT INTO sandwich_attack_group VALUES ({group_id}, "
+                        f"'100', '{prefix}' || printf('%064d', 1), "
+                        "printf('%064d', 2), printf('%064d', 3))"
+                    )
+                    for n in (1, 2, 3):
+                        await conn.exec_driver_sql(
+                            "INSERT INTO sandwiches_attacks VALUES "
+                            f"({group_id * 10 + n}, {group_id}, '100', "
+                            f"printf('%064d', {n}), '{SENDER}', '{POOL}', 'WETH', "
+                            "'USDC', '1', '2', '3', "
+                            f"'{'victim' if n == 2 else 'attacker'}')"
+                        )
+
+            async with engine.begin() as conn:
+                await conn.run_sync(upgrade_schema)
+                indexes = await conn.run_sync(
+                    lambda c: {
+                        i["name"] for i in inspect(c).get_indexes("sandwiches_attacks")
+                    }
+                )
+
+            async with session_factory() as session:
+                groups = await session.execute(
+                    select(func.count()).select_from(SandwichAttackGroup)
+                )
+                attacks = await session.execute(
+                    select(SandwichAttack.attack_group_id, SandwichAttack.hash)
+                )
+                return groups.scalar(), attacks.all(), indexes
+
+    groups, attacks, indexes = asyncio.run(run())
+
+    assert groups == 1
+    assert [group_id for group_id, _ in attacks] == [1, 1, 1]
+    assert len({tx_hash for _, tx_hash in attacks}) == 3
+    assert "uq_sandwiches_attacks_group_hash" in indexes
+
+
+def test_amounts_sort_numerically_and_old_blobs_are_widened():
+    amounts = [2**200 + 7, 255, 256, 10**18, 0]
+
+    async def run():
+        async with memory_db() as (engine, session_factory):
+            async with session_factory() as session:
+                for index, amount in enumerate(amounts):
+                    session.add(
+                        TransactionSwap(
+                            hash=f"{index:064x}",
+                            block_number=100,
+                            log_index=index,
+                            amount_in=str(amount),
+                        )
+                    )
+                await session.commit()
+
+            async with engine.begin() as conn:
+                # valor gravado na largura mínima com sinal, como antes
+                await conn.exec_driver_sql(
+                    "UPDATE transactions_swap SET \"amountIn\" = x'00ff' "
+                    "WHERE log_index = 1"
+                )
+                await conn.run_sync(upgrade_schema)
+                lengths = (
+                    await conn.exec_driver_sql(
+                        'SELECT DISTINCT length("amountIn") FROM transactions_swap'
+                    )
+                ).all()
+
+            async with session_factory() as session:
+                ordered = (
+                    await session.scalars(
+                        select(TransactionSwap.amount_in).order_by(
+                            TransactionSwap.amount_in
+                        )
+                    )
+                ).all()
+                above = (
+                    await session.scalars(
+                        select(TransactionSwap.amount_in).where(
+                            TransactionSwap.amount_in > str(255)
+                        )
+                    )
+                ).all()
+        return lengths, ordered, above
+
+    lengths, ordered, above = asyncio.run(run())
+
+    assert lengths == [(32,)]
+    assert ordered == [str(a) for a in sorted(amounts)]
+    assert sorted(above, key=int) == [str(256), str(10**18), str(2**200 + 7)]
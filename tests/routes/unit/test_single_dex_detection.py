@@ -0,0 +1,62 @@
+import asyncio
+
+from app.application import sandwich_attack_detector
+from app.application.sandwich_attack_detector import detect_single_dex_sandwiches
+from tests.routes.unit.test_single_dex_storage import ATTACKER, VICTIM, make_swap
+
+
+def detect(monkeypatch, swaps):
+    written = []
+
+    async def fake_write(block_number, sandwiches):
+        written.extend(sandwiches)
+
+    monkeypatch.setattr(
+        sandwich_attack_detector, "write_single_dex_sandwiches", fake_write
+    )
+    detected = asyncio.run(
+        detect_single_dex_sandwiches(
+            None, {"number": 100, "transactions": swaps}, amount_tol=0.01
+        )
+    )
+    return detected, written
+
+
+def test_back_run_in_the_front_run_transaction_is_not_a_sandwich(monkeypatch):
+    other = "0x" + "44" * 20
+    detected, written = detect(
+        monkeypatch,
+        [
+            # compra e venda na mesma transação, com uma vítima no meio
+            make_swap(0, 1, other, "WETH", "USDC"),
+            make_swap(1, 2, VICTIM, "WETH", "USDC"),
+            make_swap(2, 1, other, "USDC", "WETH"),
+        ],
+    )
+
+    assert detected == []
+    assert written == []
+
+
+def test_each_sandwich_is_reported_once_with_both_attackers(monkeypatch):
+    detected, written = detect(
+        monkeypatch,
+        [
+            # front-run com dois logs de Swap que casam
+            make_swap(0, 1, ATTACKER, "WETH", "USDC"),
+            make_swap(1, 1, ATTACKER, "WETH", "USDC"),
+            make_swap(2, 2, VICTIM, "WETH", "USDC"),
+            make_swap(3, 3, ATTACKER, "USDC", "WETH"),
+        ],
+    )
+
+    assert [(d["ta1"], d["tv"], d["ta2"]) for d in detected] == [
+        (f"{1:064x}", f"{2:064x}", f"{3:064x}")
+    ]
+    assert [d["attack_group_id"] for d in detected] == [1]
+    assert [s["transition_type"] for s in detected[0]["swaps"]] == [
+        "attacker",
+        "victim",
+        "attacker",
+    ]
+    assert len(written) == 1
@@ -0,0 +1,181 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.application import blocks_application
+from app.application.blocks_application import group_by_attack_group_id
+from app.dbo import db_writer as db_writer_module
+from app.dbo.db_functions import (
+    insert_block_swaps,
+    get_sandwich_attacks_by_block_grouped_by_attack_group,
+    get_single_dex_analysis,
+    save_single_dex_sandwiches,
+)
+from app.dbo.models import SandwichAttack, SandwichAttackGroup
+from app.dbo.schema_migration import (
+    create_missing_indexes,
+    deduplicate_sandwich_groups,
+)
+from tests.routes.unit.memory_db import memory_db
+
+
+def make_tx(n, sender):
+    return {
+        "hash": f"{n:064x}",
+        "from": sender,
+        "to": "0x" + "33" * 20,
+        "tokenIn": "WETH",
+        "tokenOut": "USDC",
+        "amountIn": "1",
+        "amountOut": "2",
+        "gasPrice": "3",
+    }
+
+
+ATTACKER = "0x" + "11" * 20
+VICTIM = "0x" + "22" * 20
+
+
+async def count(session, model):
+    return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+def test_single_dex_sandwiches_are_stored_once_per_block():
+    ta1, tv, ta2, tv2 = (
+        make_tx(1, ATTACKER),
+        make_tx(2, VICTIM),
+        make_tx(3, ATTACKER),
+        make_tx(4, VICTIM),
+    )
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            async with session_factory() as session:
+                await save_single_dex_sandwiches(session, 100, [(ta1, tv, ta2)])
+                await session.commit()
+                # nova requisição para o mesmo bloco, com um sanduíche a mais
+                await save_single_dex_sandwiches(
+                    session, 100, [(ta1, tv, ta2), (ta1, tv2, ta2)]
+                )
+                await session.commit()
+
+                groups = await count(session, SandwichAttackGroup)
+                attacks = await count(session, SandwichAttack)
+                total = await get_single_dex_analysis(session, 100)
+                missing = await get_single_dex_analysis(session, 101)
+                rows = await get_sandwich_attacks_by_block_grouped_by_attack_group(
+                    session, 100
+                )
+        return groups, attacks, total, missing, group_by_attack_group_id(rows)
+
+    groups, attacks, total, missing, grouped = asyncio.run(run())
+
+    assert groups == 2
+    assert attacks == 6
+    # a marca do bloco é a da primeira análise
+    assert total == 1
+    assert missing is None
+    assert [g["tv"] for g in grouped] == [tv["hash"], tv2["hash"]]
+    assert [s["transition_type"] for s in grouped[0]["swaps"]] == [
+        "attacker",
+        "victim",
+        "attacker",
+    ]
+
+
+def make_swap(log_index, tx, sender, token_in, token_out):
+    return {
+        "hash": f"{tx:064x}",
+        "block_number": 100,
+        "log_index": log_index,
+        "transaction_index": tx,
+        "from": sender,
+        "to": "0x" + "33" * 20,
+        "tokenIn": token_in,
+        "tokenOut": token_out,
+        "amountIn": "1",
+        "amountOut": "2",
+        "gasPrice": "3",
+    }
+
+
+def test_first_and_repeated_single_dex_answers_are_the_same(monkeypatch):
+    other_attacker = "0x" + "44" * 20
+    swaps = [
+        # front-run com dois logs de Swap que casam
+        make_swap(0, 1, ATTACKER, "WETH", "USDC"),
+        make_swap(1, 1, ATTACKER, "WETH", "USDC"),
+        make_swap(2, 2, VICTIM, "WETH", "USDC"),
+        make_swap(3, 3, ATTACKER, "USDC", "WETH"),
+        # compra e venda na mesma transação: não é um sanduíche
+        make_swap(4, 4, other_attacker, "WETH", "USDC"),
+        make_swap(5, 4, other_attacker, "USDC", "WETH"),
+    ]
+
+    async def run():
+        async with memory_db() as (_, session_factory):
+            monkeypatch.setattr(
+                db_writer_module.db_writer, "session_factory", session_factory
+            )
+            async with session_factory() as session:
+                await insert_block_swaps(session, 100, swaps)
+
+            responses = []
+            for _ in range(2):
+                async with session_factory() as session:
+                    responses.append(
+                        await blocks_application.analyze_single_dex_sandwiches(
+                            session, 100
+                        )
+                    )
+        return responses
+
+    first, repeated = asyncio.run(run())
+
+    assert first == repeated
+    triples = [(g["ta1"], g["tv"], g["ta2"]) for g in first["sandwiches"]]
+    assert first["total_sandwiches"] == len(triples) == len(set(triples))
+    assert (f"{1:064x}", f"{2:064x}", f"{3:064x}") in triples
+    assert not [t for t in triples if t[0] == t[2]]
+    assert all(len(g["swaps"]) == 3 for g in first["sandwiches"])
+
+
+def test_existing_duplicate_groups_are_removed_before_the_unique_index():
+    async def run():
+        async with memory_db() as (engine, session_factory):
+            async with engine.begin() as conn:
+                await conn.exec_driver_sql(
+                    "DROP INDEX uq_sandwich_attack_group_block_txs"
+                )
+                await conn.exec_driver_sql(
+                    "DROP INDEX uq_sandwiches_attacks_group_hash"
+                )
+
+            async with session_factory() as session:
+                for _ in range(3):
+                    group = SandwichAttackGroup(
+                        block_number=100, ta1="01" * 32, tv="02" * 32, ta2="03" * 32
+                    )
+                    session.add(group)
+                    await session.flush()
+                    for n in (1, 2, 3):
+                        session.add(
+                            SandwichAttack(
+                                attack_group_id=group.id,
+                                block_number=100,
+                                hash=f"0{n}" * 32,
+                                transition_type="victim" if n == 2 else "attacker",
+                            )
+                        )
+                await session.commit()
+
+            async with engine.begin() as conn:
+                await conn.run_sync(deduplicate_sandwich_groups)
+                await conn.run_sync(create_missing_indexes)
+
+            async with session_factory() as session:
+                groups = await count(session, SandwichAttackGroup)
+                attacks = await count(session, SandwichAttack)
+        return groups, attacks
+
+    assert asyncio.run(run()) == (1, 3)
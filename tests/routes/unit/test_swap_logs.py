@@ -0,0 +1,205 @@
+from web3 import AsyncWeb3
+from web3.exceptions import Web3RPCError
+import asyncio
+
+from app.application.swap_details import (
+    SWAP_V2_TOPIC,
+    get_swap_logs,
+    get_swap_transactions_by_logs,
+    is_log_limit_error,
+    iter_swap_transactions_by_logs,
+)
+from app.config import AppConfig
+from tests.routes.unit.fake_rpc import fake_rpc_server, rpc_error, rpc_result
+
+POOL = "0x" + "33" * 20
+# limite de blocos por eth_getLogs do provedor falso
+PROVIDER_MAX_SPAN = 3
+
+
+def tx_hash(block_number: int) -> str:
+    return "0x" + f"{block_number:064x}"
+
+
+def make_log(block_number: int) -> dict:
+    return {
+        "address": POOL,
+        "topics": ["0x" + SWAP_V2_TOPIC.hex()],
+        "data": "0x",
+        "blockNumber": hex(block_number),
+        "blockHash": "0x" + "aa" * 32,
+        "transactionHash": tx_hash(block_number),
+        "transactionIndex": "0x0",
+        "logIndex": "0x0",
+        "removed": False,
+    }
+
+
+def handle(request):
+    method, params = request["method"], request["params"]
+    if method == "eth_getLogs":
+        start = int(params[0]["fromBlock"], 16)
+        end = int(params[0]["toBlock"], 16)
+        if end - start + 1 > PROVIDER_MAX_SPAN:
+            return rpc_error(request, -32005, "query returned more than 10000 results")
+        # blocos pares têm um swap
+        return rpc_result(
+            request, [make_log(n) for n in range(start, end + 1) if n % 2 == 0]
+        )
+    if method == "eth_getTransactionByHash":
+        block_number = int(params[0], 16)
+        return rpc_result(
+            request,
+            {
+                "hash": params[0],
+                "blockNumber": hex(block_number),
+                "transactionIndex": "0x0",
+                "gasPrice": hex(10**9),
+            },
+        )
+    if method == "eth_getTransactionReceipt":
+        block_number = int(params[0], 16)
+        return rpc_result(
+            request,
+            {
+                "transactionHash": params[0],
+                "blockNumber": hex(block_number),
+                "transactionIndex": "0x0",
+                "gasUsed": hex(21000),
+                "logs": [make_log(block_number)],
+            },
+        )
+    if method == "eth_getBlockByNumber":
+        block_number = int(params[0], 16)
+        return rpc_result(
+            request, {"number": params[0], "baseFeePerGas": hex(block_number)}
+        )
+    raise AssertionError(f"método inesperado: {method}")
+
+
+def log_windows(received) -> list[tuple[int, int]]:
+    return [
+        (int(body["params"][0]["fromBlock"], 16), int(body["params"][0]["toBlock"], 16))
+        for body in received
+        if isinstance(body, dict) and body["method"] == "eth_getLogs"
+    ]
+
+
+def test_log_limit_errors_are_recognized():
+    assert is_log_limit_error(
+        Web3RPCError("{'code': -32005, 'message': 'query returned more than 10000'}")
+    )
+    assert is_log_limit_error(ValueError("block range is too wide"))
+    assert is_log_limit_error(
+        Web3RPCError(
+            "Log response size exceeded",
+            rpc_response={
+                "error": {
+                    "code": -32602,
+                    "message": "Log response size exceeded. Based on your "
+                    "parameters, this block range should work: [0x1, 0x2]",
+                }
+            },
+        )
+    )
+    assert not is_log_limit_error(Web3RPCError("rate limit exceeded"))
+    assert not is_log_limit_error(Web3RPCError("execution reverted"))
+    # a Infura usa o mesmo código para o limite de requisições
+    assert not is_log_limit_error(
+        Web3RPCError(
+            "{'code': -32005, 'message': 'daily request count exceeded'}",
+            rpc_response={
+                "error": {"code": -32005, "message": "daily request count exceeded"}
+            },
+        )
+    )
+    assert not is_log_limit_error(ValueError("gas required is more than allowance"))
+
+
+def test_log_window_shrinks_to_the_provider_limit(monkeypatch):
+    monkeypatch.setattr(AppConfig, "LOGS_BLOCK_RANGE", 8)
+
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+            logs = await get_swap_logs(w3, 100, 119)
+        return logs, log_windows(received)
+
+    logs, windows = asyncio.run(run())
+
+    assert [log["blockNumber"] for log in logs] == list(range(100, 120, 2))
+    # 8 e 4 blocos são recusados; a janela nunca volta a passar do limite
+    assert windows[:3] == [(100, 107), (100, 103), (100, 101)]
+    accepted = [(s, e) for s, e in windows if e - s + 1 <= PROVIDER_MAX_SPAN]
+    assert accepted[0][0] == 100 and accepted[-1][1] == 119
+    assert all(b[0] == a[1] + 1 for a, b in zip(accepted, accepted[1:]))
+    assert len(windows) < 20
+
+
+def test_other_log_errors_are_raised(monkeypatch):
+    monkeypatch.setattr(AppConfig, "LOGS_BLOCK_RANGE", 8)
+
+    def refuse(request):
+        return rpc_error(request, -32000, "execution timeout")
+
+    async def run():
+        async with fake_rpc_server(refuse) as (url, received):
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+            try:
+                await get_swap_logs(w3, 100, 119)
+            except Web3RPCError:
+                return len(received)
+
+    assert asyncio.run(run()) == 1
+
+
+def test_only_swap_transactions_are_fetched(monkeypatch):
+    monkeypatch.setattr(AppConfig, "LOGS_BLOCK_RANGE", 8)
+
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+            blocks, pairs = await get_swap_transactions_by_logs(w3, 100, 105)
+        methods = [
+            request["method"]
+            for body in received
+            for request in (body if isinstance(body, list) else [body])
+        ]
+        return blocks, pairs, methods
+
+    blocks, pairs, methods = asyncio.run(run())
+
+    assert {b["number"]: b["baseFeePerGas"] for b in blocks} == {
+        100: 100,
+        102: 102,
+        104: 104,
+    }
+    assert [tx["blockNumber"] for tx, _ in pairs] == [100, 102, 104]
+    assert all(tx["hash"] == receipt["transactionHash"] for tx, receipt in pairs)
+    # uma transação e um recibo por swap, nada dos blocos ímpares
+    assert methods.count("eth_getTransactionByHash") == 3
+    assert methods.count("eth_getTransactionReceipt") == 3
+    assert methods.count("eth_getBlockByNumber") == 3
+
+
+def test_swap_transactions_are_streamed_in_block_groups(monkeypatch):
+    monkeypatch.setattr(AppConfig, "LOGS_BLOCK_RANGE", 8)
+    # uma transação (e seu recibo) por lote
+    monkeypatch.setattr(AppConfig, "RPC_BATCH_SIZE", 2)
+
+    async def run():
+        async with fake_rpc_server(handle) as (url, received):
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+            chunks = []
+            async for blocks, pairs in iter_swap_transactions_by_logs(w3, 100, 105):
+                chunks.append(
+                    (
+                        [b["number"] for b in blocks],
+                        [tx["blockNumber"] for tx, _ in pairs],
+                    )
+                )
+        return chunks
+
+    chunks = asyncio.run(run())
+
+    assert chunks == [([100], [100]), ([102], [102]), ([104], [104])]